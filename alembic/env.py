@@ -14,6 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import braumchat_api.models  # noqa: F401
 from braumchat_api.config import get_settings  # type: ignore
 from braumchat_api.models.meta import Base  # type: ignore
+from braumchat_api.models.search_index import include_object  # type: ignore
 
 config = context.config
 
@@ -34,6 +35,7 @@ def do_run_migrations(connection):
         target_metadata=target_metadata,
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,47 @@
+"""add channel_read_markers and messages (channel_id, id) index
+
+Revision ID: a3c9e6f1d2b5
+Revises: f2b8d5e3c0a4
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3c9e6f1d2b5"
+down_revision = "f2b8d5e3c0a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_read_markers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("channel_id", sa.Integer(), nullable=False),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("user_id", "channel_id", name="uq_channel_read_markers_user_channel"),
+    )
+    op.create_index(
+        op.f("ix_channel_read_markers_id"), "channel_read_markers", ["id"], unique=False
+    )
+    op.create_index("ix_messages_channel_id_id", "messages", ["channel_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_channel_id_id", table_name="messages")
+    op.drop_index(op.f("ix_channel_read_markers_id"), table_name="channel_read_markers")
+    op.drop_table("channel_read_markers")
@@ -0,0 +1,77 @@
+"""add tsvector search columns and GIN indexes to messages and direct_messages
+
+Revision ID: b4d1f7a2c8e6
+Revises: a3c9e6f1d2b5
+Create Date: 2026-10-19
+
+Adding a STORED generated column rewrites the table; run this in a maintenance
+window on large installs. SQLite (local runs) gets an external-content FTS5
+table kept in sync by triggers instead.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b4d1f7a2c8e6"
+down_revision = "a3c9e6f1d2b5"
+branch_labels = None
+depends_on = None
+
+TABLES = ("messages", "direct_messages")
+
+
+def _dialect() -> str | None:
+    ctx = op.get_context()
+    return getattr(getattr(ctx, "dialect", None), "name", None)
+
+
+def upgrade() -> None:
+    if _dialect() == "postgresql":
+        for table in TABLES:
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, content)) STORED"
+            )
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+                f"ON {table} USING gin (search_vector)"
+            )
+    else:
+        for table in TABLES:
+            fts = f"{table}_fts"
+            delete_old = (
+                f"INSERT INTO {fts}({fts}, rowid, content) "
+                "VALUES ('delete', old.id, old.content);"
+            )
+            insert_new = f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content);"
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+                f"USING fts5(content, content='{table}', content_rowid='id')"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+                f"BEGIN {insert_new} END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+                f"BEGIN {delete_old} END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            )
+            # Index the rows that predate the triggers.
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if _dialect() == "postgresql":
+        for table in TABLES:
+            op.drop_index(f"ix_{table}_search_vector", table_name=table)
+            op.drop_column(table, "search_vector")
+    else:
+        for table in TABLES:
+            fts = f"{table}_fts"
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
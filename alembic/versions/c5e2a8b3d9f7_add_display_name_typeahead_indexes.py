@@ -0,0 +1,45 @@
+"""add typeahead indexes on lower(display_name)
+
+Revision ID: c5e2a8b3d9f7
+Revises: b4d1f7a2c8e6
+Create Date: 2026-10-19
+
+uq_users_display_name_lower can't serve `LIKE 'q%'` under a non-C collation;
+a text_pattern_ops index can. The trigram index serves the infix `LIKE '%q%'`
+filters on friend and DM thread lists.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5e2a8b3d9f7"
+down_revision = "b4d1f7a2c8e6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    ctx = op.get_context()
+    dialect = getattr(getattr(ctx, "dialect", None), "name", None)
+    if dialect != "postgresql":
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_display_name_lower_pattern "
+        "ON users (lower(display_name) text_pattern_ops)"
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_display_name_trgm "
+        "ON users USING gin (lower(display_name) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    ctx = op.get_context()
+    dialect = getattr(getattr(ctx, "dialect", None), "name", None)
+    if dialect != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_users_display_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_display_name_lower_pattern")
@@ -0,0 +1,114 @@
+"""add per-user dm_inbox
+
+Revision ID: e1a7c4d2b9f3
+Revises: c3d2e1f0a9b8
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e1a7c4d2b9f3"
+down_revision = "c3d2e1f0a9b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dm_inbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("thread_id", sa.Integer(), nullable=False),
+        sa.Column("other_user_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=True),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("preview", sa.String(length=140), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["other_user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["thread_id"], ["direct_message_threads.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("user_id", "other_user_id", name="uq_dm_inbox_user_other"),
+    )
+    op.create_index(op.f("ix_dm_inbox_id"), "dm_inbox", ["id"], unique=False)
+    op.create_index(
+        "ix_dm_inbox_user_recent",
+        "dm_inbox",
+        ["user_id", "last_message_at", "thread_id"],
+        unique=False,
+    )
+
+    # updated_at was never bumped on new messages; fix it so both views agree.
+    op.execute(
+        """
+        UPDATE direct_message_threads
+        SET updated_at = (
+            SELECT max(m.created_at) FROM direct_messages m
+            WHERE m.thread_id = direct_message_threads.id
+        )
+        WHERE EXISTS (
+            SELECT 1 FROM direct_messages m WHERE m.thread_id = direct_message_threads.id
+        )
+        """
+    )
+
+    # Legacy data may hold several threads per pair (inverted user order or other
+    # workspaces); list_threads used to dedupe in Python. The inbox has one row
+    # per pair: start it at the thread get_or_create_thread would pick (most
+    # recently active, then highest id). Later posts to any of the pair's
+    # threads move that row.
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT
+                t.id,
+                t.user1_id,
+                t.user2_id,
+                coalesce(t.updated_at, t.created_at) AS active_at,
+                row_number() OVER (
+                    PARTITION BY
+                        CASE WHEN t.user1_id < t.user2_id THEN t.user1_id ELSE t.user2_id END,
+                        CASE WHEN t.user1_id < t.user2_id THEN t.user2_id ELSE t.user1_id END
+                    ORDER BY coalesce(t.updated_at, t.created_at) DESC, t.id DESC
+                ) AS rn
+            FROM direct_message_threads t
+        ),
+        sides AS (
+            SELECT id, user1_id AS user_id, user2_id AS other_user_id, active_at
+            FROM ranked WHERE rn = 1
+            UNION ALL
+            SELECT id, user2_id AS user_id, user1_id AS other_user_id, active_at
+            FROM ranked WHERE rn = 1
+        ),
+        latest AS (
+            SELECT thread_id, max(id) AS id FROM direct_messages GROUP BY thread_id
+        )
+        INSERT INTO dm_inbox
+            (user_id, thread_id, other_user_id, last_message_id, last_message_at, preview)
+        SELECT
+            s.user_id,
+            s.id,
+            s.other_user_id,
+            m.id,
+            coalesce(m.created_at, s.active_at),
+            substr(m.content, 1, 140)
+        FROM sides s
+        LEFT JOIN latest l ON l.thread_id = s.id
+        LEFT JOIN direct_messages m ON m.id = l.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dm_inbox_user_recent", table_name="dm_inbox")
+    op.drop_index(op.f("ix_dm_inbox_id"), table_name="dm_inbox")
+    op.drop_table("dm_inbox")
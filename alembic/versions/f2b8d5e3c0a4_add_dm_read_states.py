@@ -0,0 +1,44 @@
+"""add dm_read_states
+
+Revision ID: f2b8d5e3c0a4
+Revises: e1a7c4d2b9f3
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2b8d5e3c0a4"
+down_revision = "e1a7c4d2b9f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dm_read_states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("thread_id", sa.Integer(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["thread_id"], ["direct_message_threads.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("user_id", "thread_id", name="uq_dm_read_states_user_thread"),
+    )
+    op.create_index(op.f("ix_dm_read_states_id"), "dm_read_states", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_dm_read_states_id"), table_name="dm_read_states")
+    op.drop_table("dm_read_states")
@@ -0,0 +1,241 @@
+"""Response compression (gzip, and brotli when the `brotli` package is installed).
+
+Responses are compressed only when the client accepts it, the body is at
+least `minimum_size` bytes, the content type is text-like, and the route
+hasn't opted out with `@compression(enabled=False)`. 1xx/204/304 responses,
+HEAD requests and bodies that already carry a Content-Encoding pass through.
+
+Streaming responses aren't buffered: at most `minimum_size` bytes are held
+back to decide, then every chunk is compressed and sync-flushed as it
+arrives, so NDJSON consumers still see rows incrementally.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..observability.metrics import HTTP_COMPRESSION_BYTES_TOTAL, HTTP_COMPRESSION_SKIPPED_TOTAL
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+)
+
+
+def compression(*, enabled: bool = True, minimum_size: int | None = None):
+    """Per-route override, e.g. `@compression(enabled=False)` under the route decorator."""
+
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.__compression__ = {"enabled": enabled, "minimum_size": minimum_size}
+        return endpoint
+
+    return decorate
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(header: str | None) -> str | None:
+    """The encoding to use for an Accept-Encoding header: "br", "gzip" or None."""
+    if not header:
+        return None
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, *, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress `data` and flush, so the client can decode it right away."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope.get("type") != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """Per-response state: decide on the first body chunk, then stream through."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = middleware.minimum_size
+        self.start: Message | None = None
+        self.buffer = bytearray()
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _skip_reason(self, start: Message) -> str | None:
+        override = getattr(self.scope.get("endpoint"), "__compression__", None)
+        if override is not None:
+            if not override["enabled"]:
+                return "route"
+            if override["minimum_size"] is not None:
+                self.minimum_size = override["minimum_size"]
+        status = start["status"]
+        if status < 200 or status in (204, 304):
+            return "status"
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return "encoded"
+        content_type = headers.get("content-type", "").lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return "content_type"
+        length = headers.get("content-length")
+        if length is not None and length.isdigit() and int(length) < self.minimum_size:
+            return "small"
+        return None
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            reason = self._skip_reason(message)
+            if reason is not None:
+                HTTP_COMPRESSION_SKIPPED_TOTAL.labels(reason=reason).inc()
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.buffer += body
+            if len(self.buffer) < self.minimum_size:
+                if more_body:
+                    return  # Not enough to decide yet.
+                HTTP_COMPRESSION_SKIPPED_TOTAL.labels(reason="small").inc()
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": bytes(self.buffer)})
+                return
+            if not more_body:
+                await self._send_whole()
+                return
+            await self._begin_stream()
+            body, self.buffer = bytes(self.buffer), bytearray()
+
+        self.bytes_in += len(body)
+        if more_body:
+            out = self.compressor.chunk(body) if body else b""
+        else:
+            out = self.compressor.finish(body)
+        self.bytes_out += len(out)
+        if out or not more_body:
+            await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
+        if not more_body:
+            self._record()
+
+    def _compressed_headers(self) -> MutableHeaders:
+        self.compressor = _Compressor(
+            self.encoding,
+            gzip_level=self.middleware.gzip_level,
+            brotli_quality=self.middleware.brotli_quality,
+        )
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def _send_whole(self) -> None:
+        # Single chunk: compress it all so Content-Length stays exact.
+        headers = self._compressed_headers()
+        body = bytes(self.buffer)
+        out = self.compressor.finish(body)
+        headers["Content-Length"] = str(len(out))
+        self.bytes_in, self.bytes_out = len(body), len(out)
+        self.passthrough = True
+        self._record()
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": out})
+
+    async def _begin_stream(self) -> None:
+        headers = self._compressed_headers()
+        del headers["Content-Length"]
+        await self._send(self.start)
+
+    def _record(self) -> None:
+        HTTP_COMPRESSION_BYTES_TOTAL.labels(encoding=self.encoding, stage="in").inc(self.bytes_in)
+        HTTP_COMPRESSION_BYTES_TOTAL.labels(encoding=self.encoding, stage="out").inc(
+            self.bytes_out
+        )
@@ -1,14 +1,18 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 
 from fastapi import Depends, HTTPException, status
+from fastapi.requests import HTTPConnection
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import get_settings
+from ..db import read_your_writes
 from ..db.redis import redis as redis_client
-from ..db.session import get_db
+from ..db.session import DEFAULT_BULKHEAD, ReadSessionLocal, session_factory
+from ..observability.metrics import DB_POOL_TIMEOUTS_TOTAL, DB_SESSION_REQUESTS_TOTAL
 from ..security.security import decode_token
-from ..services import session_service
+from ..services import auth_cache, session_service
 from ..services.user_service import get_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -16,9 +20,44 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
 
 
-async def get_db_dep() -> AsyncGenerator[AsyncSession, None]:
-    async for s in get_db():
-        yield s
+def bulkhead(name: str):
+    """Declare the connection pool (see db/session.BULKHEADS) a route or WebSocket uses.
+
+    Goes under the route decorator; undeclared endpoints use the default pool.
+    """
+
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.__bulkhead__ = name
+        return endpoint
+
+    return decorate
+
+
+async def get_db_dep(connection: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    name = getattr(connection.scope.get("endpoint"), "__bulkhead__", DEFAULT_BULKHEAD)
+    try:
+        async with session_factory(name)() as s:
+            s.info["bulkhead"] = name
+            try:
+                yield s
+                if ReadSessionLocal is not None:
+                    await read_your_writes.publish(
+                        redis_client, s, window_seconds=settings.READ_YOUR_WRITES_SECONDS
+                    )
+            finally:
+                route = getattr(connection.scope.get("route"), "path", "unmatched")
+                used = "true" if s.info.get("used") else "false"
+                DB_SESSION_REQUESTS_TOTAL.labels(route=route, used=used).inc()
+    except PoolTimeoutError:
+        # The bulkhead is saturated: shed this request instead of queueing behind it.
+        DB_POOL_TIMEOUTS_TOTAL.labels(bulkhead=name).inc()
+        if connection.scope["type"] != "http":
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database busy",
+            headers={"Retry-After": "1"},
+        )
 
 
 async def get_current_user(
@@ -45,23 +84,60 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication"
         )
 
-    if session_id:
-        session_id = str(session_id)
-        session = await session_service.get_session_by_sid(db, session_id)
-        if not session or session.user_id != user_id or session.revoked_at is not None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked"
-            )
-
-        if settings.SESSION_TOUCH_ENABLED:
-            await session_service.touch_session_if_due(
-                db,
-                redis=redis_client,
-                session_id=session_id,
-                ttl_seconds=settings.SESSION_TOUCH_TTL_SECONDS,
-            )
+    if not session_id:
+        user = await get_user(db, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        read_your_writes.bind_user(db, user.id)
+        return auth_cache.AuthUser.from_user(user)
+
+    session_id = str(session_id)
+    touch_ttl = settings.SESSION_TOUCH_TTL_SECONDS if settings.SESSION_TOUCH_ENABLED else 0
+    try:
+        cached, touch_due = await auth_cache.lookup(
+            redis_client, session_id, touch_ttl_seconds=touch_ttl
+        )
+        cache_reachable = True
+    except Exception:
+        cached, touch_due, cache_reachable = None, False, False
+
+    if cached is not None and cached.id == user_id:
+        # Served from Redis: the session stays unused unless the touch is due.
+        if touch_due:
+            await session_service.touch_session(db, session_id)
+        read_your_writes.bind_user(db, user_id)
+        return cached
+
+    session = await session_service.get_session_by_sid(db, session_id)
+    if not session or session.user_id != user_id or session.revoked_at is not None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked")
+    if touch_due:
+        await session_service.touch_session(db, session_id)
 
     user = await get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    current = auth_cache.AuthUser.from_user(user)
+    if cache_reachable:
+        try:
+            await auth_cache.put(redis_client, session_id, current)
+        except Exception:
+            pass
+    read_your_writes.bind_user(db, user_id)
+    return current
+
+
+async def get_read_db_dep(
+    db: AsyncSession = Depends(get_db_dep), user=Depends(get_current_user)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica, unless the caller wrote recently.
+
+    Without a replica (or inside the read-your-writes window) this is the
+    request's primary session, so no extra connection is checked out.
+    """
+    if ReadSessionLocal is None or await read_your_writes.needs_primary(redis_client, user.id):
+        yield db
+        return
+    async with ReadSessionLocal() as s:
+        s.info["replica"] = True
+        yield s
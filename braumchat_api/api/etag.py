@@ -0,0 +1,64 @@
+"""Conditional GET helpers: weak ETags and If-None-Match.
+
+Two kinds of tags: `content_etag` hashes a response that was built anyway
+(saves bandwidth only), while `version_etag` comes from a version stamp in
+Redis (see services/version_service), so a current client gets its 304
+before any query or serialization.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+from fastapi import Request, Response, status
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..services import version_service
+
+
+def content_etag(content) -> str:
+    """Weak ETag over JSON-serializable `content` (key order doesn't matter)."""
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+async def version_etag(redis: Redis, resource: str, *vary) -> str | None:
+    """Weak ETag for the current version of `resource`, or None if Redis is unavailable.
+
+    `vary` lists whatever else shapes the response (query parameters, the
+    caller for per-member views), so different views never share a tag.
+    """
+    try:
+        version = await version_service.current(redis, resource)
+    except Exception:
+        return None
+    view = hashlib.sha1(json.dumps([resource, *vary], default=str).encode()).hexdigest()[:16]
+    return f'W/"{version}-{view}"'
+
+
+def may_issue(db: AsyncSession) -> bool:
+    """Whether a body read through `db` may carry a version ETag.
+
+    A replica can lag the stamp: a page read there may miss a write whose bump
+    it would be tagged with, and clients would then get 304s for the stale
+    page until the next bump. Answering 304 to a tag the primary issued is
+    still fine on a replica-routed request.
+    """
+    return not db.info.get("replica", False)
+
+
+def matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,44 @@
+"""JSON response for hot list endpoints that return pre-shaped dicts.
+
+Routes using it still declare `response_model` so the OpenAPI schema is
+unchanged, but return `FastJSONResponse(rows)` directly: FastAPI skips
+validation and `jsonable_encoder` for Response objects, so the content must
+already match the schema. Only datetimes are converted here (ISO 8601, as
+FastAPI would). orjson is used when installed, the stdlib otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return stdlib_dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_current_user, get_db_dep
+from ...api.compression import compression
+from ...api.deps import bulkhead, get_current_user, get_db_dep
 from ...config import get_settings
 from ...db.redis import redis as redis_client
 from ...schemas.auth import LogoutRequest, Token, TokenRefreshRequest, UserSessionRead
@@ -13,7 +14,7 @@ from ...schemas.user import UserCreate, UserRead
 from ...security.client import get_client_ip
 from ...security.rate_limit import RateLimitRule, enforce_rate_limit
 from ...security.security import decode_token
-from ...services import session_service
+from ...services import auth_cache, profile_cache, session_service
 from ...services.auth_service import authenticate_user, create_tokens_for_user
 from ...services.user_service import (
     create_user,
@@ -27,6 +28,7 @@ settings = get_settings()
 
 
 @router.post("/register", response_model=UserRead)
+@bulkhead("auth")
 async def register(
     request: Request,
     payload: UserCreate,
@@ -58,10 +60,21 @@ async def register(
         password=payload.password,
         display_name=payload.display_name,
     )
+    # The new id and handle may have been cached as "no such user".
+    try:
+        await profile_cache.invalidate(
+            redis_client, user_ids=[user.id], display_names=[user.display_name]
+        )
+    except Exception:
+        pass
     return user
 
 
+# Token responses are never compressed: secrets next to attacker-influenced
+# input in a compressed body are what BREACH-style attacks exploit.
 @router.post("/login", response_model=Token)
+@compression(enabled=False)
+@bulkhead("auth")
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -77,9 +90,7 @@ async def login(
     await enforce_rate_limit(
         redis=redis_client,
         key=f"rl:auth:login:ip:{client_ip}:u:{form_data.username.strip().lower()}",
-        rule=RateLimitRule(
-            limit=settings.RATE_LIMIT_LOGIN_PER_MINUTE_PER_USER, window_seconds=60
-        ),
+        rule=RateLimitRule(limit=settings.RATE_LIMIT_LOGIN_PER_MINUTE_PER_USER, window_seconds=60),
         fail_open=settings.RATE_LIMIT_FAIL_OPEN,
     )
     user = await authenticate_user(db, form_data.username, form_data.password)
@@ -108,6 +119,8 @@ async def login(
 
 
 @router.post("/refresh", response_model=Token)
+@compression(enabled=False)
+@bulkhead("auth")
 async def refresh(
     request: Request,
     payload: TokenRefreshRequest,
@@ -151,6 +164,7 @@ async def refresh(
     )
     if not new_session:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked")
+    await auth_cache.invalidate(redis_client, str(session_id))
 
     user = await get_user(db, user_id)
     if not user:
@@ -165,6 +179,7 @@ async def refresh(
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@bulkhead("auth")
 async def logout(
     request: Request,
     payload: LogoutRequest | None = None,
@@ -213,6 +228,7 @@ async def logout(
 
     if session_id:
         await session_service.revoke_session(db, user.id, session_id)
+        await auth_cache.invalidate(redis_client, session_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -237,4 +253,5 @@ async def revoke_session(
     session = await session_service.revoke_session(db, user.id, session_id)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    await auth_cache.invalidate(redis_client, session_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
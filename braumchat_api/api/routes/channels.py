@@ -1,14 +1,21 @@
-from typing import List
+from typing import List, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...api import etag
 from ...api.deps import get_current_user, get_db_dep
 from ...db.redis import redis as redis_client
-from ...schemas.channel import ChannelCreate, ChannelRead
-from ...services import presence_service
+from ...realtime.manager import manager
+from ...schemas.channel import (
+    ChannelCreate,
+    ChannelRead,
+    ChannelReadMark,
+    ChannelUnreadState,
+    ChannelWithUnread,
+)
+from ...services import channel_service, presence_service, profile_cache, version_service
 from ...services.channel_service import create_channel, get_channel, list_channels
-from ...services.user_service import list_users_by_ids
 from ...services.workspace_service import get_workspace_member
 
 router = APIRouter()
@@ -27,17 +34,40 @@ async def create(
     ch = await create_channel(
         db, workspace_id=workspace_id, name=payload.name, is_private=payload.is_private
     )
+    try:
+        await version_service.bump(redis_client, version_service.channels_of(workspace_id))
+    except Exception:
+        pass
     return ch
 
 
-@router.get("/workspaces/{workspace_id}/channels", response_model=List[ChannelRead])
+# Plain channels lack the unread fields, so they fall through to ChannelRead.
+@router.get(
+    "/workspaces/{workspace_id}/channels",
+    response_model=Union[List[ChannelWithUnread], List[ChannelRead]],
+)
 async def list_all(
-    workspace_id: int, db: AsyncSession = Depends(get_db_dep), user=Depends(get_current_user)
+    request: Request,
+    response: Response,
+    workspace_id: int,
+    include_unread: bool = False,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
 ):
     membership = await get_workspace_member(db, workspace_id=workspace_id, user_id=user.id)
     if not membership:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return await list_channels(db, workspace_id)
+    if not include_unread:
+        # Unread counts move with every message, so only the plain list is versioned.
+        tag = await etag.version_etag(redis_client, version_service.channels_of(workspace_id))
+        if tag:
+            if etag.matches(request, tag):
+                return etag.not_modified(tag)
+            response.headers["ETag"] = tag
+        return await list_channels(db, workspace_id)
+
+    rows = await channel_service.list_channels_with_unread(db, workspace_id, user.id)
+    return [{**ChannelRead.from_orm(ch).dict(), **unread} for ch, unread in rows]
 
 
 @router.get("/{channel_id}", response_model=ChannelRead)
@@ -53,6 +83,35 @@ async def get_one(
     return ch
 
 
+@router.post("/{channel_id}/read", response_model=ChannelUnreadState)
+async def mark_read(
+    channel_id: int,
+    payload: ChannelReadMark,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    ch = await get_channel(db, channel_id)
+    if not ch:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    membership = await get_workspace_member(db, workspace_id=ch.workspace_id, user_id=user.id)
+    if not membership:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    state = await channel_service.mark_read(
+        db, channel_id=channel_id, user_id=user.id, message_id=payload.last_read_message_id
+    )
+    result = {"channel_id": channel_id, **state}
+
+    # Keep the user's other tabs/devices in sync (best-effort).
+    try:
+        await manager.broadcast(
+            f"notify:{int(user.id)}", {"type": "channel.read", "payload": result}
+        )
+    except Exception:
+        pass
+    return result
+
+
 @router.get("/{channel_id}/presence")
 async def get_channel_presence(
     channel_id: int, db: AsyncSession = Depends(get_db_dep), user=Depends(get_current_user)
@@ -69,5 +128,9 @@ async def get_channel_presence(
         redis_client, channel.workspace_id, channel.id
     )
 
-    users = await list_users_by_ids(db, online_user_ids)
-    return [{"user_id": u.id, "display_name": u.display_name} for u in users]
+    users = await profile_cache.get_many(redis_client, db, online_user_ids)
+    return [
+        {"user_id": uid, "display_name": users[uid].display_name}
+        for uid in online_user_ids
+        if uid in users
+    ]
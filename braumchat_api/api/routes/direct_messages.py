@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_current_user, get_db_dep
+from ...api.deps import bulkhead, get_current_user, get_db_dep, get_read_db_dep
+from ...api.responses import FastJSONResponse
 from ...db.redis import redis as redis_client
 from ...realtime.manager import manager
 from ...schemas.direct_message import (
@@ -13,6 +14,7 @@ from ...schemas.direct_message import (
     DirectMessageReadStatus,
     DirectMessageThreadCreate,
     DirectMessageThreadRead,
+    DirectMessageUnreadTotal,
 )
 from ...services import direct_message_service, dm_state_service
 from ...services.user_service import get_user, get_user_by_email
@@ -48,7 +50,9 @@ async def create_or_get_thread(
 
     # Best-effort: unread count is stored in Redis; if it fails, default to 0.
     try:
-        unread = await dm_state_service.get_unread(redis_client, user_id=user.id, thread_id=thread.id)
+        unread = await dm_state_service.get_unread(
+            redis_client, user_id=user.id, thread_id=thread.id, db=db
+        )
     except Exception:
         unread = 0
     return {
@@ -61,26 +65,58 @@ async def create_or_get_thread(
     }
 
 
+@router.get("/unread", response_model=DirectMessageUnreadTotal)
+async def get_unread_total(
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    """Total unread DMs for the badge; a single counter read."""
+    try:
+        total = await dm_state_service.get_total_unread(redis_client, user_id=int(user.id), db=db)
+    except Exception:
+        total = 0
+    return {"total_unread": total}
+
+
 @router.get("/threads", response_model=List[DirectMessageThreadRead])
+@bulkhead("api-read")
 async def list_threads(
+    response: Response,
     workspace_id: int | None = None,
     q: str | None = None,
     limit: int = 50,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db_dep),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db_dep),
+    primary: AsyncSession = Depends(get_db_dep),
     user=Depends(get_current_user),
 ):
     limit = max(1, min(limit, 50))
     offset = max(0, offset)
-    threads = await direct_message_service.list_threads(
-        db, user_id=user.id, workspace_id=workspace_id, query=q, limit=limit, offset=offset
-    )
+    try:
+        rows = await direct_message_service.list_threads(
+            db,
+            user_id=user.id,
+            workspace_id=workspace_id,
+            query=q,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    next_cursor = direct_message_service.next_cursor(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    # Best-effort unread lookup for returned threads.
+    # Best-effort unread lookup for returned threads. A cold user's state is
+    # warmed from the primary: Redis then trusts it for days, so it must not
+    # come from a replica that may lag.
     unread_map: dict[int, int] = {}
     try:
         unread_map = await dm_state_service.get_unread_map(
-            redis_client, user_id=user.id, thread_ids=[t.id for t in threads]
+            redis_client, user_id=user.id, thread_ids=[t.id for _, t, _ in rows], db=primary
         )
     except Exception:
         unread_map = {}
@@ -89,12 +125,15 @@ async def list_threads(
         {
             "id": t.id,
             "workspace_id": t.workspace_id,
-            "participants": [p for p in [t.user1, t.user2] if p is not None],
+            "participants": sorted([user, other], key=lambda p: p.id),
             "unread_count": int(unread_map.get(int(t.id), 0)),
+            "last_message_id": inbox.last_message_id,
+            "last_message_at": inbox.last_message_at if inbox.last_message_id else None,
+            "last_message_preview": inbox.preview,
             "created_at": t.created_at,
             "updated_at": t.updated_at,
         }
-        for t in threads
+        for inbox, t, other in rows
     ]
 
 
@@ -110,11 +149,12 @@ async def _get_thread_or_404(db: AsyncSession, thread_id: int):
     response_model=List[DirectMessageRead],
     response_model_by_alias=False,
 )
+@bulkhead("api-read")
 async def list_thread_messages(
     thread_id: int,
     limit: int = 50,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_read_db_dep),
     user=Depends(get_current_user),
 ):
     thread = await _get_thread_or_404(db, thread_id)
@@ -125,7 +165,13 @@ async def list_thread_messages(
     messages = await direct_message_service.list_messages(
         db, thread_id=thread.id, limit=limit, offset=offset
     )
-    return messages
+    authors = {
+        p.id: {"id": p.id, "display_name": p.display_name, "avatar_url": p.avatar_url}
+        for p in (thread.user1, thread.user2)
+        if p is not None
+    }
+    # Hot path: rows are shaped as DirectMessageRead and encoded without pydantic.
+    return FastJSONResponse(direct_message_service.shape_messages(messages, authors))
 
 
 @router.post(
@@ -133,6 +179,7 @@ async def list_thread_messages(
     response_model=DirectMessageRead,
     response_model_by_alias=False,
 )
+@bulkhead("realtime-write")
 async def post_thread_message(
     thread_id: int,
     payload: DirectMessageCreate,
@@ -144,16 +191,17 @@ async def post_thread_message(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not part of this thread"
         )
+    # Determine the other participant for the inbox, unread + notification.
+    other_user_id = thread.user2_id if int(thread.user1_id) == int(user.id) else thread.user1_id
+
     message = await direct_message_service.create_direct_message(
         db,
         thread_id=thread.id,
         sender_id=user.id,
         content=payload.content,
+        recipient_id=int(other_user_id),
     )
 
-    # Determine the other participant for unread + notification.
-    other_user_id = thread.user2_id if int(thread.user1_id) == int(user.id) else thread.user1_id
-
     author = message.sender
     ws_payload = {
         "id": message.id,
@@ -183,7 +231,11 @@ async def post_thread_message(
     try:
         if manager.user_connection_count(f"dm:{thread.id}", int(other_user_id)) == 0:
             await dm_state_service.increment_unread(
-                redis_client, user_id=int(other_user_id), thread_id=int(thread.id), delta=1
+                redis_client,
+                user_id=int(other_user_id),
+                thread_id=int(thread.id),
+                delta=1,
+                db=db,
             )
             await manager.broadcast(
                 f"notify:{int(other_user_id)}",
@@ -209,17 +261,21 @@ async def get_read_status(
 ):
     thread = await _get_thread_or_404(db, thread_id)
     if not direct_message_service.user_in_thread(thread, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not part of this thread")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not part of this thread"
+        )
 
     other_user_id = thread.user2_id if int(thread.user1_id) == int(user.id) else thread.user1_id
 
     try:
-        self_last = await dm_state_service.get_last_read(
-            redis_client, user_id=int(user.id), thread_id=int(thread.id)
-        )
-        other_last = await dm_state_service.get_last_read(
-            redis_client, user_id=int(other_user_id), thread_id=int(thread.id)
+        last_read = await dm_state_service.get_last_read_map(
+            redis_client,
+            thread_id=int(thread.id),
+            user_ids=[int(user.id), int(other_user_id)],
+            db=db,
         )
+        self_last = last_read[int(user.id)]
+        other_last = last_read[int(other_user_id)]
     except Exception:
         self_last = 0
         other_last = 0
@@ -243,7 +299,9 @@ async def mark_read(
 ):
     thread = await _get_thread_or_404(db, thread_id)
     if not direct_message_service.user_in_thread(thread, user.id):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not part of this thread")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not part of this thread"
+        )
 
     other_user_id = thread.user2_id if int(thread.user1_id) == int(user.id) else thread.user1_id
 
@@ -251,9 +309,15 @@ async def mark_read(
     try:
         if last_read > 0:
             last_read = await dm_state_service.set_last_read(
-                redis_client, user_id=int(user.id), thread_id=int(thread.id), message_id=last_read
+                redis_client,
+                user_id=int(user.id),
+                thread_id=int(thread.id),
+                message_id=last_read,
+                db=db,
             )
-        await dm_state_service.clear_unread(redis_client, user_id=int(user.id), thread_id=int(thread.id))
+        await dm_state_service.clear_unread(
+            redis_client, user_id=int(user.id), thread_id=int(thread.id), db=db
+        )
 
         # Broadcast read update to connected participants (best-effort)
         if last_read > 0:
@@ -269,12 +333,14 @@ async def mark_read(
 
     # Return current status snapshot
     try:
-        self_last = await dm_state_service.get_last_read(
-            redis_client, user_id=int(user.id), thread_id=int(thread.id)
-        )
-        other_last = await dm_state_service.get_last_read(
-            redis_client, user_id=int(other_user_id), thread_id=int(thread.id)
+        last_read = await dm_state_service.get_last_read_map(
+            redis_client,
+            thread_id=int(thread.id),
+            user_ids=[int(user.id), int(other_user_id)],
+            db=db,
         )
+        self_last = last_read[int(user.id)]
+        other_last = last_read[int(other_user_id)]
     except Exception:
         self_last = 0
         other_last = 0
@@ -1,33 +1,107 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_current_user, get_db_dep
+from ...api import etag
+from ...api.deps import bulkhead, get_current_user, get_db_dep, get_read_db_dep
+from ...db.redis import redis as redis_client
 from ...realtime.manager import manager
-from ...schemas.friend import FriendRequestCreate, FriendRequestRead
+from ...schemas.friend import FriendRequestCreate, FriendRequestRead, FriendSuggestion
 from ...schemas.user import UserPublic
-from ...services import friend_service
+from ...services import friend_graph_service, friend_service, profile_cache, version_service
 from ...services.user_service import get_user_by_display_name
 
 router = APIRouter(prefix="/friends", tags=["friends"])
 
 
 @router.get("/", response_model=List[UserPublic])
+@bulkhead("api-read")
 async def list_friends(
+    request: Request,
+    response: Response,
     q: str | None = None,
     limit: int = 20,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_read_db_dep),
     user=Depends(get_current_user),
 ):
     limit = max(1, min(limit, 50))
     offset = max(0, offset)
+    tag = await etag.version_etag(
+        redis_client, version_service.friends_of(user.id), q, limit, offset
+    )
+    if tag:
+        if etag.matches(request, tag):
+            return etag.not_modified(tag)
+        if etag.may_issue(db):
+            response.headers["ETag"] = tag
     return await friend_service.list_friends(
         db, user_id=user.id, query=q, limit=limit, offset=offset
     )
 
 
+@router.get("/online", response_model=List[UserPublic])
+async def list_online_friends(
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    friend_ids = await friend_graph_service.get_online_friend_ids(
+        redis_client, db, user_id=int(user.id)
+    )
+    friends = await profile_cache.get_many(redis_client, db, friend_ids)
+    return sorted(friends.values(), key=lambda u: (u.display_name or "").lower())
+
+
+@router.get("/suggestions", response_model=List[FriendSuggestion])
+async def list_suggestions(
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    limit = max(1, min(limit, 50))
+    scored = await friend_graph_service.get_suggestions(
+        redis_client, db, user_id=int(user.id), limit=limit
+    )
+    users = await profile_cache.get_many(redis_client, db, [uid for uid, _ in scored])
+    return [
+        {"user": users[uid], "mutual_friends": mutual} for uid, mutual in scored if uid in users
+    ]
+
+
+@router.delete("/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_friend(
+    friend_id: int,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    removed = await friend_service.remove_friendship(db, user_a=user.id, user_b=friend_id)
+    if not removed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not friends")
+
+    # Best-effort: a cold or unreachable graph reloads from Postgres later.
+    try:
+        await friend_graph_service.remove_friendship(
+            redis_client, user_a=int(user.id), user_b=friend_id, db=db
+        )
+    except Exception:
+        pass
+    try:
+        await version_service.bump(
+            redis_client,
+            version_service.friends_of(user.id),
+            version_service.friends_of(friend_id),
+        )
+    except Exception:
+        pass
+
+    await manager.broadcast(
+        f"notify:{friend_id}",
+        {"type": "friend.removed", "payload": {"user_id": user.id}},
+    )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.post("/requests", response_model=FriendRequestRead)
 async def create_request(
     payload: FriendRequestCreate,
@@ -101,6 +175,21 @@ async def accept(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
+    try:
+        await friend_graph_service.add_friendship(
+            redis_client, user_a=int(req.requester_id), user_b=int(req.addressee_id), db=db
+        )
+    except Exception:
+        pass
+    try:
+        await version_service.bump(
+            redis_client,
+            version_service.friends_of(req.requester_id),
+            version_service.friends_of(req.addressee_id),
+        )
+    except Exception:
+        pass
+
     await manager.broadcast(
         f"notify:{req.requester_id}",
         {
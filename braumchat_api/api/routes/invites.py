@@ -1,12 +1,14 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...api import etag
 from ...api.deps import get_current_user, get_db_dep
+from ...db.redis import redis as redis_client
 from ...realtime.manager import manager
 from ...schemas.invite import WorkspaceInviteRead
-from ...services import invite_service
+from ...services import invite_service, version_service
 
 router = APIRouter()
 
@@ -33,9 +35,16 @@ def _to_read(invite) -> dict:
 
 @router.get("/incoming", response_model=List[WorkspaceInviteRead])
 async def list_incoming(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db_dep),
     user=Depends(get_current_user),
 ):
+    tag = await etag.version_etag(redis_client, version_service.invites_of(user.id))
+    if tag:
+        if etag.matches(request, tag):
+            return etag.not_modified(tag)
+        response.headers["ETag"] = tag
     invites = await invite_service.list_incoming_invites(db, user_id=user.id)
     return [_to_read(i) for i in invites]
 
@@ -54,6 +63,14 @@ async def accept_invite(
         invite = await invite_service.accept_invite(db, invite=invite, user_id=user.id)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    try:
+        await version_service.bump(
+            redis_client,
+            version_service.invites_of(user.id),
+            version_service.workspaces_of(user.id),
+        )
+    except Exception:
+        pass
 
     await manager.broadcast(
         f"notify:{invite.inviter_user_id}",
@@ -77,6 +94,10 @@ async def decline_invite(
         invite = await invite_service.decline_invite(db, invite=invite, user_id=user.id)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    try:
+        await version_service.bump(redis_client, version_service.invites_of(user.id))
+    except Exception:
+        pass
 
     await manager.broadcast(
         f"notify:{invite.inviter_user_id}",
@@ -1,17 +1,21 @@
+from dataclasses import asdict
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_current_user, get_db_dep
+from ...api import etag
+from ...api.deps import bulkhead, get_current_user, get_db_dep, get_read_db_dep
+from ...api.responses import FastJSONResponse
 from ...config import get_settings
 from ...db.redis import redis as redis_client
 from ...models.channel import Channel
 from ...realtime.manager import manager
 from ...schemas.message import MessageCreate, MessageRead
 from ...security.rate_limit import RateLimitRule, enforce_rate_limit
-from ...services.message_service import create_message, list_messages
+from ...services import profile_cache, version_service
+from ...services.message_service import create_message, list_messages, shape_messages
 from ...services.workspace_service import get_workspace_member
 
 router = APIRouter()
@@ -23,10 +27,12 @@ settings = get_settings()
     response_model=List[MessageRead],
     response_model_by_alias=False,
 )
+@bulkhead("api-read")
 async def get_messages(
+    request: Request,
     channel_id: int,
     limit: int = 50,
-    db: AsyncSession = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_read_db_dep),
     user=Depends(get_current_user),
 ):
     channel = await db.get(Channel, channel_id)
@@ -35,7 +41,18 @@ async def get_messages(
     membership = await get_workspace_member(db, workspace_id=channel.workspace_id, user_id=user.id)
     if not membership:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return await list_messages(db, channel_id=channel_id, limit=limit)
+    tag = await etag.version_etag(redis_client, version_service.messages_of(channel_id), limit)
+    if tag and etag.matches(request, tag):
+        return etag.not_modified(tag)
+    if not etag.may_issue(db):
+        tag = None
+    messages = await list_messages(db, channel_id=channel_id, limit=limit)
+    authors = await profile_cache.get_many(redis_client, db, {m["user_id"] for m in messages})
+    # Hot path: rows are shaped as MessageRead and encoded without pydantic.
+    return FastJSONResponse(
+        shape_messages(messages, {uid: asdict(p) for uid, p in authors.items()}),
+        headers={"ETag": tag} if tag else None,
+    )
 
 
 @router.post(
@@ -43,6 +60,7 @@ async def get_messages(
     response_model=MessageRead,
     response_model_by_alias=False,
 )
+@bulkhead("realtime-write")
 async def post_message(
     channel_id: int,
     payload: MessageCreate,
@@ -65,17 +83,20 @@ async def post_message(
         fail_open=settings.RATE_LIMIT_FAIL_OPEN,
     )
     msg = await create_message(db, channel_id=channel_id, user_id=user.id, content=payload.content)
+    try:
+        await version_service.bump(redis_client, version_service.messages_of(channel_id))
+    except Exception:
+        pass
 
-    author = msg.user
     ws_payload = {
         "id": msg.id,
         "content": msg.content,
         "client_id": payload.client_id,
         "user_id": msg.user_id,
         "author": {
-            "id": author.id,
-            "display_name": author.display_name,
-            "avatar_url": author.avatar_url,
+            "id": user.id,
+            "display_name": user.display_name,
+            "avatar_url": user.avatar_url,
         },
         "channel_id": msg.channel_id,
         "created_at": msg.created_at.isoformat() if msg.created_at else None,
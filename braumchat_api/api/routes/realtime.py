@@ -1,17 +1,23 @@
 import asyncio
 import logging
+import time
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_db_dep
+from ...api.deps import bulkhead, get_db_dep
 from ...config import get_settings
+from ...db import read_your_writes
 from ...db.redis import redis as redis_client
+from ...realtime import admission
+from ...realtime.idle import idle_sweeper
 from ...realtime.manager import manager
 from ...security.client import get_client_ip_from_scope
 from ...security.rate_limit import RateLimitRule, enforce_rate_limit
-from ...services import direct_message_service, dm_state_service, presence_service
+from ...security.security import decode_token
+from ...services import direct_message_service, dm_state_service, presence_service, version_service
 from ...services.message_service import create_message
+from ...services.user_service import get_user
 
 router = APIRouter()
 
@@ -19,17 +25,27 @@ settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
-# If the client stops sending (e.g., laptop sleep / tab killed), the TCP connection
-# can take a long time to be detected. We require lightweight client pings and
-# close the socket if we don't receive anything within this window.
-WS_CLIENT_IDLE_TIMEOUT_SECONDS = 25
+
+@router.get("/realtime/load", tags=["health"])
+async def realtime_load(response: Response):
+    """This worker's socket load, for load balancers; 503 while it refuses new sockets."""
+    report = admission.load_report(manager)
+    if not report["accepting"]:
+        response.status_code = 503
+    return report
 
 
 @router.websocket("/ws/notifications")
+@bulkhead("realtime-write")
 async def ws_notifications(
     websocket: WebSocket,
     db: AsyncSession = Depends(get_db_dep),
 ):
+    # Shed before authenticating: refusing must not cost a database lookup.
+    reason = admission.refusal(manager)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
     try:
         ip = get_client_ip_from_scope(
             websocket.scope, trust_proxy_headers=settings.TRUST_PROXY_HEADERS
@@ -50,9 +66,6 @@ async def ws_notifications(
         return
 
     try:
-        from ...security.security import decode_token
-        from ...services.user_service import get_user
-
         payload = decode_token(token)
         if payload.get("typ") == "refresh":
             raise ValueError()
@@ -71,21 +84,22 @@ async def ws_notifications(
     # WebSockets keep the DB session open; make sure we don't hold an idle transaction.
     await db.rollback()
 
+    reason = admission.refusal(manager, user_id=user_id)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
+
     channel_key = f"notify:{user_id}"
-    await manager.connect(channel_key, websocket, user_id=user_id)
+    conn = await manager.connect(channel_key, websocket, user_id=user_id)
     await presence_service.online_connect(redis_client, user_id)
     heartbeat_task = asyncio.create_task(presence_service.online_heartbeat(redis_client, user_id))
 
+    # Clients ping; idle_sweeper closes sockets that go quiet.
+    idle_sweeper.track(conn)
     try:
-        while True:
-            # Keep connection open; client may send pings or nothing.
-            try:
-                await asyncio.wait_for(
-                    websocket.receive_text(), timeout=WS_CLIENT_IDLE_TIMEOUT_SECONDS
-                )
-            except asyncio.TimeoutError:
-                await websocket.close(code=1001)
-                break
+        while not conn.closed:
+            await websocket.receive_text()
+            conn.last_seen = time.monotonic()
     except WebSocketDisconnect:
         pass
     except Exception:
@@ -96,17 +110,25 @@ async def ws_notifications(
             await heartbeat_task
         except asyncio.CancelledError:
             pass
-        await presence_service.online_disconnect(redis_client, user_id)
         await manager.disconnect(channel_key, websocket)
+        # A drain clears presence for its sockets in bulk.
+        if not conn.released:
+            await presence_service.online_disconnect(redis_client, user_id)
 
 
 @router.websocket("/ws/chat/{workspace_id}/{channel_id}")
+@bulkhead("realtime-write")
 async def ws_channel(
     websocket: WebSocket,
     workspace_id: int,
     channel_id: int,
     db: AsyncSession = Depends(get_db_dep),
 ):
+    # Shed before authenticating: refusing must not cost a database lookup.
+    reason = admission.refusal(manager)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
     try:
         ip = get_client_ip_from_scope(
             websocket.scope, trust_proxy_headers=settings.TRUST_PROXY_HEADERS
@@ -127,9 +149,6 @@ async def ws_channel(
         return
 
     try:
-        from ...security.security import decode_token
-        from ...services.user_service import get_user
-
         payload = decode_token(token)
         if payload.get("typ") == "refresh":
             raise ValueError()
@@ -146,25 +165,32 @@ async def ws_channel(
         await websocket.close(code=1008)
         return
 
+    # Messages sent here must keep the author's REST reads on the primary.
+    read_your_writes.bind_user(db, user_id)
+
     # WebSockets keep the DB session open; make sure we don't hold an idle transaction.
     await db.rollback()
 
+    reason = admission.refusal(manager, user_id=user_id)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
+
     channel_key = f"chat:w:{workspace_id}:c:{channel_id}"
 
-    await manager.connect(channel_key, websocket, user_id=user_id)
+    conn = await manager.connect(
+        channel_key, websocket, user_id=user_id, presence_channel=(workspace_id, channel_id)
+    )
     await presence_service.online_connect(redis_client, user_id)
     heartbeat_task = asyncio.create_task(presence_service.online_heartbeat(redis_client, user_id))
     await presence_service.add_user(redis_client, workspace_id, channel_id, user_id)
 
+    idle_sweeper.track(conn)
     try:
-        while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_json(), timeout=WS_CLIENT_IDLE_TIMEOUT_SECONDS
-                )
-            except asyncio.TimeoutError:
-                await websocket.close(code=1001)
-                break
+        # Stop once the sweeper or a drain has closed the socket under us.
+        while not conn.closed:
+            data = await websocket.receive_json()
+            conn.last_seen = time.monotonic()
 
             msg_type = data.get("type")
 
@@ -181,6 +207,16 @@ async def ws_channel(
                 msg = await create_message(
                     db, channel_id=channel_id, user_id=user_id, content=content
                 )
+                # The socket may stay open for hours: share the write now.
+                await read_your_writes.publish(
+                    redis_client, db, window_seconds=settings.READ_YOUR_WRITES_SECONDS
+                )
+                try:
+                    await version_service.bump(
+                        redis_client, version_service.messages_of(channel_id)
+                    )
+                except Exception:
+                    pass
 
                 author = {
                     "id": user_id,
@@ -205,9 +241,6 @@ async def ws_channel(
                     channel_key,
                     {"type": "message", "payload": payload},
                 )
-
-                # `create_message()` ends with a SELECT; rollback to release locks.
-                await db.rollback()
             elif msg_type == "typing":
                 logger.info(
                     "ws channel typing workspace=%s channel=%s from_user=%s is_typing=%s",
@@ -235,17 +268,24 @@ async def ws_channel(
             await heartbeat_task
         except asyncio.CancelledError:
             pass
-        await presence_service.online_disconnect(redis_client, user_id)
         await manager.disconnect(channel_key, websocket)
-        await presence_service.remove_user(redis_client, workspace_id, channel_id, user_id)
+        if not conn.released:
+            await presence_service.online_disconnect(redis_client, user_id)
+            await presence_service.remove_user(redis_client, workspace_id, channel_id, user_id)
 
 
 @router.websocket("/ws/dm/{thread_id}")
+@bulkhead("realtime-write")
 async def ws_direct_message(
     websocket: WebSocket,
     thread_id: int,
     db: AsyncSession = Depends(get_db_dep),
 ):
+    # Shed before authenticating: refusing must not cost a database lookup.
+    reason = admission.refusal(manager)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
     try:
         ip = get_client_ip_from_scope(
             websocket.scope, trust_proxy_headers=settings.TRUST_PROXY_HEADERS
@@ -266,9 +306,6 @@ async def ws_direct_message(
         return
 
     try:
-        from ...security.security import decode_token
-        from ...services.user_service import get_user
-
         payload = decode_token(token)
         if payload.get("typ") == "refresh":
             raise ValueError()
@@ -285,6 +322,9 @@ async def ws_direct_message(
         await websocket.close(code=1008)
         return
 
+    # Messages sent here must keep the author's REST reads on the primary.
+    read_your_writes.bind_user(db, user_id)
+
     # WebSockets keep the DB session open; make sure we don't hold an idle transaction.
     await db.rollback()
 
@@ -299,8 +339,13 @@ async def ws_direct_message(
 
     await db.rollback()
 
+    reason = admission.refusal(manager, user_id=user_id)
+    if reason is not None:
+        await admission.refuse(websocket, reason)
+        return
+
     channel_key = f"dm:{thread_id}"
-    await manager.connect(channel_key, websocket, user_id=user_id)
+    conn = await manager.connect(channel_key, websocket, user_id=user_id)
     await presence_service.online_connect(redis_client, user_id)
     heartbeat_task = asyncio.create_task(presence_service.online_heartbeat(redis_client, user_id))
 
@@ -315,15 +360,11 @@ async def ws_direct_message(
 
     other_user_id = thread_user2_id if thread_user1_id == int(user_id) else thread_user1_id
 
+    idle_sweeper.track(conn)
     try:
-        while True:
-            try:
-                data = await asyncio.wait_for(
-                    websocket.receive_json(), timeout=WS_CLIENT_IDLE_TIMEOUT_SECONDS
-                )
-            except asyncio.TimeoutError:
-                await websocket.close(code=1001)
-                break
+        while not conn.closed:
+            data = await websocket.receive_json()
+            conn.last_seen = time.monotonic()
 
             msg_type = data.get("type")
 
@@ -341,6 +382,10 @@ async def ws_direct_message(
                     thread_id=thread_id,
                     sender_id=user_id,
                     content=content,
+                    recipient_id=other_user_id,
+                )
+                await read_your_writes.publish(
+                    redis_client, db, window_seconds=settings.READ_YOUR_WRITES_SECONDS
                 )
 
                 author = {
@@ -372,6 +417,7 @@ async def ws_direct_message(
                             user_id=int(other_user_id),
                             thread_id=int(thread_id),
                             delta=1,
+                            db=db,
                         )
                         await manager.broadcast(
                             f"notify:{int(other_user_id)}",
@@ -423,12 +469,15 @@ async def ws_direct_message(
                         user_id=int(user_id),
                         thread_id=int(thread_id),
                         message_id=int(last_read_int),
+                        db=db,
                     )
                     await dm_state_service.clear_unread(
-                        redis_client, user_id=int(user_id), thread_id=int(thread_id)
+                        redis_client, user_id=int(user_id), thread_id=int(thread_id), db=db
                     )
                 except Exception:
                     pass
+                # Warming cold read state may have opened a transaction; release it.
+                await db.rollback()
 
                 await manager.broadcast(
                     channel_key,
@@ -451,12 +500,13 @@ async def ws_direct_message(
         # Disconnect first so broadcasts won't include the closing websocket.
         await manager.disconnect(channel_key, websocket)
 
-        remaining = await presence_service.online_disconnect(redis_client, user_id)
-        if remaining == 0:
-            await manager.broadcast(
-                channel_key,
-                {
-                    "type": "presence",
-                    "payload": {"user_id": user_id, "online": False},
-                },
-            )
+        if not conn.released:
+            remaining = await presence_service.online_disconnect(redis_client, user_id)
+            if remaining == 0:
+                await manager.broadcast(
+                    channel_key,
+                    {
+                        "type": "presence",
+                        "payload": {"user_id": user_id, "online": False},
+                    },
+                )
@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...api.deps import bulkhead, get_current_user, get_db_dep
+from ...schemas.direct_message import DirectMessageRead
+from ...schemas.message import MessageRead
+from ...services import search_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+NDJSON = "application/x-ndjson"
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_STREAM_RESULTS = 1000
+
+
+async def _respond(
+    request: Request,
+    response: Response,
+    search,
+    schema: type[BaseModel],
+    db: AsyncSession,
+    *,
+    limit: int | None,
+    cursor: str | None,
+    filters: dict,
+):
+    """One keyset page as JSON, or every match as NDJSON when the client asks for it."""
+    try:
+        if NDJSON in request.headers.get("accept", ""):
+            rows = await search_service.open_stream(
+                search,
+                db,
+                max_results=limit or DEFAULT_STREAM_RESULTS,
+                cursor=cursor,
+                **filters,
+            )
+
+            async def lines():
+                async for row in rows:
+                    yield schema.from_orm(row).json(by_alias=False) + "\n"
+
+            return StreamingResponse(lines(), media_type=NDJSON)
+
+        limit = max(1, min(limit or DEFAULT_PAGE_SIZE, search_service.MAX_PAGE_SIZE))
+        rows = await search(db, cursor=cursor, limit=limit, **filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    next_cursor = search_service.next_cursor(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.get("/messages", response_model=List[MessageRead], response_model_by_alias=False)
+@bulkhead("api-read")
+async def search_messages(
+    request: Request,
+    response: Response,
+    q: str,
+    workspace_id: int | None = None,
+    channel_id: int | None = None,
+    author_id: int | None = None,
+    after: datetime | None = None,
+    before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    """Channel messages in the caller's workspaces, newest first."""
+    return await _respond(
+        request,
+        response,
+        search_service.search_channel_messages,
+        MessageRead,
+        db,
+        limit=limit,
+        cursor=cursor,
+        filters={
+            "user_id": user.id,
+            "query": q,
+            "workspace_id": workspace_id,
+            "channel_id": channel_id,
+            "author_id": author_id,
+            "after": after,
+            "before": before,
+        },
+    )
+
+
+@router.get("/dm", response_model=List[DirectMessageRead], response_model_by_alias=False)
+@bulkhead("api-read")
+async def search_direct_messages(
+    request: Request,
+    response: Response,
+    q: str,
+    thread_id: int | None = None,
+    author_id: int | None = None,
+    after: datetime | None = None,
+    before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int | None = None,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    """Direct messages in threads the caller takes part in, newest first."""
+    return await _respond(
+        request,
+        response,
+        search_service.search_direct_messages,
+        DirectMessageRead,
+        db,
+        limit=limit,
+        cursor=cursor,
+        filters={
+            "user_id": user.id,
+            "query": q,
+            "thread_id": thread_id,
+            "author_id": author_id,
+            "after": after,
+            "before": before,
+        },
+    )
@@ -1,16 +1,20 @@
+from dataclasses import asdict
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.deps import get_current_user, get_db_dep
+from ...api import etag
+from ...api.deps import bulkhead, get_current_user, get_db_dep, get_read_db_dep
 from ...db.redis import redis as redis_client
-from ...schemas.user import UserPublic
-from ...services import presence_service
-from ...services.user_service import get_user_by_display_name, search_users_by_display_name
+from ...schemas.user import UserBatchRequest, UserPublic
+from ...services import friend_graph_service, presence_service, profile_cache
+from ...services.user_service import search_users_by_display_name
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+BATCH_MAX_IDS = 500
+
 
 @router.get("/by-username/{username}", response_model=UserPublic)
 async def by_username(
@@ -19,7 +23,7 @@ async def by_username(
     user=Depends(get_current_user),
 ):
     # compat: endpoint antigo — agora resolve por display_name
-    found = await get_user_by_display_name(db, username)
+    found = await profile_cache.resolve_display_name(redis_client, db, username)
     if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return found
@@ -31,21 +35,22 @@ async def by_display_name(
     db: AsyncSession = Depends(get_db_dep),
     user=Depends(get_current_user),
 ):
-    found = await get_user_by_display_name(db, display_name)
+    found = await profile_cache.resolve_display_name(redis_client, db, display_name)
     if not found:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return found
 
 
 @router.get("/search", response_model=List[UserPublic])
+@bulkhead("api-read")
 async def search(
     q: str,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_read_db_dep),
     user=Depends(get_current_user),
 ):
     limit = max(1, min(limit, 50))
-    return await search_users_by_display_name(db, query=q, limit=limit)
+    return await search_users_by_display_name(db, query=q, limit=limit, viewer_id=user.id)
 
 
 @router.get("/online")
@@ -65,3 +70,63 @@ async def online(
 
     online_map = await presence_service.get_online_map(redis_client, user_ids)
     return [{"user_id": uid, "online": bool(online_map.get(uid, False))} for uid in user_ids]
+
+
+async def _batch(request: Request, response: Response, db: AsyncSession, user_ids: list[int]):
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_MAX_IDS} ids per request",
+        )
+    found = await profile_cache.get_many(redis_client, db, user_ids)
+    # Request order, minus unknown ids, so the same ids always give the same body.
+    profiles = [asdict(found[uid]) for uid in user_ids if uid in found]
+    tag = etag.content_etag(profiles)
+    if etag.matches(request, tag):
+        return etag.not_modified(tag)
+    response.headers["ETag"] = tag
+    return profiles
+
+
+@router.get("/batch", response_model=List[UserPublic])
+async def batch(
+    request: Request,
+    response: Response,
+    ids: str,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    """Public profiles for a comma-separated list of user IDs, in request order."""
+    try:
+        user_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user id")
+    return await _batch(request, response, db, user_ids)
+
+
+@router.post("/batch", response_model=List[UserPublic])
+async def batch_post(
+    request: Request,
+    response: Response,
+    payload: UserBatchRequest,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    """Same as GET /users/batch, for id lists too long for a URL."""
+    return await _batch(request, response, db, payload.ids)
+
+
+@router.get("/{user_id}/mutual-friends", response_model=List[UserPublic])
+async def mutual_friends(
+    user_id: int,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    if not await profile_cache.get(redis_client, db, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    mutual_ids = await friend_graph_service.get_mutual_friend_ids(
+        redis_client, db, user_id=int(user.id), other_id=user_id
+    )
+    mutual = await profile_cache.get_many(redis_client, db, mutual_ids)
+    return sorted(mutual.values(), key=lambda u: (u.display_name or "").lower())
@@ -1,14 +1,16 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...api import etag
 from ...api.deps import get_current_user, get_db_dep
+from ...db.redis import redis as redis_client
 from ...realtime.manager import manager
 from ...schemas.invite import WorkspaceInviteCreate, WorkspaceInviteRead
 from ...schemas.workspace import WorkspaceCreate, WorkspaceRead
-from ...services import invite_service
+from ...services import invite_service, version_service
 from ...services.user_service import get_user_by_display_name
 from ...services.workspace_service import (
     create_workspace,
@@ -27,11 +29,25 @@ async def create(
     user=Depends(get_current_user),
 ):
     ws = await create_workspace(db, owner_id=user.id, name=payload.name, slug=payload.slug)
+    try:
+        await version_service.bump(redis_client, version_service.workspaces_of(user.id))
+    except Exception:
+        pass
     return ws
 
 
 @router.get("/", response_model=List[WorkspaceRead])
-async def list_all(db: AsyncSession = Depends(get_db_dep), user=Depends(get_current_user)):
+async def list_all(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_dep),
+    user=Depends(get_current_user),
+):
+    tag = await etag.version_etag(redis_client, version_service.workspaces_of(user.id))
+    if tag:
+        if etag.matches(request, tag):
+            return etag.not_modified(tag)
+        response.headers["ETag"] = tag
     return await list_workspaces(db, user.id)
 
 
@@ -83,6 +99,10 @@ async def invite_user(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invite already pending"
         )
+    try:
+        await version_service.bump(redis_client, version_service.invites_of(invitee.id))
+    except Exception:
+        pass
 
     # realtime notify invitee
     await manager.broadcast(
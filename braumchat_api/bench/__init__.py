@@ -0,0 +1 @@
+"""Benchmark suites (see `python -m braumchat_api.bench --help`)."""
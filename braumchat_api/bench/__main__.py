@@ -0,0 +1,32 @@
+"""Benchmark runner: `python -m braumchat_api.bench <suite> [options]`."""
+
+from __future__ import annotations
+
+import argparse
+
+from . import handles, idle, realtime, rest, serialization, startup
+
+SUITES = {
+    "handles": handles,
+    "idle": idle,
+    "realtime": realtime,
+    "rest": rest,
+    "serialization": serialization,
+    "startup": startup,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m braumchat_api.bench")
+    subparsers = parser.add_subparsers(dest="suite", required=True)
+    for name, module in SUITES.items():
+        sub = subparsers.add_parser(name, help=(module.__doc__ or "").strip().splitlines()[0])
+        module.add_arguments(sub)
+        sub.set_defaults(_module=module)
+
+    args = parser.parse_args(argv)
+    args._module.run(args)
+
+
+if __name__ == "__main__":
+    main()
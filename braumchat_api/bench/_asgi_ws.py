@@ -0,0 +1,73 @@
+"""In-process WebSocket client that talks to an ASGI app directly.
+
+No sockets or event-loop hops through a server: frames are passed through
+asyncio queues, so the numbers reflect the app's own handling and fan-out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from urllib.parse import urlencode
+
+_ports = itertools.count(20000)
+
+
+class WebSocketClosed(Exception):
+    def __init__(self, code: int | None) -> None:
+        super().__init__(f"websocket closed (code={code})")
+        self.code = code
+
+
+class AsgiWebSocket:
+    def __init__(self, app, path: str, *, query: dict[str, str] | None = None) -> None:
+        self._app = app
+        self._path = path
+        self._query = urlencode(query or {}).encode("ascii")
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self.close_code: int | None = None
+
+    async def connect(self) -> None:
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": self._path,
+            "raw_path": self._path.encode("ascii"),
+            "query_string": self._query,
+            "root_path": "",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", next(_ports)),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self._task = asyncio.create_task(self._app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            self.close_code = message.get("code")
+            raise WebSocketClosed(self.close_code)
+
+    async def send_json(self, data: dict) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self) -> dict:
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            self.close_code = message.get("code")
+            raise WebSocketClosed(self.close_code)
+        return json.loads(message.get("text") or message.get("bytes") or "null")
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+        self._task = None
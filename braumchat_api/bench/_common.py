@@ -0,0 +1,108 @@
+"""Shared helpers for the benchmark runners.
+
+Benchmarks import the app lazily: settings are read at import time, so the
+environment must be prepared (see `prepare_env`) before `braumchat_api.main`
+or any route module is imported.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+
+def prepare_env(database_url: str | None) -> str:
+    """Point the app at a benchmark database and lift per-IP rate limits.
+
+    Every simulated client shares one address, so the production limits would
+    throttle the benchmark itself rather than the code under test.
+    """
+
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="braumchat-bench-"), "bench.db")
+        database_url = f"sqlite+aiosqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    for name in (
+        "RATE_LIMIT_HTTP_PER_MINUTE",
+        "RATE_LIMIT_WS_CONNECT_PER_MINUTE",
+        "RATE_LIMIT_LOGIN_PER_MINUTE",
+        "RATE_LIMIT_LOGIN_PER_MINUTE_PER_USER",
+        "RATE_LIMIT_POST_MESSAGE_PER_10_SECONDS",
+    ):
+        os.environ[name] = str(10**9)
+    return database_url
+
+
+def install_redis(redis_url: str | None):
+    """Swap the shared Redis client before route modules bind it.
+
+    Route modules do `from ..db.redis import redis as redis_client` at import
+    time, so this must run after `prepare_env` and before importing the app.
+    """
+
+    from ..db import redis as redis_module
+
+    if redis_url:
+        from redis import asyncio as redis_asyncio
+
+        client = redis_asyncio.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    else:
+        from ._memory_redis import MemoryRedis
+
+        client = MemoryRedis()
+    redis_module.redis = client
+    return client
+
+
+def percentiles(samples: Iterable[float], points=(50, 95, 99)) -> dict[str, float | None]:
+    data = sorted(samples)
+    out: dict[str, float | None] = {}
+    for p in points:
+        if not data:
+            out[f"p{p}"] = None
+            continue
+        # Nearest-rank percentile.
+        rank = max(1, math.ceil(p / 100.0 * len(data)))
+        out[f"p{p}"] = round(data[rank - 1], 3)
+    out["max"] = round(data[-1], 3) if data else None
+    return out
+
+
+def rss_kb() -> int:
+    """Current resident set size in KiB (falls back to peak RSS off Linux)."""
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB.
+    return int(peak / 1024) if sys.platform == "darwin" else int(peak)
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output and output != "-":
+        with open(output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
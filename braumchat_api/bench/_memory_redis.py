@@ -0,0 +1,207 @@
+"""Minimal in-memory stand-in for the redis.asyncio commands the app uses.
+
+Only for benchmarks that run without a Redis server; it has no persistence,
+no Lua scripting and no cross-process visibility. Pass `--redis-url` to a
+benchmark to measure against a real server instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+
+class MemoryRedis:
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._subscribers: list["_MemoryPubSub"] = []
+
+    # -- keyspace ---------------------------------------------------------
+    def _alive(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _get(self, key: str, factory):
+        if not self._alive(key):
+            self._data[key] = factory()
+        return self._data[key]
+
+    async def ping(self) -> bool:
+        return True
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for k in keys if self._alive(k))
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for k in keys:
+            if self._alive(k):
+                removed += 1
+            self._data.pop(k, None)
+            self._expires.pop(k, None)
+        return removed
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    # -- strings ----------------------------------------------------------
+    async def get(self, key: str):
+        return self._data.get(key) if self._alive(key) else None
+
+    async def mget(self, *keys):
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = tuple(keys[0])
+        return [await self.get(k) for k in keys]
+
+    async def set(self, key: str, value, ex: int | None = None, nx: bool = False):
+        if nx and self._alive(key):
+            return None
+        self._data[key] = str(value)
+        self._expires.pop(key, None)
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        return True
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._data.get(key, 0) if self._alive(key) else 0) + int(amount)
+        self._data[key] = str(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    async def decr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, -amount)
+
+    # -- hashes -----------------------------------------------------------
+    async def hincrby(self, key: str, field, amount: int = 1) -> int:
+        h = self._get(key, dict)
+        h[str(field)] = str(int(h.get(str(field), 0)) + int(amount))
+        return int(h[str(field)])
+
+    async def hget(self, key: str, field):
+        return self._get(key, dict).get(str(field)) if self._alive(key) else None
+
+    async def hmget(self, key: str, fields, *args):
+        names = list(fields) if isinstance(fields, (list, tuple)) else [fields, *args]
+        h = self._data.get(key, {}) if self._alive(key) else {}
+        return [h.get(str(f)) for f in names]
+
+    async def hset(self, key: str, field=None, value=None, mapping=None) -> int:
+        h = self._get(key, dict)
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(1 for f in items if str(f) not in h)
+        h.update({str(f): str(v) for f, v in items.items()})
+        return added
+
+    async def hdel(self, key: str, *fields) -> int:
+        h = self._data.get(key, {}) if self._alive(key) else {}
+        return sum(1 for f in fields if h.pop(str(f), None) is not None)
+
+    async def hgetall(self, key: str) -> dict:
+        return dict(self._data.get(key, {})) if self._alive(key) else {}
+
+    # -- sets -------------------------------------------------------------
+    async def sadd(self, key: str, *members) -> int:
+        s = self._get(key, set)
+        before = len(s)
+        s.update(str(m) for m in members)
+        return len(s) - before
+
+    async def srem(self, key: str, *members) -> int:
+        s = self._data.get(key, set()) if self._alive(key) else set()
+        before = len(s)
+        s.difference_update(str(m) for m in members)
+        return before - len(s)
+
+    async def smembers(self, key: str) -> set:
+        return set(self._data.get(key, set())) if self._alive(key) else set()
+
+    # -- sorted sets ------------------------------------------------------
+    async def zadd(self, key: str, mapping: dict) -> int:
+        z = self._get(key, dict)
+        added = sum(1 for m in mapping if str(m) not in z)
+        z.update({str(m): float(score) for m, score in mapping.items()})
+        return added
+
+    async def zrem(self, key: str, *members) -> int:
+        z = self._data.get(key, {}) if self._alive(key) else {}
+        return sum(1 for m in members if z.pop(str(m), None) is not None)
+
+    async def zremrangebyscore(self, key: str, min, max) -> int:
+        z = self._data.get(key, {}) if self._alive(key) else {}
+        low, high = float(min), float(max)
+        doomed = [m for m, score in z.items() if low <= score <= high]
+        for m in doomed:
+            del z[m]
+        return len(doomed)
+
+    # -- pipelines --------------------------------------------------------
+    def pipeline(self, transaction: bool = True) -> "_MemoryPipeline":
+        return _MemoryPipeline(self)
+
+    # -- pub/sub (this process only) ----------------------------------------
+    def pubsub(self) -> "_MemoryPubSub":
+        return _MemoryPubSub(self)
+
+    async def publish(self, channel: str, message) -> int:
+        receivers = [s for s in self._subscribers if channel in s.channels]
+        for subscriber in receivers:
+            subscriber.queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(receivers)
+
+
+class _MemoryPipeline:
+    def __init__(self, redis: MemoryRedis) -> None:
+        self._redis = redis
+        self._calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not hasattr(self._redis, name):
+            raise AttributeError(name)
+
+        def _stage(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return _stage
+
+    async def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [await getattr(self._redis, name)(*a, **kw) for name, a, kw in calls]
+
+    async def __aenter__(self) -> "_MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._calls = []
+
+
+class _MemoryPubSub:
+    def __init__(self, redis: MemoryRedis) -> None:
+        self._redis = redis
+        self.channels: set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        self.channels.update(channels)
+        if self not in self._redis._subscribers:
+            self._redis._subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self) -> None:
+        if self in self._redis._subscribers:
+            self._redis._subscribers.remove(self)
@@ -0,0 +1,103 @@
+"""Handle allocation benchmark: `python -m braumchat_api.bench handles`.
+
+Fills one base display name with `--existing` users (9,000 of the 10,000
+discriminators by default), then registers `--registrations` more under the
+same base and reports allocation latency, SQL statements per registration and
+how many inserts had to retry, as JSON. Password hashing is skipped so the
+numbers isolate the allocator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from ._common import environment, percentiles, prepare_env, write_report
+
+INSERT_CHUNK = 1000
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--base", default="popular", help="base display name to crowd")
+    parser.add_argument("--existing", type=int, default=9000, help="codes already taken")
+    parser.add_argument("--registrations", type=int, default=200)
+    parser.add_argument("--database-url", default=None, help="defaults to a temp SQLite file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    database_url = prepare_env(args.database_url)
+    report = asyncio.run(_run(args))
+    report["scenario"]["database"] = database_url.split("://", 1)[0]
+    write_report(report, args.output)
+    return report
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from sqlalchemy import insert
+
+    from .. import models  # noqa: F401 - register mappers
+    from ..db.session import AsyncSessionLocal, engine
+    from ..models.meta import Base
+    from ..models.user import User
+    from ..observability.round_trips import instrument_engine, record_round_trips
+    from ..services.user_service import DISCRIMINATOR_SPACE, insert_user_with_handle
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    instrument_engine(engine)
+
+    run_id = uuid.uuid4().hex[:8]
+    base = f"{args.base}{run_id}"
+    rng = random.Random(args.seed)
+    existing = min(args.existing, DISCRIMINATOR_SPACE - args.registrations)
+    codes = rng.sample(range(DISCRIMINATOR_SPACE), existing)
+    rows = [
+        {
+            "email": f"handles-{run_id}-{i}@example.com",
+            "hashed_password": "!",
+            "display_name": f"{base}#{code:04d}",
+        }
+        for i, code in enumerate(codes)
+    ]
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await conn.execute(insert(User), rows[start : start + INSERT_CHUNK])
+
+    latencies_ms: list[float] = []
+    statements: list[float] = []
+    retries = 0
+    async with AsyncSessionLocal() as db:
+        for i in range(args.registrations):
+            with record_round_trips() as trips:
+                started = time.perf_counter()
+                await insert_user_with_handle(
+                    db,
+                    email=f"handles-{run_id}-new-{i}@example.com",
+                    hashed_password="!",
+                    base=base,
+                )
+                latencies_ms.append((time.perf_counter() - started) * 1000.0)
+            statements.append(len(trips.sql))
+            inserts = sum(1 for sql in trips.sql if sql.lstrip().upper().startswith("INSERT"))
+            retries += max(0, inserts - 1)
+
+    return {
+        "benchmark": "handles",
+        "scenario": {
+            "base": args.base,
+            "existing": existing,
+            "registrations": args.registrations,
+            "seed": args.seed,
+        },
+        "results": {
+            "registration_latency_ms": percentiles(latencies_ms),
+            "sql_statements_per_registration": percentiles(statements),
+            "insert_retries": retries,
+        },
+        "environment": environment(),
+    }
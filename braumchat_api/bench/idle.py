@@ -0,0 +1,135 @@
+"""Idle socket benchmark: `python -m braumchat_api.bench idle`.
+
+Parks `--sockets` receive loops on in-memory sockets and compares the two
+ways of enforcing the idle timeout, as JSON:
+
+- `wait_for`: every receive wrapped in `asyncio.wait_for`, which is what the
+  WebSocket handlers did before;
+- `sweeper`: a bare receive that stamps `Connection.last_seen`, watched by
+  realtime.idle.IdleSweeper.
+
+For each it reports memory per idle socket (tracemalloc, handler task and
+connection included), CPU per received frame (`--frames` round-robin over
+every socket) and, for the sweeper, the cost of one due wheel slot per
+socket. No app, database or Redis is involved: the numbers isolate the
+receive loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from ._common import environment, prepare_env, write_report
+
+TIMEOUT_SECONDS = 25.0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    prepare_env(None)
+    report = asyncio.run(_run(args))
+    write_report(report, args.output)
+    return report
+
+
+class _Socket:
+    """Just enough of a WebSocket for a receive loop."""
+
+    def __init__(self) -> None:
+        self.inbox: asyncio.Queue = asyncio.Queue()
+
+    async def receive_json(self):
+        return await self.inbox.get()
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from ..realtime.idle import IdleSweeper
+    from ..realtime.manager import Connection
+
+    results = {}
+    for mode in ("wait_for", "sweeper"):
+        sweeper = IdleSweeper(timeout_seconds=TIMEOUT_SECONDS)
+        received = 0
+        done = asyncio.Event()
+        target = 0
+
+        async def loop(conn: Connection) -> None:
+            nonlocal received
+            ws = conn.websocket
+            while True:
+                if mode == "wait_for":
+                    await asyncio.wait_for(ws.receive_json(), timeout=TIMEOUT_SECONDS)
+                else:
+                    await ws.receive_json()
+                    conn.last_seen = time.monotonic()
+                received += 1
+                if received == target:
+                    done.set()
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        conns = [Connection(websocket=_Socket(), user_id=i) for i in range(args.sockets)]
+        tasks = [asyncio.create_task(loop(conn)) for conn in conns]
+        if mode == "sweeper":
+            for conn in conns:
+                sweeper.track(conn)
+        await asyncio.sleep(0)  # Park every loop in its receive.
+        gc.collect()
+        per_socket = (tracemalloc.get_traced_memory()[0] - before) / args.sockets
+        tracemalloc.stop()
+
+        target = args.frames
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        for i in range(args.frames):
+            conns[i % args.sockets].websocket.inbox.put_nowait({"type": "ping"})
+        await done.wait()
+        cpu = time.process_time() - cpu0
+        wall = time.perf_counter() - wall0
+        results[mode] = {
+            "bytes_per_idle_socket": round(per_socket, 1),
+            "cpu_us_per_frame": round(cpu / args.frames * 1_000_000.0, 3),
+            "wall_us_per_frame": round(wall / args.frames * 1_000_000.0, 3),
+        }
+
+        if mode == "sweeper":
+            # Worst case: every socket's slot comes due at once, all re-filed.
+            sweeper.clock = lambda: time.monotonic() + TIMEOUT_SECONDS
+            for conn in conns:
+                conn.last_seen = time.monotonic() + TIMEOUT_SECONDS
+            cpu0 = time.process_time()
+            await sweeper.sweep()
+            results[mode]["sweep_us_per_socket"] = round(
+                (time.process_time() - cpu0) / args.sockets * 1_000_000.0, 3
+            )
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    results["bytes_saved_per_idle_socket"] = round(
+        results["wait_for"]["bytes_per_idle_socket"] - results["sweeper"]["bytes_per_idle_socket"],
+        1,
+    )
+    return {
+        "benchmark": "idle",
+        "scenario": {
+            "sockets": args.sockets,
+            "frames": args.frames,
+            "timeout_seconds": TIMEOUT_SECONDS,
+        },
+        "results": results,
+        "environment": environment(),
+    }
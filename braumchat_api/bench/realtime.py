@@ -0,0 +1,207 @@
+"""WebSocket fan-out benchmark: `python -m braumchat_api.bench realtime`.
+
+Opens N in-process sockets spread across M channels of one workspace through
+`/ws/chat/{workspace_id}/{channel_id}`, drives message and typing traffic for a
+fixed duration and reports delivered frames/sec, end-to-end delivery latency
+percentiles, CPU per delivered frame and RSS per idle socket as JSON.
+
+Client and server share the process, so CPU and RSS figures include the
+(thin) simulated client; compare runs of the same scenario, not absolutes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+
+from ._asgi_ws import AsgiWebSocket, WebSocketClosed
+from ._common import environment, install_redis, percentiles, prepare_env, rss_kb, write_report
+
+CONNECT_BATCH = 100
+PING_EVERY_SECONDS = 10.0
+DRAIN_GRACE_SECONDS = 5.0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sockets", type=int, default=200, help="simulated sockets (N)")
+    parser.add_argument("--channels", type=int, default=10, help="channels to spread over (M)")
+    parser.add_argument("--duration", type=float, default=10.0, help="traffic phase, seconds")
+    parser.add_argument(
+        "--message-rate", type=float, default=0.2, help="messages per socket per second"
+    )
+    parser.add_argument(
+        "--typing-rate", type=float, default=0.5, help="typing frames per socket per second"
+    )
+    parser.add_argument("--database-url", default=None, help="defaults to a temp SQLite file")
+    parser.add_argument("--redis-url", default=None, help="defaults to an in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    database_url = prepare_env(args.database_url)
+    report = asyncio.run(_run(args))
+    report["scenario"]["database"] = database_url.split("://", 1)[0]
+    write_report(report, args.output)
+    return report
+
+
+async def _seed(session_factory, *, users: int, channels: int):
+    from ..models.channel import Channel
+    from ..models.user import User
+    from ..models.workspace import Workspace
+    from ..models.workspace_member import WorkspaceMember
+
+    run_id = uuid.uuid4().hex[:8]
+    async with session_factory() as db:
+        people = [
+            User(
+                email=f"bench-{run_id}-{i}@example.com",
+                hashed_password="!",
+                display_name=f"b{run_id}{i}#{i % 10000:04d}",
+            )
+            for i in range(users)
+        ]
+        db.add_all(people)
+        await db.flush()
+        ws = Workspace(name=f"bench {run_id}", slug=f"bench-{run_id}", owner_id=people[0].id)
+        db.add(ws)
+        await db.flush()
+        db.add_all(WorkspaceMember(workspace_id=ws.id, user_id=u.id) for u in people)
+        chans = [Channel(workspace_id=ws.id, name=f"bench-{i}") for i in range(channels)]
+        db.add_all(chans)
+        await db.commit()
+        return int(ws.id), [int(u.id) for u in people], [int(c.id) for c in chans]
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    install_redis(args.redis_url)
+
+    import braumchat_api.models  # noqa: F401 - register mappers
+
+    from ..db.session import AsyncSessionLocal, engine
+    from ..main import app
+    from ..models.meta import Base
+    from ..security.security import create_access_token
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    n_sockets = max(1, args.sockets)
+    n_channels = max(1, min(args.channels, n_sockets))
+    workspace_id, user_ids, channel_ids = await _seed(
+        AsyncSessionLocal, users=n_sockets, channels=n_channels
+    )
+    rng = random.Random(args.seed)
+
+    # --- connect phase: RSS per idle socket ---------------------------------
+    rss_before = rss_kb()
+    sockets: list[tuple[AsgiWebSocket, int]] = []
+    for start in range(0, n_sockets, CONNECT_BATCH):
+        batch = []
+        for i in range(start, min(start + CONNECT_BATCH, n_sockets)):
+            channel_id = channel_ids[i % n_channels]
+            ws = AsgiWebSocket(
+                app,
+                f"/ws/chat/{workspace_id}/{channel_id}",
+                query={"token": create_access_token(str(user_ids[i]))},
+            )
+            batch.append((ws, channel_id))
+        await asyncio.gather(*(ws.connect() for ws, _ in batch))
+        sockets.extend(batch)
+    await asyncio.sleep(0.5)
+    rss_after = rss_kb()
+
+    members_per_channel: dict[int, int] = defaultdict(int)
+    for _, channel_id in sockets:
+        members_per_channel[channel_id] += 1
+
+    # --- traffic phase ------------------------------------------------------
+    sent_at: dict[str, float] = {}
+    latencies_ms: list[float] = []
+    counters = {"messages": 0, "typing": 0, "delivered": 0, "expected": 0}
+
+    async def reader(ws: AsgiWebSocket) -> None:
+        try:
+            while True:
+                frame = await ws.receive_json()
+                counters["delivered"] += 1
+                if frame.get("type") == "message":
+                    started = sent_at.get((frame.get("payload") or {}).get("client_id"))
+                    if started is not None:
+                        latencies_ms.append((time.perf_counter() - started) * 1000.0)
+        except (WebSocketClosed, asyncio.CancelledError):
+            return
+
+    async def sender(ws: AsgiWebSocket, channel_id: int, deadline: float) -> None:
+        total_rate = args.message_rate + args.typing_rate
+        last_sent = time.perf_counter()
+        while True:
+            delay = rng.expovariate(total_rate) if total_rate > 0 else PING_EVERY_SECONDS
+            now = time.perf_counter()
+            if now + delay >= deadline:
+                return
+            await asyncio.sleep(delay)
+            now = time.perf_counter()
+            if total_rate <= 0 or now - last_sent >= PING_EVERY_SECONDS:
+                await ws.send_json({"type": "ping"})
+            elif rng.random() < args.message_rate / total_rate:
+                client_id = uuid.uuid4().hex
+                sent_at[client_id] = now
+                counters["messages"] += 1
+                counters["expected"] += members_per_channel[channel_id]
+                await ws.send_json(
+                    {"type": "message", "content": "x" * 64, "client_id": client_id}
+                )
+            else:
+                counters["typing"] += 1
+                counters["expected"] += members_per_channel[channel_id]
+                await ws.send_json({"type": "typing", "is_typing": True})
+            last_sent = now
+
+    readers = [asyncio.create_task(reader(ws)) for ws, _ in sockets]
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    deadline = wall_start + args.duration
+    await asyncio.gather(*(sender(ws, ch, deadline) for ws, ch in sockets))
+
+    grace_end = time.perf_counter() + DRAIN_GRACE_SECONDS
+    while counters["delivered"] < counters["expected"] and time.perf_counter() < grace_end:
+        await asyncio.sleep(0.05)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    for task in readers:
+        task.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+    await asyncio.gather(*(ws.close() for ws, _ in sockets))
+
+    delivered = counters["delivered"]
+    return {
+        "benchmark": "realtime",
+        "scenario": {
+            "sockets": n_sockets,
+            "channels": n_channels,
+            "duration_seconds": args.duration,
+            "message_rate_per_socket": args.message_rate,
+            "typing_rate_per_socket": args.typing_rate,
+            "redis": "redis" if args.redis_url else "memory",
+            "seed": args.seed,
+        },
+        "results": {
+            "messages_sent": counters["messages"],
+            "typing_sent": counters["typing"],
+            "frames_expected": counters["expected"],
+            "frames_delivered": delivered,
+            "delivered_frames_per_sec": round(delivered / wall, 1) if wall else None,
+            "messages_per_sec": round(counters["messages"] / wall, 1) if wall else None,
+            "delivery_latency_ms": percentiles(latencies_ms),
+            "cpu_us_per_delivered_frame": round(cpu * 1e6 / delivered, 2) if delivered else None,
+            "rss_kb_per_idle_socket": round((rss_after - rss_before) / n_sockets, 2),
+        },
+        "environment": environment(),
+    }
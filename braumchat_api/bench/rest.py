@@ -0,0 +1,223 @@
+"""REST endpoint benchmark: `python -m braumchat_api.bench rest`.
+
+Seeds a dataset with `braumchat_api.tools.seed`, then drives the hot read routes and
+`/auth/login` through the ASGI app with a fixed concurrency and reports
+throughput and latency percentiles per route as JSON.
+
+`--baseline old.json` adds a comparison against an earlier report and flags
+routes whose p95 latency or throughput regressed beyond the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from ..tools.seed import DEFAULT_PASSWORD, SeedSpec, email_for
+from ._common import environment, install_redis, percentiles, prepare_env, write_report
+
+ROUTES = ("dm_threads", "friends", "channel_messages", "auth_login")
+
+# bcrypt makes logins ~100x slower than reads; keep the default run short.
+LOGIN_REQUEST_DIVISOR = 10
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    spec = SeedSpec()
+    parser.add_argument("--scale", type=float, default=1.0, help="see tools.seed --scale")
+    parser.add_argument("--users", type=int, default=spec.users)
+    parser.add_argument("--workspaces", type=int, default=spec.workspaces)
+    parser.add_argument("--messages", type=int, default=spec.messages)
+    parser.add_argument("--friends-per-user", type=int, default=spec.friends_per_user)
+    parser.add_argument("--dm-threads", type=int, default=spec.dm_threads)
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--sample-users", type=int, default=20, help="distinct callers")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated subset")
+    parser.add_argument("--database-url", default=None, help="defaults to a temp SQLite file")
+    parser.add_argument("--redis-url", default=None, help="defaults to an in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=spec.seed)
+    parser.add_argument("--baseline", default=None, help="earlier report to compare against")
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=10.0,
+        help="percent change in p95 / throughput reported as a regression",
+    )
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    database_url = prepare_env(args.database_url)
+    report = asyncio.run(_run(args))
+    report["scenario"]["database"] = database_url.split("://", 1)[0]
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        report["comparison"] = compare(baseline, report, threshold=args.regression_threshold)
+        _print_comparison(report["comparison"])
+
+    write_report(report, args.output)
+    return report
+
+
+async def _measure(client, make_request, *, total: int, concurrency: int) -> dict:
+    latencies_ms: list[float] = []
+    statuses: dict[str, int] = {}
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        for i in remaining:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies_ms.append((time.perf_counter() - started) * 1000.0)
+            key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - wall_start
+    return {
+        "requests": total,
+        "requests_per_sec": round(total / wall, 1) if wall else None,
+        "latency_ms": percentiles(latencies_ms),
+        "status_codes": statuses,
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    install_redis(args.redis_url)
+
+    from httpx import AsyncClient
+
+    from .. import models  # noqa: F401 - register mappers
+    from ..db.session import engine
+    from ..main import app
+    from ..models.meta import Base
+    from ..tools.seed import seed
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    spec = SeedSpec(
+        users=args.users,
+        workspaces=args.workspaces,
+        messages=args.messages,
+        friends_per_user=args.friends_per_user,
+        dm_threads=args.dm_threads,
+        seed=args.seed,
+    ).scaled(args.scale)
+    seed_started = time.perf_counter()
+    dataset = await seed(engine, spec)
+    seed_seconds = time.perf_counter() - seed_started
+
+    # Callers must be members of the hot channel's workspace to read its history.
+    hot_channel_id = dataset.hot_channel_ids[0]
+    members = dataset.members_by_workspace[dataset.channel_workspace[hot_channel_id]]
+    rng = random.Random(args.seed)
+    callers = rng.sample(members, min(args.sample_users, len(members)))
+    selected = [r.strip() for r in args.routes.split(",") if r.strip() in ROUTES]
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        headers = []
+        for uid in callers:
+            r = await client.post(
+                "/auth/login",
+                data={"username": email_for(uid), "password": DEFAULT_PASSWORD},
+            )
+            r.raise_for_status()
+            headers.append({"Authorization": f"Bearer {r.json()['access_token']}"})
+
+        requests = {
+            "dm_threads": lambda c, i: c.get("/dm/threads", headers=headers[i % len(headers)]),
+            "friends": lambda c, i: c.get("/friends/", headers=headers[i % len(headers)]),
+            "channel_messages": lambda c, i: c.get(
+                f"/channels/{hot_channel_id}/messages",
+                headers=headers[i % len(headers)],
+            ),
+            "auth_login": lambda c, i: c.post(
+                "/auth/login",
+                data={
+                    "username": email_for(callers[i % len(callers)]),
+                    "password": DEFAULT_PASSWORD,
+                },
+            ),
+        }
+
+        results = {}
+        for route in selected:
+            total = args.requests
+            if route == "auth_login":
+                total = max(10, total // LOGIN_REQUEST_DIVISOR)
+            results[route] = await _measure(
+                client, requests[route], total=total, concurrency=args.concurrency
+            )
+
+    return {
+        "benchmark": "rest",
+        "scenario": {
+            "users": spec.users,
+            "workspaces": spec.workspaces,
+            "messages": spec.messages,
+            "friends_per_user": spec.friends_per_user,
+            "dm_threads": spec.dm_threads,
+            "concurrency": args.concurrency,
+            "sample_users": len(callers),
+            "redis": "redis" if args.redis_url else "memory",
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "results": results,
+        "environment": environment(),
+    }
+
+
+def _pct_change(old, new) -> float | None:
+    if old in (None, 0) or new is None:
+        return None
+    return round((new - old) / old * 100.0, 1)
+
+
+def compare(baseline: dict, current: dict, *, threshold: float) -> dict:
+    routes = {}
+    for route, now in current.get("results", {}).items():
+        before = baseline.get("results", {}).get(route)
+        if not before:
+            continue
+        delta = {
+            "requests_per_sec": _pct_change(
+                before.get("requests_per_sec"), now["requests_per_sec"]
+            ),
+        }
+        for point in ("p50", "p95", "p99"):
+            delta[point] = _pct_change(
+                before.get("latency_ms", {}).get(point), now["latency_ms"].get(point)
+            )
+        regressed = (delta["p95"] is not None and delta["p95"] > threshold) or (
+            delta["requests_per_sec"] is not None and delta["requests_per_sec"] < -threshold
+        )
+        routes[route] = {"change_percent": delta, "regressed": regressed}
+    return {
+        "threshold_percent": threshold,
+        "baseline_timestamp": baseline.get("environment", {}).get("timestamp"),
+        "routes": routes,
+        "regressions": sorted(r for r, v in routes.items() if v["regressed"]),
+    }
+
+
+def _print_comparison(comparison: dict) -> None:
+    out = sys.stderr
+    out.write(f"{'route':<18}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}\n")
+    for route, item in comparison["routes"].items():
+        delta = item["change_percent"]
+        cells = "".join(
+            f"{'n/a' if delta[k] is None else f'{delta[k]:+.1f}%':>9}"
+            for k in ("requests_per_sec", "p50", "p95", "p99")
+        )
+        flag = "  REGRESSED" if item["regressed"] else ""
+        out.write(f"{route:<18}{cells}{flag}\n")
@@ -0,0 +1,124 @@
+"""Response serialization benchmark: `python -m braumchat_api.bench serialization`.
+
+Encodes one page of channel messages (`--page-size`, 50 by default) three
+ways and reports the per-page cost, as JSON:
+
+- `response_model`: ORM rows through `List[MessageRead]` with orm_mode and the
+  stock JSONResponse, which is what the endpoint did before;
+- `fast_stdlib`: pre-shaped dicts encoded with the stdlib fallback;
+- `fast`: pre-shaped dicts through FastJSONResponse (orjson when installed).
+
+No database is involved: rows are built in memory, so the numbers isolate
+serialization.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from ._common import environment, percentiles, prepare_env, write_report
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--content-length", type=int, default=120, help="average characters")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    prepare_env(None)
+    report = asyncio.run(_run(args))
+    write_report(report, args.output)
+    return report
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from typing import List
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from .. import models  # noqa: F401 - register mappers
+    from ..api import responses
+    from ..models.message import Message
+    from ..models.user import User
+    from ..schemas.message import MessageRead
+    from ..services.message_service import shape_messages
+
+    rng = random.Random(args.seed)
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    authors = [
+        User(id=i, email=f"u{i}@example.com", display_name=f"author{i}#{i:04d}")
+        for i in range(1, 9)
+    ]
+    rows = []
+    for i in range(args.page_size):
+        author = rng.choice(authors)
+        length = max(1, int(rng.gauss(args.content_length, args.content_length / 3)))
+        rows.append(
+            {
+                "id": 10_000 - i,
+                "channel_id": 1,
+                "user_id": author.id,
+                "content": "".join(rng.choice("abcdefgh ijklmnop ") for _ in range(length)),
+                "is_edited": False,
+                "is_deleted": False,
+                "created_at": started_at + timedelta(seconds=10_000 - i),
+            }
+        )
+    orm_rows = [
+        Message(**row, user=next(a for a in authors if a.id == row["user_id"])) for row in rows
+    ]
+    profiles = {
+        a.id: {"id": a.id, "display_name": a.display_name, "avatar_url": a.avatar_url}
+        for a in authors
+    }
+    field = create_response_field(name="bench", type_=List[MessageRead])
+
+    async def response_model() -> bytes:
+        content = await serialize_response(field=field, response_content=orm_rows, by_alias=False)
+        return JSONResponse(content).body
+
+    async def fast_stdlib() -> bytes:
+        return responses.stdlib_dumps(shape_messages(rows, profiles))
+
+    async def fast() -> bytes:
+        return responses.FastJSONResponse(shape_messages(rows, profiles)).body
+
+    results = {}
+    for name, encode in (
+        ("response_model", response_model),
+        ("fast_stdlib", fast_stdlib),
+        ("fast", fast),
+    ):
+        body = await encode()
+        samples_us: list[float] = []
+        for _ in range(args.iterations):
+            t0 = time.perf_counter()
+            await encode()
+            samples_us.append((time.perf_counter() - t0) * 1_000_000.0)
+        results[name] = {"per_page_us": percentiles(samples_us), "body_bytes": len(body)}
+
+    baseline = results["response_model"]["per_page_us"]["p50"]
+    for name in ("fast_stdlib", "fast"):
+        results[name]["speedup_p50"] = round(baseline / results[name]["per_page_us"]["p50"], 2)
+
+    return {
+        "benchmark": "serialization",
+        "scenario": {
+            "page_size": args.page_size,
+            "iterations": args.iterations,
+            "content_length": args.content_length,
+            "seed": args.seed,
+            "encoder": "orjson" if responses.orjson is not None else "stdlib",
+        },
+        "results": results,
+        "environment": environment(),
+    }
@@ -0,0 +1,126 @@
+"""Cold start benchmark: `python -m braumchat_api.bench startup`.
+
+Spawns `--runs` fresh interpreters that import the app, run its lifespan
+startup and serve one request (`--path`, /readyz by default, which opens the
+first database connection). Reports each phase and the time-to-first-request
+measured from process spawn, as JSON. With `--importtime N`, one more run
+under `python -X importtime` lists the N slowest top-level imports.
+
+Each child uses a temp SQLite file and the in-memory Redis stand-in, so the
+numbers reflect the code's own startup, not connecting to real services. The
+child's own httpx client is imported before the clock starts (but does show
+up in the import listing).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from ._common import environment, percentiles, prepare_env, write_report
+
+_CHILD = """
+import asyncio, json, os, sys, time
+started = time.time()
+from httpx import AsyncClient
+from braumchat_api.bench._common import install_redis
+install_redis(None)
+t0 = time.perf_counter()
+from braumchat_api.main import app
+t1 = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            response = await client.get(sys.argv[1])
+        t3 = time.perf_counter()
+        return t2, t3, response.status_code
+
+t2, t3, status = asyncio.run(main())
+print(json.dumps({
+    "interpreter_ms": (started - float(os.environ["BENCH_SPAWNED_AT"])) * 1000.0,
+    "import_ms": (t1 - t0) * 1000.0,
+    "startup_ms": (t2 - t1) * 1000.0,
+    "first_request_ms": (t3 - t2) * 1000.0,
+    "ready_at": time.time(),
+    "status": status,
+}))
+"""
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/readyz", help="first request to serve")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N")
+    parser.add_argument("--output", default=None, help="JSON report path (stdout if omitted)")
+
+
+def run(args: argparse.Namespace) -> dict:
+    prepare_env(None)
+    report = _run(args)
+    write_report(report, args.output)
+    return report
+
+
+def _spawn(args: argparse.Namespace, *flags: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "BENCH_SPAWNED_AT": repr(time.time())}
+    child = subprocess.run(
+        [sys.executable, *flags, "-c", _CHILD, args.path],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if child.returncode != 0:
+        raise SystemExit(f"startup child failed:\n{child.stderr[-4000:]}")
+    return child
+
+
+def _slowest_imports(stderr: str, limit: int) -> list[dict]:
+    """Top-level packages and app modules from `-X importtime`, by cumulative time."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if not cumulative.isdigit():
+            continue  # The header line.
+        if "." not in name or name.startswith("braumchat_api"):
+            rows.append({"module": name, "cumulative_ms": round(int(cumulative) / 1000.0, 2)})
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _run(args: argparse.Namespace) -> dict:
+    phases: dict[str, list[float]] = {
+        "interpreter_ms": [],
+        "import_ms": [],
+        "startup_ms": [],
+        "first_request_ms": [],
+        "time_to_first_request_ms": [],
+    }
+    statuses = set()
+    for _ in range(args.runs):
+        spawned_at = time.time()
+        child = _spawn(args)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        statuses.add(result["status"])
+        for name in ("interpreter_ms", "import_ms", "startup_ms", "first_request_ms"):
+            phases[name].append(result[name])
+        phases["time_to_first_request_ms"].append((result["ready_at"] - spawned_at) * 1000.0)
+
+    report = {
+        "benchmark": "startup",
+        "scenario": {"runs": args.runs, "path": args.path},
+        "results": {name: percentiles(samples) for name, samples in phases.items()},
+        "statuses": sorted(statuses),
+        "environment": environment(),
+    }
+    if args.importtime:
+        child = _spawn(args, "-X", "importtime")
+        report["slowest_imports"] = _slowest_imports(child.stderr, args.importtime)
+    return report
@@ -1,10 +1,27 @@
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from pydantic import AnyUrl, BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Optional read replica for read-only endpoints (see db/session.py)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # A user's reads stay on the primary this long after they write
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Connection pool (ignored for SQLite); warm-up opens this many at startup
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 0
+    # Per-bulkhead pool overrides (see db/session.BULKHEADS), as JSON, e.g.
+    # DB_BULKHEADS='{"realtime-write": {"size": 20, "overflow": 0, "timeout": 1}}'
+    DB_BULKHEADS: Dict[str, Dict[str, float]] = {}
+
     REDIS_URL: str = "redis://localhost:6379/0"
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
@@ -18,10 +35,33 @@ class Settings(BaseSettings):
     REQUIRE_SESSION_CLAIM: bool = True
     SESSION_TOUCH_ENABLED: bool = True
     SESSION_TOUCH_TTL_SECONDS: int = 300
+    # Bearer auth served from Redis (see services/auth_cache.py); 0 disables
+    AUTH_CACHE_TTL_SECONDS: int = 60
+
+    # DM read state: Redis -> Postgres flusher (see dm_state_service)
+    DM_STATE_FLUSH_ENABLED: bool = True
+    DM_STATE_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # WebSocket admission per worker (see realtime/admission.py); 0 disables a limit
+    WS_MAX_CONNECTIONS_PER_WORKER: int = 10000
+    WS_MAX_CONNECTIONS_PER_USER: int = 20
+    WS_SHED_LOOP_LAG_MS: float = 250.0
+    WS_RETRY_AFTER_SECONDS: int = 10
+    LOOP_LAG_SAMPLE_INTERVAL_SECONDS: float = 0.5
+
+    # WebSocket drain on SIGUSR1 / shutdown (see realtime/drain.py)
+    WS_DRAIN_WINDOW_SECONDS: float = 30.0
+    WS_DRAIN_BATCH_SIZE: int = 200
 
     # Observability
     METRICS_ENABLED: bool = True
 
+    # Response compression (see api/compression.py)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
     # Rate limiting (Redis)
     RATE_LIMIT_FAIL_OPEN: bool = True
     TRUST_PROXY_HEADERS: bool = False
@@ -43,5 +83,11 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
+    """The process-wide settings, read from the environment and `.env` once.
+
+    Modules read this at import time; after changing the environment (tests,
+    benchmarks) call `get_settings.cache_clear()` before importing them.
+    """
     return Settings()
@@ -0,0 +1,72 @@
+"""Read-your-writes stickiness for replica reads.
+
+After a user writes, their reads go to the primary for a short window so
+they never see a replica that hasn't caught up with their own change.
+
+A write is noticed when a session bound to a user (`bind_user`) flushes.
+The process that served the write remembers it locally right away; `publish`
+then sets `db:primary:user:{id}` in Redis so other processes agree. That runs
+after the response is sent, so another process may miss a few milliseconds
+of the window. Without Redis the window only holds in the writing process.
+"""
+
+from __future__ import annotations
+
+from redis.asyncio.client import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..services.local_cache import LocalTTLCache
+
+STICKY_KEY_PATTERN = "db:primary:user:{user_id}"
+
+_recent_writers: LocalTTLCache[int, bool] = LocalTTLCache(
+    size=50_000, ttl=get_settings().READ_YOUR_WRITES_SECONDS
+)
+
+
+def _key(user_id: int) -> str:
+    return STICKY_KEY_PATTERN.format(user_id=int(user_id))
+
+
+def bind_user(db: AsyncSession, user_id: int) -> None:
+    """Attribute the session's later flushes to `user_id`."""
+    db.info["user_id"] = int(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        _recent_writers.put(user_id, True)
+        session.info["wrote"] = True
+
+
+async def publish(redis: Redis, db: AsyncSession, *, window_seconds: float) -> None:
+    """Share the session's writes since the last call (if any) with other processes.
+
+    Best-effort. Long-lived sessions (WebSockets) call this after each write.
+    """
+    user_id = db.info.get("user_id")
+    if user_id is None or not db.info.pop("wrote", False):
+        return
+    try:
+        await redis.set(_key(user_id), "1", px=int(window_seconds * 1000))
+    except Exception:
+        pass
+
+
+async def needs_primary(redis: Redis, user_id: int) -> bool:
+    """True if `user_id` wrote recently, so their reads must see the primary."""
+    if _recent_writers.get(int(user_id)):
+        return True
+    try:
+        return bool(await redis.exists(_key(user_id)))
+    except Exception:
+        return False
+
+
+def clear_local() -> None:
+    _recent_writers.clear()
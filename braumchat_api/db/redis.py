@@ -1,4 +1,7 @@
+import hashlib
+
 from redis import asyncio as redis_asyncio
+from redis.exceptions import NoScriptError
 
 from ..config import get_settings
 
@@ -10,4 +13,19 @@ redis = redis_asyncio.from_url(
     decode_responses=True,
 )
 
-__all__ = ["redis"]
+
+class Script:
+    """EVALSHA with a fallback to EVAL when the script cache was flushed."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(self, redis: redis_asyncio.Redis, keys: list[str], args: list):
+        try:
+            return await redis.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await redis.eval(self.source, len(keys), *keys, *args)
+
+
+__all__ = ["redis", "Script"]
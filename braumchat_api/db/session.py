@@ -1,16 +1,124 @@
+import contextlib
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from prometheus_client import REGISTRY
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool, QueuePool
 
-from ..config import get_settings
+from ..config import Settings, get_settings
+from ..observability.metrics import DbPoolCollector
 
 settings = get_settings()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+DEFAULT_BULKHEAD = "default"
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+# Bulkheads: separate pools on the primary so one workload can't starve
+# another (slow history reads vs. realtime message inserts vs. login storms).
+# Keys left out fall back to DB_POOL_SIZE / DB_MAX_OVERFLOW /
+# DB_POOL_TIMEOUT_SECONDS; the DB_BULKHEADS setting overrides any of them.
+BULKHEADS: dict[str, dict[str, float]] = {
+    DEFAULT_BULKHEAD: {},
+    "api-read": {"size": 10, "overflow": 5, "timeout": 5},
+    "realtime-write": {"size": 5, "overflow": 5, "timeout": 2},
+    "auth": {"size": 3, "overflow": 2, "timeout": 5},
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def engine_options(url: str, settings: Settings, bulkhead: str = DEFAULT_BULKHEAD) -> dict:
+    """Pool options for `bulkhead` on `url`; SQLite keeps SQLAlchemy's defaults."""
+    if _is_sqlite(url):
+        return {}
+    shape = {**BULKHEADS.get(bulkhead, {}), **settings.DB_BULKHEADS.get(bulkhead, {})}
+    return {
+        "pool_size": int(shape.get("size", settings.DB_POOL_SIZE)),
+        "max_overflow": int(shape.get("overflow", settings.DB_MAX_OVERFLOW)),
+        "pool_timeout": float(shape.get("timeout", settings.DB_POOL_TIMEOUT_SECONDS)),
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Every distinct pool by metrics label, with its capacity (size + overflow)
+# when configured here; read at scrape time by DbPoolCollector.
+_pools: dict[str, tuple[Pool, int | None]] = {}
+
+
+def _create_engine(url: str, bulkhead: str, *, label: str | None = None) -> AsyncEngine:
+    options = engine_options(url, settings, bulkhead)
+    engine = create_async_engine(url, echo=False, **options)
+    capacity = options["pool_size"] + options["max_overflow"] if options else None
+    _pools[label or bulkhead] = (engine.pool, capacity)
+    return engine
+
+
+def _sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+engine = _create_engine(settings.DATABASE_URL, DEFAULT_BULKHEAD)
+AsyncSessionLocal = _sessionmaker(engine)
+
+# SQLite has no server to protect (and an in-memory database can't be split
+# across engines), so there every bulkhead shares `engine`.
+engines: dict[str, AsyncEngine] = {DEFAULT_BULKHEAD: engine}
+if not _is_sqlite(settings.DATABASE_URL):
+    for _name in dict.fromkeys([*BULKHEADS, *settings.DB_BULKHEADS]):
+        if _name != DEFAULT_BULKHEAD:
+            engines[_name] = _create_engine(settings.DATABASE_URL, _name)
+_sessionmakers = {DEFAULT_BULKHEAD: AsyncSessionLocal}
+_sessionmakers.update((n, _sessionmaker(e)) for n, e in engines.items() if n != DEFAULT_BULKHEAD)
+
+# Read-only endpoints use ReadSessionLocal when a replica is configured (see
+# api/deps.get_read_db_dep); without one it stays None and reads share the
+# request's primary session. The replica pool is shaped like "api-read".
+replica_engine: AsyncEngine | None = None
+ReadSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = _create_engine(
+        settings.DATABASE_REPLICA_URL, "api-read", label="api-read-replica"
+    )
+    ReadSessionLocal = _sessionmaker(replica_engine)
+
+
+def session_factory(bulkhead: str = DEFAULT_BULKHEAD) -> async_sessionmaker[AsyncSession]:
+    """Sessions from `bulkhead`'s pool (the default pool if it has none of its own)."""
+    return _sessionmakers.get(bulkhead, AsyncSessionLocal)
+
+
+REGISTRY.register(DbPoolCollector(lambda: _pools))
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_used(session: Session, transaction, connection) -> None:
+    # Sessions only check out a connection when their first statement runs;
+    # this records that it happened (see db_session_requests_total).
+    session.info["used"] = True
+
+
+async def get_db(bulkhead: str = DEFAULT_BULKHEAD) -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory(bulkhead)() as session:
         yield session
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> None:
+    """Open `connections` pooled connections at once so first requests don't pay connect."""
+    if isinstance(engine.pool, QueuePool):
+        # Anything past the pool size would be overflow, closed again on release.
+        connections = min(connections, engine.pool.size())
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(connections):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(text("SELECT 1"))
@@ -1,8 +1,16 @@
+import asyncio
+import contextlib
+import logging
+import signal
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .api.compression import CompressionMiddleware
+from .api.deps import get_db_dep
 from .api.routes import auth as auth_router
 from .api.routes import channels as channels_router
 from .api.routes import direct_messages as dm_router
@@ -10,27 +18,93 @@ from .api.routes import friends as friends_router
 from .api.routes import invites as invites_router
 from .api.routes import messages as messages_router
 from .api.routes import realtime as realtime_router
+from .api.routes import search as search_router
 from .api.routes import users as users_router
 from .api.routes import workspaces as workspaces_router
-from .api.deps import get_db_dep
 from .config import get_settings
+from .db import session as db_session
 from .db.redis import redis as redis_client
+from .db.session import AsyncSessionLocal
+from .observability.loop_lag import loop_lag
 from .observability.metrics import render_metrics
 from .observability.middleware import PrometheusMiddleware
+from .realtime import drain as ws_drain
+from .realtime.idle import idle_sweeper
+from .realtime.manager import manager as ws_manager
 from .security.http_rate_limit_middleware import HttpRateLimitMiddleware
+from .services import dm_state_service, profile_cache
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
 
-    app = FastAPI(title="braumchat-api")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if settings.DB_POOL_WARMUP > 0:
+            for engine in (*db_session.engines.values(), db_session.replica_engine):
+                if engine is None:
+                    continue
+                try:
+                    await db_session.warm_up(engine, settings.DB_POOL_WARMUP)
+                except Exception:
+                    # Not fatal: /readyz reports an unreachable database.
+                    logger.warning("database pool warm-up failed", exc_info=True)
+        flusher = None
+        if settings.DM_STATE_FLUSH_ENABLED:
+            flusher = asyncio.create_task(
+                dm_state_service.run_flusher(
+                    redis_client,
+                    AsyncSessionLocal,
+                    interval_seconds=settings.DM_STATE_FLUSH_INTERVAL_SECONDS,
+                )
+            )
+        invalidations = asyncio.create_task(profile_cache.run_invalidation_listener(redis_client))
+        lag_monitor = asyncio.create_task(loop_lag.run(settings.LOOP_LAG_SAMPLE_INTERVAL_SECONDS))
+        sweeper = asyncio.create_task(idle_sweeper.run())
+        ws_drain.reset(ws_manager)
+
+        def start_drain():
+            return ws_drain.start(
+                ws_manager,
+                redis_client,
+                window_seconds=settings.WS_DRAIN_WINDOW_SECONDS,
+                batch_size=settings.WS_DRAIN_BATCH_SIZE,
+            )
+
+        # SIGUSR1 (e.g. from a preStop hook) drains sockets while the server
+        # still runs; uvicorn has closed them by the time lifespan shutdown does.
+        loop = asyncio.get_running_loop()
+        with contextlib.suppress(NotImplementedError, RuntimeError, AttributeError):
+            loop.add_signal_handler(signal.SIGUSR1, start_drain)
+        yield
+        with contextlib.suppress(NotImplementedError, RuntimeError, AttributeError):
+            loop.remove_signal_handler(signal.SIGUSR1)
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(start_drain(), timeout=settings.WS_DRAIN_WINDOW_SECONDS + 5)
+        for task in (invalidations, lag_monitor, sweeper):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if flusher is not None:
+            flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await flusher
+            # Last pass so read state written since the previous tick survives a deploy.
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(
+                    dm_state_service.flush_all(redis_client, AsyncSessionLocal), timeout=10
+                )
+
+    app = FastAPI(title="braumchat-api", lifespan=lifespan)
 
     origins = [o.strip() for o in (settings.CORS_ORIGINS or "").split(",") if o.strip()]
     app.add_middleware(
         HttpRateLimitMiddleware,
         redis=redis_client,
         settings=settings,
-        exempt_paths={"/health", "/healthz", "/readyz", "/metrics"},
+        exempt_paths={"/health", "/healthz", "/readyz", "/metrics", "/realtime/load"},
     )
 
     app.add_middleware(
@@ -39,8 +113,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+
     if getattr(settings, "METRICS_ENABLED", True):
         app.add_middleware(PrometheusMiddleware, excluded_paths={"/metrics"})
 
@@ -56,6 +139,7 @@ def create_app() -> FastAPI:
     app.include_router(channels_router.router, prefix="/channels", tags=["channels"])
     app.include_router(messages_router.router, prefix="", tags=["messages"])
     app.include_router(dm_router.router)
+    app.include_router(search_router.router)
     # WebSocket endpoints
     app.include_router(realtime_router.router)
 
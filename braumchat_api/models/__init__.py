@@ -1,7 +1,11 @@
+from . import search_index  # noqa - registers full-text DDL hooks
 from .channel import Channel  # noqa
 from .channel_member import ChannelMember  # noqa
+from .channel_read_marker import ChannelReadMarker  # noqa
 from .direct_message import DirectMessage  # noqa
 from .direct_message_thread import DirectMessageThread  # noqa
+from .dm_inbox import DirectMessageInbox  # noqa
+from .dm_read_state import DirectMessageReadState  # noqa
 from .friend import Friend  # noqa
 from .friend_request import FriendRequest  # noqa
 from .message import Message  # noqa
@@ -20,9 +24,12 @@ __all__ = [
     "WorkspaceMember",
     "Channel",
     "ChannelMember",
+    "ChannelReadMarker",
     "Message",
     "DirectMessageThread",
     "DirectMessage",
+    "DirectMessageInbox",
+    "DirectMessageReadState",
     "Friend",
     "FriendRequest",
     "UserSession",
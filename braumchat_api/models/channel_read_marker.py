@@ -0,0 +1,21 @@
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+
+from braumchat_api.models.meta import BaseEntity
+
+
+class ChannelReadMarker(BaseEntity):
+    """A user's last-read message id (watermark) in a channel.
+
+    Unread counts are derived from it at read time, so posting a message
+    never writes per-member state.
+    """
+
+    __tablename__ = "channel_read_markers"
+    __table_args__ = (
+        UniqueConstraint("user_id", "channel_id", name="uq_channel_read_markers_user_channel"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    channel_id = Column(Integer, ForeignKey("channels.id", ondelete="CASCADE"), nullable=False)
+    last_read_message_id = Column(Integer, nullable=False, default=0)
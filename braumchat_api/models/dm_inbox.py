@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from .meta import BaseEntity
+
+PREVIEW_LENGTH = 140
+
+
+class DirectMessageInbox(BaseEntity):
+    """One row per (user, other participant), kept current on every DM insert.
+
+    Legacy data can hold several threads for a pair; the row follows whichever
+    one was written to last, the same thread `get_or_create_thread` picks.
+
+    `GET /dm/threads` reads this table alone: a backward range scan of
+    `ix_dm_inbox_user_recent` gives the threads in recency order with the
+    last-message preview and the other participant, no per-thread lookups.
+    """
+
+    __tablename__ = "dm_inbox"
+    __table_args__ = (
+        UniqueConstraint("user_id", "other_user_id", name="uq_dm_inbox_user_other"),
+        Index("ix_dm_inbox_user_recent", "user_id", "last_message_at", "thread_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    thread_id = Column(
+        Integer, ForeignKey("direct_message_threads.id", ondelete="CASCADE"), nullable=False
+    )
+    other_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    last_message_id = Column(Integer, nullable=True)
+    last_message_at = Column(DateTime(timezone=True), nullable=False)
+    preview = Column(String(PREVIEW_LENGTH), nullable=True)
+
+    thread = relationship("DirectMessageThread")
+    other_user = relationship("User", foreign_keys=[other_user_id])
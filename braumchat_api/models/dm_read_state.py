@@ -0,0 +1,24 @@
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+
+from .meta import BaseEntity
+
+
+class DirectMessageReadState(BaseEntity):
+    """Durable copy of the Redis DM read state (see `dm_state_service`).
+
+    Redis stays the source of truth for active users; rows here are written by
+    the background flusher and used to re-warm Redis after eviction.
+    """
+
+    __tablename__ = "dm_read_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "thread_id", name="uq_dm_read_states_user_thread"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    thread_id = Column(
+        Integer, ForeignKey("direct_message_threads.id", ondelete="CASCADE"), nullable=False
+    )
+    unread_count = Column(Integer, nullable=False, default=0)
+    last_read_message_id = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text, func
 from sqlalchemy.orm import relationship
 
 from braumchat_api.models.meta import BaseEntity
@@ -6,6 +6,10 @@ from braumchat_api.models.meta import BaseEntity
 
 class Message(BaseEntity):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Latest-id lookups and bounded unread counts per channel.
+        Index("ix_messages_channel_id_id", "channel_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     channel_id = Column(Integer, ForeignKey("channels.id"), nullable=False)
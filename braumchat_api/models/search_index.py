@@ -0,0 +1,84 @@
+"""Full-text indexes over message content.
+
+Postgres gets a generated `search_vector tsvector` column with a GIN index on
+each searchable table; SQLite (local runs and tests) gets an external-content
+FTS5 table kept in sync by triggers. Neither is mapped on the models: both are
+created by DDL hooks on `create_all` and by the Alembic migration, and
+`include_object` keeps autogenerate from trying to drop them.
+"""
+
+from sqlalchemy import DDL, event
+
+from .direct_message import DirectMessage
+from .message import Message
+
+# No stemming or stop words: chat is multilingual and short.
+TS_CONFIG = "simple"
+SEARCH_COLUMN = "search_vector"
+
+SEARCHABLE_TABLES = (Message.__table__, DirectMessage.__table__)
+
+# Postgres-only typeahead indexes on users, created by migration c5e2a8b3d9f7.
+TYPEAHEAD_INDEXES = frozenset(
+    {"ix_users_display_name_lower_pattern", "ix_users_display_name_trgm"}
+)
+
+
+def fts_table(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def search_index_name(table_name: str) -> str:
+    return f"ix_{table_name}_{SEARCH_COLUMN}"
+
+
+def postgres_ddl(table_name: str) -> list[str]:
+    return [
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}'::regconfig, content)) STORED",
+        f"CREATE INDEX IF NOT EXISTS {search_index_name(table_name)} "
+        f"ON {table_name} USING gin ({SEARCH_COLUMN})",
+    ]
+
+
+def sqlite_ddl(table_name: str) -> list[str]:
+    fts = fts_table(table_name)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, content) VALUES ('delete', old.id, old.content);"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, content) VALUES (new.id, new.content);"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+        f"USING fts5(content, content='{table_name}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF content ON {table_name} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Alembic autogenerate filter: skip the search objects created outside the metadata."""
+    if type_ == "column" and name == SEARCH_COLUMN:
+        return False
+    if type_ == "index" and name in {search_index_name(t.name) for t in SEARCHABLE_TABLES}:
+        return False
+    if type_ == "index" and name in TYPEAHEAD_INDEXES:
+        return False
+    if type_ == "table" and name in {fts_table(t.name) for t in SEARCHABLE_TABLES}:
+        return False
+    return True
+
+
+for _table in SEARCHABLE_TABLES:
+    for _statement in postgres_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+    for _statement in sqlite_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        _table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {fts_table(_table.name)}").execute_if(dialect="sqlite"),
+    )
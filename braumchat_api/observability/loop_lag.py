@@ -0,0 +1,41 @@
+"""Event loop lag: how late a timed wake-up actually runs.
+
+Every coroutine on a worker shares one loop, so the lag is a direct read of
+how overloaded the worker is (CPU-bound handlers, GC pauses, too many
+sockets). WebSocket admission sheds new sockets on it (see
+realtime/admission.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from .metrics import EVENT_LOOP_LAG_SECONDS
+
+
+class LoopLagMonitor:
+    """Samples lag every `interval_seconds` while `run` is running.
+
+    `lag_seconds` jumps to a worse sample at once and decays towards better
+    ones, so shedding starts on the first slow tick and stops only once the
+    loop has been healthy for a few.
+    """
+
+    def __init__(self, decay: float = 0.3) -> None:
+        self.decay = decay
+        self.lag_seconds = 0.0
+
+    def observe(self, lag: float) -> None:
+        smoothed = self.lag_seconds + self.decay * (lag - self.lag_seconds)
+        self.lag_seconds = max(lag, smoothed)
+        EVENT_LOOP_LAG_SECONDS.set(self.lag_seconds)
+
+    async def run(self, interval_seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval_seconds)
+            self.observe(max(0.0, loop.time() - started - interval_seconds))
+
+
+loop_lag = LoopLagMonitor()
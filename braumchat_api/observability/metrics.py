@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from typing import Callable
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import Pool, QueuePool
 from starlette.responses import Response
 
 HTTP_REQUESTS_TOTAL = Counter(
@@ -15,6 +19,73 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
     labelnames=("method", "path"),
 )
 
+HTTP_COMPRESSION_BYTES_TOTAL = Counter(
+    "http_compression_bytes_total",
+    "Response body bytes before (stage=in) and after (stage=out) compression",
+    labelnames=("encoding", "stage"),
+)
+
+HTTP_COMPRESSION_SKIPPED_TOTAL = Counter(
+    "http_compression_skipped_total",
+    "Responses sent uncompressed to clients that accept compression, by reason",
+    labelnames=("reason",),
+)
+
+DB_POOL_TIMEOUTS_TOTAL = Counter(
+    "db_pool_timeouts_total",
+    "Requests that gave up waiting for a pooled connection, by bulkhead",
+    labelnames=("bulkhead",),
+)
+
+DB_SESSION_REQUESTS_TOTAL = Counter(
+    "db_session_requests_total",
+    "Requests given a DB session, by route and whether it ever ran a statement",
+    labelnames=("route", "used"),
+)
+
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a scheduled wake-up (see observability/loop_lag.py)",
+)
+
+WS_CONNECTIONS = Gauge("ws_connections", "WebSockets open on this worker")
+
+WS_ADMISSION_REJECTED_TOTAL = Counter(
+    "ws_admission_rejected_total",
+    "WebSockets refused at connect, by reason",
+    labelnames=("reason",),
+)
+
+
+class DbPoolCollector:
+    """Connection pool gauges per bulkhead, read from the pools at scrape time."""
+
+    def __init__(self, pools: Callable[[], dict[str, tuple[Pool, int | None]]]):
+        self._pools = pools
+
+    def collect(self):
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently in use", labels=["bulkhead"]
+        )
+        idle = GaugeMetricFamily(
+            "db_pool_idle", "Open connections waiting in the pool", labels=["bulkhead"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size", labels=["bulkhead"]
+        )
+        capacity = GaugeMetricFamily(
+            "db_pool_capacity", "Most connections the pool hands out at once", labels=["bulkhead"]
+        )
+        for name, (pool, limit) in self._pools().items():
+            if not isinstance(pool, QueuePool):
+                continue  # e.g. SQLite's StaticPool
+            checked_out.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(0, pool.overflow()))
+            if limit is not None:
+                capacity.add_metric([name], limit)
+        return [checked_out, idle, overflow, capacity]
+
 
 def render_metrics() -> Response:
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
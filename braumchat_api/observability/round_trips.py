@@ -0,0 +1,126 @@
+"""Count SQL statements and Redis round trips issued while a block runs.
+
+Meant for tests and benchmarks: wrap a single request (or a single WebSocket
+frame handler) and assert a budget so N+1 regressions fail loudly, e.g.::
+
+    with round_trip_budget(sql=3, redis=2, label="GET /friends/"):
+        await client.get("/friends/", headers=auth)
+
+Recording is scoped with a context variable, so concurrent requests running in
+other tasks are not attributed to the block.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+
+_current: ContextVar["RoundTrips | None"] = ContextVar("round_trips", default=None)
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class RoundTrips:
+    sql: list[str] = field(default_factory=list)
+    redis: list[str] = field(default_factory=list)
+
+    def assert_within(
+        self, *, sql: int | None = None, redis: int | None = None, label: str = ""
+    ) -> None:
+        problems: list[str] = []
+        if sql is not None and len(self.sql) > sql:
+            problems.append(f"{len(self.sql)} SQL statements (budget {sql})")
+        if redis is not None and len(self.redis) > redis:
+            problems.append(f"{len(self.redis)} Redis round trips (budget {redis})")
+        if not problems:
+            return
+
+        lines = [f"{label or 'block'} exceeded round-trip budget: " + ", ".join(problems)]
+        if self.sql:
+            lines.append("SQL:")
+            lines.extend(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(self.sql, 1))
+        if self.redis:
+            lines.append("Redis:")
+            lines.extend(f"  {i}. {c}" for i, c in enumerate(self.redis, 1))
+        raise RoundTripBudgetExceeded("\n".join(lines))
+
+
+@contextmanager
+def record_round_trips() -> Iterator[RoundTrips]:
+    trips = RoundTrips()
+    token = _current.set(trips)
+    try:
+        yield trips
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def round_trip_budget(
+    *, sql: int | None = None, redis: int | None = None, label: str = ""
+) -> Iterator[RoundTrips]:
+    with record_round_trips() as trips:
+        yield trips
+    trips.assert_within(sql=sql, redis=redis, label=label)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trips = _current.get()
+    if trips is not None:
+        trips.sql.append(statement)
+
+
+def instrument_engine(engine) -> None:
+    """Attach the statement counter to a (sync or async) SQLAlchemy engine."""
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _command_name(args) -> str:
+    return " ".join(str(a) for a in args[:2]) if args else "?"
+
+
+def instrument_redis(client) -> None:
+    """Wrap a redis.asyncio client so commands and pipelines are counted.
+
+    A pipeline counts as one round trip, listed with the commands it carried.
+    """
+
+    if getattr(client, "_round_trips_instrumented", False):
+        return
+
+    execute_command = client.execute_command
+    make_pipeline = client.pipeline
+
+    async def _execute_command(*args, **options):
+        trips = _current.get()
+        if trips is not None:
+            trips.redis.append(_command_name(args))
+        return await execute_command(*args, **options)
+
+    def _pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def _execute(*e_args, **e_kwargs):
+            trips = _current.get()
+            if trips is not None:
+                staged = ", ".join(_command_name(cmd[0]) for cmd in pipe.command_stack)
+                trips.redis.append(f"PIPELINE [{staged}]")
+            return await execute(*e_args, **e_kwargs)
+
+        pipe.execute = _execute
+        return pipe
+
+    client.execute_command = _execute_command
+    client.pipeline = _pipeline
+    client._round_trips_instrumented = True
@@ -0,0 +1,81 @@
+"""Admission control for WebSockets, per worker.
+
+A worker refuses new sockets when it is draining, holds
+WS_MAX_CONNECTIONS_PER_WORKER sockets, its event loop lags by
+WS_SHED_LOOP_LAG_MS or more, or the user already holds
+WS_MAX_CONNECTIONS_PER_USER sockets on it. Handlers check the worker-wide
+reasons before authenticating (shedding must not cost a database lookup)
+and the per-user cap right after. The caps are soft: sockets authenticating
+concurrently can overshoot them by a few.
+
+Refused sockets are accepted and closed at once, since the close code only
+reaches the client after the handshake: 1013 (Try Again Later), or 1012 when
+draining, with a JSON reason `{"reason": ..., "retry_after": seconds}`. The
+hint is jittered so refused clients don't retry in step.
+
+`load_report` backs GET /realtime/load, which the load balancer polls to
+send new sockets to the least-loaded workers.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+
+from fastapi import WebSocket
+
+from ..config import get_settings
+from ..observability.loop_lag import loop_lag
+from ..observability.metrics import WS_ADMISSION_REJECTED_TOTAL, WS_CONNECTIONS
+from .drain import DRAIN_CLOSE_CODE
+from .manager import ConnectionManager
+from .manager import manager as worker_manager
+
+OVERLOADED_CLOSE_CODE = 1013  # Try Again Later
+
+settings = get_settings()
+
+WS_CONNECTIONS.set_function(worker_manager.connection_count)
+
+
+def refusal(manager: ConnectionManager, *, user_id: int | None = None) -> str | None:
+    """Why a new socket would be refused right now, or None to admit it.
+
+    Without `user_id` only the worker-wide reasons are checked.
+    """
+    if manager.draining:
+        return "draining"
+    limit = settings.WS_MAX_CONNECTIONS_PER_WORKER
+    if limit > 0 and manager.connection_count() >= limit:
+        return "worker_full"
+    threshold_ms = settings.WS_SHED_LOOP_LAG_MS
+    if threshold_ms > 0 and loop_lag.lag_seconds * 1000.0 >= threshold_ms:
+        return "loop_lag"
+    limit = settings.WS_MAX_CONNECTIONS_PER_USER
+    if user_id is not None and limit > 0 and manager.user_total(user_id) >= limit:
+        return "user_full"
+    return None
+
+
+async def refuse(websocket: WebSocket, reason: str) -> None:
+    WS_ADMISSION_REJECTED_TOTAL.labels(reason=reason).inc()
+    base = max(1, settings.WS_RETRY_AFTER_SECONDS)
+    hint = {"reason": reason, "retry_after": random.randint(base, 2 * base)}
+    code = DRAIN_CLOSE_CODE if reason == "draining" else OVERLOADED_CLOSE_CODE
+    await websocket.accept()
+    await websocket.close(code=code, reason=json.dumps(hint, separators=(",", ":")))
+
+
+def load_report(manager: ConnectionManager) -> dict:
+    connections = manager.connection_count()
+    limit = settings.WS_MAX_CONNECTIONS_PER_WORKER
+    return {
+        "worker": os.getpid(),
+        "connections": connections,
+        "max_connections": limit or None,
+        "utilization": round(connections / limit, 4) if limit > 0 else None,
+        "loop_lag_ms": round(loop_lag.lag_seconds * 1000.0, 1),
+        "draining": manager.draining,
+        "accepting": refusal(manager) is None,
+    }
@@ -0,0 +1,124 @@
+"""Graceful WebSocket drain before a worker goes away.
+
+Closing every socket at once makes every client reconnect in the same second,
+and the surviving workers (and Postgres, through their auth lookups) take the
+whole herd together. `drain` spreads it over a window instead:
+
+1. the manager stops admitting sockets (handlers refuse with 1012);
+2. every client gets a `reconnect` frame whose `after_ms` falls in its
+   batch's slot of the window, jittered within the slot;
+3. at the end of each slot that batch's presence is cleared in one pipelined
+   pass and its sockets are closed with 1012 (Service Restart).
+
+Clients should reconnect `after_ms` after the frame (the load balancer picks
+the node), and on a bare 1012 back off with jitter as they would anyway.
+
+Triggers: SIGUSR1 and lifespan shutdown (see main.py). Under uvicorn the
+server closes open sockets *before* lifespan shutdown runs, so deployments
+should send SIGUSR1 from a preStop hook and wait WS_DRAIN_WINDOW_SECONDS
+before the SIGTERM.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+from redis.asyncio.client import Redis
+
+from ..services import presence_service
+from .manager import Connection, ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+DRAIN_CLOSE_CODE = 1012  # Service Restart
+
+_task: asyncio.Task | None = None
+
+
+def reset(manager: ConnectionManager) -> None:
+    """Admit sockets again and forget any earlier drain (app startup, tests)."""
+    global _task
+    _task = None
+    manager.draining = False
+
+
+def start(
+    manager: ConnectionManager, redis: Redis, *, window_seconds: float, batch_size: int
+) -> asyncio.Task:
+    """Start draining `manager`, or return the drain already under way."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(
+            drain(manager, redis, window_seconds=window_seconds, batch_size=batch_size)
+        )
+    return _task
+
+
+async def drain(
+    manager: ConnectionManager,
+    redis: Redis,
+    *,
+    window_seconds: float,
+    batch_size: int,
+    rng: random.Random | None = None,
+) -> int:
+    """Close every socket `manager` holds over `window_seconds`; returns how many."""
+    rng = rng or random.Random()
+    manager.draining = True
+    conns = manager.connections()
+    if not conns:
+        return 0
+    rng.shuffle(conns)
+    size = max(1, batch_size)
+    batches = [conns[i : i + size] for i in range(0, len(conns), size)]
+    slot = max(0.0, window_seconds) / len(batches)
+    started = time.monotonic()
+    logger.info("draining %d websockets in %d batches", len(conns), len(batches))
+
+    await asyncio.gather(
+        *(
+            _notify(conn, after_ms=int((i + rng.random()) * slot * 1000))
+            for i, batch in enumerate(batches)
+            for conn in batch
+        )
+    )
+    for i, batch in enumerate(batches):
+        delay = started + (i + 1) * slot - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await _release(manager, redis, batch)
+    logger.info("drained %d websockets in %.1fs", len(conns), time.monotonic() - started)
+    return len(conns)
+
+
+async def _notify(conn: Connection, *, after_ms: int) -> None:
+    try:
+        await conn.websocket.send_json(
+            {"type": "reconnect", "payload": {"after_ms": after_ms, "reason": "draining"}}
+        )
+    except Exception:
+        pass
+
+
+async def _release(manager: ConnectionManager, redis: Redis, batch: list[Connection]) -> None:
+    # Handlers skip their own presence cleanup for released sockets, so each
+    # batch costs two Redis round trips instead of a few per socket.
+    for conn in batch:
+        conn.released = True
+        conn.closed = True
+    try:
+        await presence_service.disconnect_many(
+            redis, [(c.user_id, c.presence_channel) for c in batch]
+        )
+    except Exception:
+        # Presence keys lapse on their own (USER_ONLINE_TTL_SECONDS).
+        logger.warning("bulk presence cleanup failed during drain", exc_info=True)
+    for conn in batch:
+        try:
+            await conn.websocket.close(code=DRAIN_CLOSE_CODE, reason="draining")
+        except Exception:
+            pass
+        await manager.disconnect(conn.channel_key, conn.websocket)
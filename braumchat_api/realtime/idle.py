@@ -0,0 +1,103 @@
+"""Idle WebSocket detection with one timer wheel per worker.
+
+If a client stops sending (laptop sleep, tab killed), the TCP connection can
+take a long time to be detected, so clients send lightweight pings and a
+socket that sends nothing for WS_CLIENT_IDLE_TIMEOUT_SECONDS is closed.
+
+Handlers only stamp `Connection.last_seen` per received frame (an attribute
+write); they used to wrap every receive in `asyncio.wait_for`, which armed
+and cancelled a timer per frame and kept one per socket. Instead the sweeper
+files each socket in the wheel slot of its earliest possible deadline. When
+a slot comes due, sockets that were active since are re-filed under their
+new deadline and the rest are closed (1001) in batches. A socket costs one
+visit per timeout period, not one per tick, however many frames it sends.
+
+Protocol-level WebSocket pings are answered by the server below ASGI and
+never reach the app, so they can't count here; uvicorn's
+`--ws-ping-interval` / `--ws-ping-timeout` catch dead peers at that level.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Callable
+
+from .manager import Connection
+
+logger = logging.getLogger(__name__)
+
+WS_CLIENT_IDLE_TIMEOUT_SECONDS = 25
+IDLE_CLOSE_CODE = 1001  # Going Away
+CLOSE_BATCH = 500
+
+
+class IdleSweeper:
+    def __init__(
+        self,
+        *,
+        timeout_seconds: float = WS_CLIENT_IDLE_TIMEOUT_SECONDS,
+        resolution_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.resolution_seconds = resolution_seconds
+        self.clock = clock
+        self._wheel: dict[int, list[Connection]] = defaultdict(list)
+        self._cursor = self._slot(clock())
+
+    def _slot(self, at: float) -> int:
+        return math.ceil(at / self.resolution_seconds)
+
+    def track(self, conn: Connection) -> None:
+        """Start watching `conn`, counting from now; closed sockets drop out on their own."""
+        conn.last_seen = self.clock()
+        self._file(conn)
+
+    def _file(self, conn: Connection) -> None:
+        # Never behind the cursor, or the slot would not be visited again.
+        slot = max(self._slot(conn.last_seen + self.timeout_seconds), self._cursor)
+        self._wheel[slot].append(conn)
+
+    async def sweep(self) -> int:
+        """Close sockets idle past the timeout; returns how many."""
+        now = self.clock()
+        due = self._slot(now)
+        idle: list[Connection] = []
+        while self._cursor <= due:
+            for conn in self._wheel.pop(self._cursor, ()):
+                if conn.closed:
+                    continue
+                if conn.last_seen + self.timeout_seconds <= now:
+                    idle.append(conn)
+                else:
+                    self._file(conn)
+            self._cursor += 1
+        for i in range(0, len(idle), CLOSE_BATCH):
+            await asyncio.gather(*(_close(conn) for conn in idle[i : i + CLOSE_BATCH]))
+        if idle:
+            logger.info("closed %d idle websockets", len(idle))
+        return len(idle)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.resolution_seconds)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.warning("idle websocket sweep failed", exc_info=True)
+
+
+async def _close(conn: Connection) -> None:
+    # Handlers see the disconnect on their pending receive and clean up.
+    conn.closed = True
+    try:
+        await conn.websocket.close(code=IDLE_CLOSE_CODE)
+    except Exception:
+        pass
+
+
+idle_sweeper = IdleSweeper()
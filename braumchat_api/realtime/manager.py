@@ -1,14 +1,23 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import WebSocket
 
 
-@dataclass
+# slots: a worker may hold ~100k of these, mostly idle.
+@dataclass(eq=False, slots=True)
 class Connection:
     websocket: WebSocket
     user_id: int
+    channel_key: str = ""
+    # (workspace_id, channel_id) for sockets that hold channel presence.
+    presence_channel: Optional[Tuple[int, int]] = None
+    # Set when a drain has already cleaned up this socket's presence in bulk.
+    released: bool = False
+    # time.monotonic() of the last frame received; see realtime/idle.py.
+    last_seen: float = 0.0
+    closed: bool = False
 
 
 class ConnectionManager:
@@ -17,19 +26,44 @@ class ConnectionManager:
     def __init__(self) -> None:
         # channel_key -> list[Connection]
         self.active_connections: Dict[str, List[Connection]] = defaultdict(list)
+        # Sockets per user across every channel key (admission caps read it).
+        self._user_counts: Counter[int] = Counter()
+        self._total = 0
+        # Set by realtime.drain: handlers stop admitting new sockets.
+        self.draining = False
 
-    async def connect(self, channel_key: str, websocket: WebSocket, user_id: int) -> None:
+    async def connect(
+        self,
+        channel_key: str,
+        websocket: WebSocket,
+        user_id: int,
+        *,
+        presence_channel: Optional[Tuple[int, int]] = None,
+    ) -> Connection:
         await websocket.accept()
-        self.active_connections[channel_key].append(
-            Connection(websocket=websocket, user_id=user_id)
+        conn = Connection(
+            websocket=websocket,
+            user_id=user_id,
+            channel_key=channel_key,
+            presence_channel=presence_channel,
         )
+        self.active_connections[channel_key].append(conn)
+        self._user_counts[user_id] += 1
+        self._total += 1
+        return conn
 
     async def disconnect(self, channel_key: str, websocket: WebSocket) -> None:
         connections = self.active_connections.get(channel_key, [])
-        self.active_connections[channel_key] = [
-            c for c in connections if c.websocket is not websocket
-        ]
-        if not self.active_connections[channel_key]:
+        kept = [c for c in connections if c.websocket is not websocket]
+        for conn in connections:
+            if conn.websocket is websocket:
+                conn.closed = True
+                self._user_counts[conn.user_id] -= 1
+                if self._user_counts[conn.user_id] <= 0:
+                    del self._user_counts[conn.user_id]
+                self._total -= 1
+        self.active_connections[channel_key] = kept
+        if not kept:
             self.active_connections.pop(channel_key, None)
 
     async def broadcast(self, channel_key: str, message: dict) -> None:
@@ -41,6 +75,16 @@ class ConnectionManager:
                 # ignore send errors but drop dead connections
                 await self.disconnect(channel_key, conn.websocket)
 
+    def connections(self) -> List[Connection]:
+        return [c for conns in self.active_connections.values() for c in conns]
+
+    def connection_count(self) -> int:
+        return self._total
+
+    def user_total(self, user_id: int) -> int:
+        """Sockets `user_id` holds on this worker, over every channel key."""
+        return self._user_counts.get(user_id, 0)
+
     def user_connection_count(self, channel_key: str, user_id: int) -> int:
         return sum(1 for c in self.active_connections.get(channel_key, []) if c.user_id == user_id)
 
@@ -18,3 +18,25 @@ class ChannelRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class ChannelWithUnread(ChannelRead):
+    """A channel listed with `include_unread=true`."""
+
+    last_message_id: Optional[int]
+    last_read_message_id: int
+    unread_count: int
+    unread_count_capped: bool
+
+
+class ChannelReadMark(BaseModel):
+    # Omit to mark everything up to the latest message as read.
+    last_read_message_id: Optional[int] = None
+
+
+class ChannelUnreadState(BaseModel):
+    channel_id: int
+    last_message_id: Optional[int]
+    last_read_message_id: int
+    unread_count: int
+    unread_count_capped: bool
@@ -25,6 +25,9 @@ class DirectMessageThreadRead(BaseModel):
     workspace_id: int
     participants: List[UserPublic]
     unread_count: int = 0
+    last_message_id: Optional[int] = None
+    last_message_at: Optional[datetime] = None
+    last_message_preview: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -62,3 +65,7 @@ class DirectMessageReadStatus(BaseModel):
     thread_id: int
     self_last_read_message_id: int
     other_last_read_message_id: int
+
+
+class DirectMessageUnreadTotal(BaseModel):
+    total_unread: int
@@ -20,3 +20,8 @@ class FriendRequestRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class FriendSuggestion(BaseModel):
+    user: UserPublic
+    mutual_friends: int
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, validator
 
@@ -38,3 +38,7 @@ class UserPublic(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int]
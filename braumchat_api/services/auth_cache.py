@@ -0,0 +1,107 @@
+"""Authenticated user per session id, cached in Redis for `get_current_user`.
+
+A hit answers a bearer-token request without touching Postgres, so routes
+whose real work is Redis-only (presence, cached read state, /auth/me) never
+check out a pooled connection. The lookup shares its round trip with the
+session-touch throttle (`sess:touch:{sid}`), which used to be a call of its own.
+
+Entries live AUTH_CACHE_TTL_SECONDS (0 disables the cache). Anything that
+revokes a session must call `invalidate`. If that call is lost, the TTL is how
+long a revoked token can keep working.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from redis.asyncio.client import Redis
+
+from ..config import get_settings
+
+AUTH_KEY_PATTERN = "auth:sess:{session_id}"
+TOUCH_KEY_PATTERN = "sess:touch:{session_id}"
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """The fields routes read from the current user (see schemas.user.UserRead)."""
+
+    id: int
+    email: str
+    display_name: str | None
+    avatar_url: str | None
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user) -> "AuthUser":
+        return cls(
+            id=int(user.id),
+            email=user.email,
+            display_name=user.display_name,
+            avatar_url=user.avatar_url,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "AuthUser":
+        data = json.loads(raw)
+        if data.get("created_at"):
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return json.dumps(data, separators=(",", ":"))
+
+
+def _key(session_id: str) -> str:
+    return AUTH_KEY_PATTERN.format(session_id=session_id)
+
+
+async def lookup(
+    redis: Redis, session_id: str, *, touch_ttl_seconds: int
+) -> tuple[AuthUser | None, bool]:
+    """(cached user or None, whether the session's last_seen_at is due a touch).
+
+    One pipelined round trip. Raises on Redis errors; callers fall back to
+    the database and skip the touch.
+    """
+    cached = settings.AUTH_CACHE_TTL_SECONDS > 0
+    touch = touch_ttl_seconds > 0
+    if not (cached or touch):
+        return None, False
+    pipe = redis.pipeline(transaction=False)
+    if cached:
+        pipe.get(_key(session_id))
+    if touch:
+        pipe.set(
+            TOUCH_KEY_PATTERN.format(session_id=session_id), "1", ex=touch_ttl_seconds, nx=True
+        )
+    results = await pipe.execute()
+    raw = results.pop(0) if cached else None
+    touch_due = bool(results[0]) if touch else False
+    return (AuthUser.from_json(raw) if raw else None), touch_due
+
+
+async def put(redis: Redis, session_id: str, user: AuthUser) -> None:
+    if settings.AUTH_CACHE_TTL_SECONDS > 0:
+        await redis.set(_key(session_id), user.to_json(), ex=settings.AUTH_CACHE_TTL_SECONDS)
+
+
+async def invalidate(redis: Redis, *session_ids: str) -> None:
+    """Forget revoked sessions. Best-effort: the TTL bounds a lost delete."""
+    if not session_ids:
+        return
+    try:
+        await redis.delete(*(_key(str(sid)) for sid in session_ids))
+    except Exception:
+        pass
@@ -1,7 +1,13 @@
-from sqlalchemy import select
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..db.dialect import insert_for
 from ..models.channel import Channel
+from ..models.channel_read_marker import ChannelReadMarker
+from ..models.message import Message
+
+# Unread counts are exact up to this many messages; beyond it clients show "N+".
+UNREAD_COUNT_CAP = 99
 
 
 async def create_channel(
@@ -22,3 +28,86 @@ async def list_channels(db: AsyncSession, workspace_id: int):
 async def get_channel(db: AsyncSession, channel_id: int):
     q = await db.execute(select(Channel).where(Channel.id == channel_id))
     return q.scalars().first()
+
+
+def _with_unread(stmt, user_id: int):
+    """Add (last_message_id, last_read_message_id, unread_count) columns to a
+    select over `Channel`.
+
+    The latest id comes from `ix_messages_channel_id_id`; a channel with nothing
+    past the watermark costs that one lookup. Otherwise the count walks the
+    same index but stops after UNREAD_COUNT_CAP + 1 rows.
+    """
+    watermark = func.coalesce(ChannelReadMarker.last_read_message_id, 0)
+    latest = select(func.max(Message.id)).where(Message.channel_id == Channel.id).scalar_subquery()
+    unread_ids = (
+        select(Message.id)
+        .where(
+            Message.channel_id == Channel.id,
+            Message.id > watermark,
+            Message.user_id != user_id,  # your own messages are never unread
+        )
+        .correlate(Channel, ChannelReadMarker)
+        .limit(UNREAD_COUNT_CAP + 1)
+        .subquery()
+    )
+    bounded = select(func.count()).select_from(unread_ids).scalar_subquery()
+    return stmt.add_columns(
+        latest.label("last_message_id"),
+        watermark.label("last_read_message_id"),
+        case((func.coalesce(latest, 0) > watermark, bounded), else_=0).label("unread_count"),
+    ).outerjoin(
+        ChannelReadMarker,
+        and_(ChannelReadMarker.channel_id == Channel.id, ChannelReadMarker.user_id == user_id),
+    )
+
+
+def _unread_fields(row) -> dict:
+    unread = int(row.unread_count or 0)
+    return {
+        "last_message_id": row.last_message_id,
+        "last_read_message_id": int(row.last_read_message_id or 0),
+        "unread_count": min(unread, UNREAD_COUNT_CAP),
+        "unread_count_capped": unread > UNREAD_COUNT_CAP,
+    }
+
+
+async def list_channels_with_unread(db: AsyncSession, workspace_id: int, user_id: int):
+    """Channels of a workspace with the user's unread state, in one query."""
+    stmt = _with_unread(select(Channel), user_id).where(Channel.workspace_id == workspace_id)
+    rows = (await db.execute(stmt)).all()
+    return [(row.Channel, _unread_fields(row)) for row in rows]
+
+
+async def get_unread_state(db: AsyncSession, *, channel_id: int, user_id: int) -> dict:
+    stmt = _with_unread(select(Channel.id), user_id).where(Channel.id == channel_id)
+    row = (await db.execute(stmt)).first()
+    return _unread_fields(row)
+
+
+async def mark_read(
+    db: AsyncSession, *, channel_id: int, user_id: int, message_id: int | None = None
+) -> dict:
+    """Move the user's watermark forward (never back) and return the new state.
+
+    `message_id=None` marks everything read; ids past the channel's latest
+    message are clamped to it.
+    """
+    latest = await db.scalar(
+        select(func.coalesce(func.max(Message.id), 0)).where(Message.channel_id == channel_id)
+    )
+    target = latest if message_id is None else min(int(message_id), latest)
+
+    insert = insert_for(db)
+    stmt = insert(ChannelReadMarker).values(
+        user_id=user_id, channel_id=channel_id, last_read_message_id=target
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "channel_id"],
+            set_={"last_read_message_id": stmt.excluded.last_read_message_id},
+            where=ChannelReadMarker.last_read_message_id < stmt.excluded.last_read_message_id,
+        )
+    )
+    await db.commit()
+    return await get_unread_state(db, channel_id=channel_id, user_id=user_id)
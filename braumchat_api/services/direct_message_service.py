@@ -1,16 +1,44 @@
-from sqlalchemy import and_, or_, select
+import base64
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, selectinload
 
+from ..db.dialect import insert_for
 from ..models.direct_message import DirectMessage
 from ..models.direct_message_thread import DirectMessageThread
+from ..models.dm_inbox import PREVIEW_LENGTH, DirectMessageInbox
 from ..models.user import User
+from .user_service import escape_like
 
 
 def _ordered_user_ids(user_a: int, user_b: int) -> tuple[int, int]:
     return (user_a, user_b) if user_a < user_b else (user_b, user_a)
 
 
+def _preview(content: str) -> str:
+    content = " ".join(content.split())
+    if len(content) <= PREVIEW_LENGTH:
+        return content
+    return content[: PREVIEW_LENGTH - 1] + "\u2026"
+
+
+def encode_cursor(last_message_at: datetime, thread_id: int) -> str:
+    raw = f"{last_message_at.isoformat()}|{int(thread_id)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of `encode_cursor`; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        at, thread_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(at), int(thread_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 async def get_or_create_thread(
     db: AsyncSession, *, workspace_id: int, user_a: int, user_b: int
 ) -> DirectMessageThread:
@@ -58,6 +86,26 @@ async def get_or_create_thread(
         user2_id=user2_id,
     )
     db.add(thread)
+    await db.flush()
+
+    # Both participants see the new thread in their inbox right away.
+    now = datetime.now(timezone.utc)
+    insert = insert_for(db)
+    await db.execute(
+        insert(DirectMessageInbox)
+        .values(
+            [
+                {
+                    "user_id": owner,
+                    "thread_id": thread.id,
+                    "other_user_id": other,
+                    "last_message_at": now,
+                }
+                for owner, other in ((user1_id, user2_id), (user2_id, user1_id))
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "other_user_id"])
+    )
     await db.commit()
     await db.refresh(thread)
     return thread
@@ -71,57 +119,51 @@ async def list_threads(
     query: str | None = None,
     limit: int = 50,
     offset: int = 0,
-):
-    user1 = aliased(User)
-    user2 = aliased(User)
+    cursor: str | None = None,
+) -> list[tuple[DirectMessageInbox, DirectMessageThread, User]]:
+    """Most recently active threads first, as (inbox row, thread, other user).
 
+    One range scan over `ix_dm_inbox_user_recent`. Pass the `next_cursor` of
+    the previous page as `cursor` for stable keyset paging; `offset` is only
+    kept for older clients.
+    """
+    other = aliased(User)
     stmt = (
-        select(DirectMessageThread)
-        .join(user1, DirectMessageThread.user1_id == user1.id)
-        .join(user2, DirectMessageThread.user2_id == user2.id)
-        .where(
-            or_(
-                DirectMessageThread.user1_id == user_id,
-                DirectMessageThread.user2_id == user_id,
-            )
-        )
+        select(DirectMessageInbox, DirectMessageThread, other)
+        .join(DirectMessageThread, DirectMessageThread.id == DirectMessageInbox.thread_id)
+        .join(other, other.id == DirectMessageInbox.other_user_id)
+        .where(DirectMessageInbox.user_id == user_id)
     )
     # workspace_id é um filtro de UI; para manter DMs consistentes entre workspaces,
     # listamos todas as threads do usuário.
 
     if query:
-        q = f"%{query.strip()}%"
-        stmt = stmt.where(or_(user1.display_name.ilike(q), user2.display_name.ilike(q)))
+        q = f"%{escape_like(query.strip().lower())}%"
+        stmt = stmt.where(func.lower(other.display_name).like(q, escape="\\"))
 
-    # Pegamos um pouco mais para compensar dedupe em memória.
-    # (Sem isso, offset/limit poderiam reduzir demais o resultado final.)
-    fetch_limit = max(limit, 1) * 5
+    if cursor:
+        last_message_at, thread_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(DirectMessageInbox.last_message_at, DirectMessageInbox.thread_id)
+            < tuple_(last_message_at, thread_id)
+        )
+    elif offset:
+        stmt = stmt.offset(offset)
 
     result = await db.execute(
-        stmt.options(
-            selectinload(DirectMessageThread.user1),
-            selectinload(DirectMessageThread.user2),
-        )
-        .order_by(DirectMessageThread.updated_at.desc())
-        .offset(offset)
-        .limit(fetch_limit)
+        stmt.order_by(
+            DirectMessageInbox.last_message_at.desc(), DirectMessageInbox.thread_id.desc()
+        ).limit(limit)
     )
-    rows = result.scalars().all()
+    return [tuple(row) for row in result.all()]
 
-    # Dedupe por par (user1,user2) independente de ordem/workspace.
-    def _sort_key(t: DirectMessageThread):
-        return (t.updated_at or t.created_at, t.id)
 
-    by_pair: dict[tuple[int, int], DirectMessageThread] = {}
-    for t in rows:
-        a, b = _ordered_user_ids(int(t.user1_id), int(t.user2_id))
-        key = (a, b)
-        prev = by_pair.get(key)
-        if prev is None or _sort_key(t) > _sort_key(prev):
-            by_pair[key] = t
-
-    deduped = sorted(by_pair.values(), key=_sort_key, reverse=True)
-    return deduped[:limit]
+def next_cursor(rows: list[tuple[DirectMessageInbox, DirectMessageThread, User]], limit: int):
+    """Cursor for the page after `rows`, or None when this was the last one."""
+    if len(rows) < limit:
+        return None
+    inbox = rows[-1][0]
+    return encode_cursor(inbox.last_message_at, inbox.thread_id)
 
 
 async def get_thread(db: AsyncSession, thread_id: int) -> DirectMessageThread | None:
@@ -141,25 +183,110 @@ def user_in_thread(thread: DirectMessageThread, user_id: int) -> bool:
 
 
 async def list_messages(db: AsyncSession, *, thread_id: int, limit: int = 50, offset: int = 0):
+    """Newest messages as plain row mappings; senders come from the already-loaded thread."""
     stmt = (
-        select(DirectMessage)
-        .options(selectinload(DirectMessage.sender))
+        select(
+            DirectMessage.id,
+            DirectMessage.thread_id,
+            DirectMessage.sender_id,
+            DirectMessage.content,
+            DirectMessage.is_deleted,
+            DirectMessage.is_edited,
+            DirectMessage.created_at,
+            DirectMessage.updated_at,
+        )
         .where(DirectMessage.thread_id == thread_id)
         .order_by(DirectMessage.created_at.desc())
         .offset(offset)
         .limit(limit)
     )
     result = await db.execute(stmt)
-    return result.scalars().all()
+    return result.mappings().all()
+
+
+def shape_messages(rows, authors: dict[int, dict]) -> list[dict]:
+    """`list_messages` rows as DirectMessageRead-shaped dicts, ready for FastJSONResponse."""
+    return [
+        {
+            "id": row["id"],
+            "thread_id": row["thread_id"],
+            "user_id": row["sender_id"],
+            "content": row["content"],
+            "client_id": None,
+            "is_deleted": row["is_deleted"],
+            "is_edited": row["is_edited"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "author": authors.get(row["sender_id"])
+            or {"id": row["sender_id"], "display_name": None, "avatar_url": None},
+        }
+        for row in rows
+    ]
 
 
 async def create_direct_message(
-    db: AsyncSession, *, thread_id: int, sender_id: int, content: str
+    db: AsyncSession,
+    *,
+    thread_id: int,
+    sender_id: int,
+    content: str,
+    recipient_id: int | None = None,
 ) -> DirectMessage:
-    message = DirectMessage(thread_id=thread_id, sender_id=sender_id, content=content)
+    """Insert a DM and move the thread to the top of both participants' inboxes.
+
+    Callers that already loaded the thread should pass `recipient_id` to save
+    a lookup.
+    """
+    if recipient_id is None:
+        thread = await db.get(DirectMessageThread, thread_id)
+        recipient_id = thread.user2_id if thread.user1_id == sender_id else thread.user1_id
+
+    now = datetime.now(timezone.utc)
+    message = DirectMessage(
+        thread_id=thread_id, sender_id=sender_id, content=content, created_at=now
+    )
     db.add(message)
+    await db.flush()
+
+    insert = insert_for(db)
+    upsert = insert(DirectMessageInbox).values(
+        [
+            {
+                "user_id": owner,
+                "thread_id": thread_id,
+                "other_user_id": other,
+                "last_message_id": message.id,
+                "last_message_at": now,
+                "preview": _preview(content),
+            }
+            for owner, other in ((sender_id, recipient_id), (recipient_id, sender_id))
+        ]
+    )
+    # Keyed by pair: a post to an older thread of the pair moves its one inbox
+    # row there instead of adding a second entry.
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["user_id", "other_user_id"],
+            set_={
+                "thread_id": upsert.excluded.thread_id,
+                "last_message_id": upsert.excluded.last_message_id,
+                "last_message_at": upsert.excluded.last_message_at,
+                "preview": upsert.excluded.preview,
+            },
+            # Concurrent sends may commit out of order; never move an inbox backwards.
+            where=or_(
+                DirectMessageInbox.last_message_id.is_(None),
+                DirectMessageInbox.last_message_id < upsert.excluded.last_message_id,
+            ),
+        )
+    )
+    await db.execute(
+        update(DirectMessageThread)
+        .where(DirectMessageThread.id == thread_id)
+        .values(updated_at=now)
+    )
     await db.commit()
-    await db.refresh(message)
+
     q = await db.execute(
         select(DirectMessage)
         .options(selectinload(DirectMessage.sender))
@@ -1,73 +1,525 @@
+"""Per-user DM read state: Redis for active users, Postgres for the rest.
+
+Each user has two Redis hashes keyed by thread id, one for unread counts and
+one for last-read message ids, plus a running total for the unread badge.
+Writes go through Lua scripts so read-modify-write steps (max last-read, total
+upkeep) are atomic. Every write and read refreshes a TTL on the user's keys,
+so users who go quiet fall out of Redis and memory tracks the active set.
+
+Writes also add "user:thread" to a dirty set; `run_flusher` drains it in
+batches into `dm_read_states` with bulk upserts. A user whose keys are gone is
+"cold": write scripts refuse to touch cold state, and the caller warms it from
+Postgres (pass `db`) and retries, so nothing is lost across evictions.
+
+The total counter only exists while a user is warm, so its presence is the
+marker. Older deployments wrote per-(user, thread) string keys instead; write
+scripts fold the key of the thread they touch, and `migrate_legacy_keys`
+folds the rest in one pass over the keyspace, run once from the flusher and
+recorded in Redis. Request paths never SCAN.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import itertools
+import logging
+import re
+from collections import defaultdict
 from typing import Iterable
 
 from redis.asyncio.client import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.dialect import insert_for
+from ..db.redis import Script
+from ..models.dm_read_state import DirectMessageReadState
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY_PATTERN = "dm_unread:user:{user_id}"
+LAST_READ_KEY_PATTERN = "dm_last_read:user:{user_id}"
+UNREAD_TOTAL_KEY_PATTERN = "dm_unread_total:user:{user_id}"
+DIRTY_KEY = "dm_state:dirty"
+
+LEGACY_UNREAD_KEY_PATTERN = "dm_unread:user:{user_id}:thread:{thread_id}"
+LEGACY_LAST_READ_KEY_PATTERN = "dm_last_read:user:{user_id}:thread:{thread_id}"
 
+LEGACY_MIGRATED_KEY = "dm_state:legacy_migrated"
+LEGACY_MIGRATION_LOCK_KEY = "dm_state:legacy_migration:lock"
+LEGACY_MIGRATION_LOCK_SECONDS = 600
+_LEGACY_KEY_RE = re.compile(r"^dm_(unread|last_read):user:(\d+):thread:(\d+)$")
 
-UNREAD_KEY_PATTERN = "dm_unread:user:{user_id}:thread:{thread_id}"
-LAST_READ_KEY_PATTERN = "dm_last_read:user:{user_id}:thread:{thread_id}"
+STATE_TTL_SECONDS = 7 * 24 * 3600
+SCRIPT_BATCH = 500
+FLUSH_BATCH = 1000
 
 
-def _unread_key(user_id: int, thread_id: int) -> str:
-    return UNREAD_KEY_PATTERN.format(user_id=user_id, thread_id=thread_id)
+def _unread_key(user_id: int) -> str:
+    return UNREAD_KEY_PATTERN.format(user_id=user_id)
 
 
-def _last_read_key(user_id: int, thread_id: int) -> str:
-    return LAST_READ_KEY_PATTERN.format(user_id=user_id, thread_id=thread_id)
+def _last_read_key(user_id: int) -> str:
+    return LAST_READ_KEY_PATTERN.format(user_id=user_id)
 
 
-async def increment_unread(redis: Redis, *, user_id: int, thread_id: int, delta: int = 1) -> int:
-    return int(await redis.incrby(_unread_key(user_id, thread_id), delta))
+def _total_key(user_id: int) -> str:
+    return UNREAD_TOTAL_KEY_PATTERN.format(user_id=user_id)
 
 
-async def clear_unread(redis: Redis, *, user_id: int, thread_id: int) -> None:
-    await redis.delete(_unread_key(user_id, thread_id))
+def _user_keys(user_id: int) -> list[str]:
+    return [_unread_key(user_id), _last_read_key(user_id), _total_key(user_id)]
 
 
-async def get_unread(redis: Redis, *, user_id: int, thread_id: int) -> int:
-    raw = await redis.get(_unread_key(user_id, thread_id))
+def _legacy_unread_key(user_id: int, thread_id: int) -> str:
+    return LEGACY_UNREAD_KEY_PATTERN.format(user_id=user_id, thread_id=thread_id)
+
+
+def _legacy_last_read_key(user_id: int, thread_id: int) -> str:
+    return LEGACY_LAST_READ_KEY_PATTERN.format(user_id=user_id, thread_id=thread_id)
+
+
+def _to_int(raw) -> int:
     try:
         return int(raw or 0)
     except (TypeError, ValueError):
         return 0
 
 
+def _batched(items: list) -> list[list]:
+    return [items[i : i + SCRIPT_BATCH] for i in range(0, len(items), SCRIPT_BATCH)]
+
+
+# Write scripts share one layout. KEYS: unread hash, last-read hash, total,
+# dirty set, the thread's legacy key. ARGV: ttl, dirty member, thread id, value.
+# They return nil when the user is cold so the caller can warm and retry.
+_COLD_CHECK = "if redis.call('EXISTS', KEYS[3]) == 0 then return false end\n"
+_TOUCH = """
+redis.call('SADD', KEYS[4], ARGV[2])
+for i = 1, 3 do redis.call('EXPIRE', KEYS[i], ARGV[1]) end
+"""
+
+# A legacy value was never part of the total, so it is added to both.
+_INCREMENT_UNREAD = Script(
+    _COLD_CHECK
+    + """
+local delta = tonumber(ARGV[4])
+local legacy = redis.call('GET', KEYS[5])
+if legacy then
+  delta = delta + (tonumber(legacy) or 0)
+  redis.call('DEL', KEYS[5])
+end
+local n = redis.call('HINCRBY', KEYS[1], ARGV[3], delta)
+redis.call('INCRBY', KEYS[3], delta)
+"""
+    + _TOUCH
+    + "return n\n"
+)
+
+_CLEAR_UNREAD = Script(
+    _COLD_CHECK
+    + """
+local n = tonumber(redis.call('HGET', KEYS[1], ARGV[3]) or '0') or 0
+redis.call('HDEL', KEYS[1], ARGV[3])
+redis.call('DEL', KEYS[5])
+if n ~= 0 and redis.call('DECRBY', KEYS[3], n) < 0 then
+  redis.call('SET', KEYS[3], 0)
+end
+"""
+    + _TOUCH
+    + "return n\n"
+)
+
+# Stores the max so racing clients never move the marker backwards.
+_SET_LAST_READ = Script(
+    _COLD_CHECK
+    + """
+local cur = tonumber(redis.call('HGET', KEYS[2], ARGV[3]) or '0') or 0
+local legacy = redis.call('GET', KEYS[5])
+if legacy then
+  cur = math.max(cur, tonumber(legacy) or 0)
+  redis.call('DEL', KEYS[5])
+end
+local nxt = math.max(cur, tonumber(ARGV[4]))
+redis.call('HSET', KEYS[2], ARGV[3], string.format('%d', nxt))
+"""
+    + _TOUCH
+    + "return nxt\n"
+)
+
+# Warm step 1. KEYS: unread hash, last-read hash, total. ARGV: triples of
+# (thread id, unread, last read) from Postgres. No-op once the user is warm.
+_LOAD = Script(
+    """
+if redis.call('EXISTS', KEYS[3]) == 1 then return 0 end
+for i = 1, #ARGV, 3 do
+  local unread = tonumber(ARGV[i + 1])
+  if unread > 0 then redis.call('HSETNX', KEYS[1], ARGV[i], unread) end
+  local last_read = tonumber(ARGV[i + 2])
+  local cur = tonumber(redis.call('HGET', KEYS[2], ARGV[i]) or '0') or 0
+  if last_read > cur then
+    redis.call('HSET', KEYS[2], ARGV[i], string.format('%d', last_read))
+  end
+end
+return 1
+"""
+)
+
+# Warm step 2. KEYS: unread hash, last-read hash, total, then legacy unread keys
+# followed by legacy last-read keys. ARGV: ttl, number of legacy unread keys,
+# then one thread id per legacy key. Creates the total when it is missing.
+_MIGRATE = Script(
+    """
+local n_unread = tonumber(ARGV[2])
+local had_total = redis.call('EXISTS', KEYS[3]) == 1
+for i = 4, #KEYS do
+  local field = ARGV[i - 1]
+  local v = redis.call('GET', KEYS[i])
+  if v then
+    local n = tonumber(v) or 0
+    if i < 4 + n_unread then
+      redis.call('HINCRBY', KEYS[1], field, n)
+      if had_total then redis.call('INCRBY', KEYS[3], n) end
+    else
+      local cur = tonumber(redis.call('HGET', KEYS[2], field) or '0') or 0
+      if n > cur then redis.call('HSET', KEYS[2], field, string.format('%d', n)) end
+    end
+    redis.call('DEL', KEYS[i])
+  end
+end
+if not had_total then
+  local total = 0
+  for _, v in ipairs(redis.call('HVALS', KEYS[1])) do
+    total = total + (tonumber(v) or 0)
+  end
+  redis.call('SET', KEYS[3], math.max(total, 0))
+end
+for i = 1, 3 do redis.call('EXPIRE', KEYS[i], ARGV[1]) end
+return tonumber(redis.call('GET', KEYS[3]))
+"""
+)
+
+
+async def warm(
+    redis: Redis,
+    *,
+    user_id: int,
+    db: AsyncSession | None = None,
+    legacy: tuple[list[tuple[str, str]], list[tuple[str, str]]] = ([], []),
+) -> int:
+    """Rebuild a cold user's Redis state; returns the unread total.
+
+    Loads the user's rows from `dm_read_states` when `db` is given, then folds
+    in the `legacy` (unread, last-read) keys given as (key, thread id) pairs.
+    Users with rows already went through a fold, so theirs are just dropped.
+    Safe to run concurrently with other warmers and writers.
+    """
+    keys = _user_keys(user_id)
+    rows = []
+    if db is not None:
+        result = await db.execute(
+            select(
+                DirectMessageReadState.thread_id,
+                DirectMessageReadState.unread_count,
+                DirectMessageReadState.last_read_message_id,
+            ).where(DirectMessageReadState.user_id == user_id)
+        )
+        rows = result.all()
+        for chunk in _batched(rows):
+            await _LOAD(redis, keys, [int(v) for row in chunk for v in row])
+
+    unread, last_read = legacy
+    if rows and (unread or last_read):
+        await redis.delete(*(key for key, _ in unread + last_read))
+        unread, last_read = [], []
+
+    total = 0
+    batches = itertools.zip_longest(_batched(unread), _batched(last_read), fillvalue=[])
+    for unread_batch, last_read_batch in list(batches) or [([], [])]:
+        pairs = unread_batch + last_read_batch
+        total = await _MIGRATE(
+            redis,
+            keys + [key for key, _ in pairs],
+            [STATE_TTL_SECONDS, len(unread_batch)] + [thread_id for _, thread_id in pairs],
+        )
+    return _to_int(total)
+
+
+async def _write(
+    redis: Redis,
+    script: Script,
+    *,
+    user_id: int,
+    thread_id: int,
+    legacy_key: str,
+    value: int,
+    db: AsyncSession | None,
+):
+    keys = _user_keys(user_id) + [DIRTY_KEY, legacy_key]
+    args = [STATE_TTL_SECONDS, f"{int(user_id)}:{int(thread_id)}", int(thread_id), int(value)]
+    result = await script(redis, keys, args)
+    if result is None:
+        await warm(redis, user_id=user_id, db=db)
+        result = await script(redis, keys, args)
+    return result
+
+
+async def increment_unread(
+    redis: Redis,
+    *,
+    user_id: int,
+    thread_id: int,
+    delta: int = 1,
+    db: AsyncSession | None = None,
+) -> int:
+    return _to_int(
+        await _write(
+            redis,
+            _INCREMENT_UNREAD,
+            user_id=user_id,
+            thread_id=thread_id,
+            legacy_key=_legacy_unread_key(user_id, thread_id),
+            value=delta,
+            db=db,
+        )
+    )
+
+
+async def clear_unread(
+    redis: Redis, *, user_id: int, thread_id: int, db: AsyncSession | None = None
+) -> None:
+    await _write(
+        redis,
+        _CLEAR_UNREAD,
+        user_id=user_id,
+        thread_id=thread_id,
+        legacy_key=_legacy_unread_key(user_id, thread_id),
+        value=0,
+        db=db,
+    )
+
+
+async def get_unread(
+    redis: Redis, *, user_id: int, thread_id: int, db: AsyncSession | None = None
+) -> int:
+    unread = await get_unread_map(redis, user_id=user_id, thread_ids=[thread_id], db=db)
+    return unread.get(int(thread_id), 0)
+
+
 async def get_unread_map(
-    redis: Redis, *, user_id: int, thread_ids: Iterable[int]
+    redis: Redis,
+    *,
+    user_id: int,
+    thread_ids: Iterable[int],
+    db: AsyncSession | None = None,
 ) -> dict[int, int]:
     ids = [int(tid) for tid in thread_ids]
     if not ids:
         return {}
-    pipe = redis.pipeline()
-    for tid in ids:
-        pipe.get(_unread_key(user_id, tid))
+    # One round trip: the counts, the warm marker and the TTL refresh.
+    pipe = redis.pipeline(transaction=False)
+    pipe.hmget(_unread_key(user_id), ids)
+    pipe.exists(_total_key(user_id))
+    for key in _user_keys(user_id):
+        pipe.expire(key, STATE_TTL_SECONDS)
+    values, warm_, *_ = await pipe.execute()
+    if not warm_:
+        await warm(redis, user_id=user_id, db=db)
+        values = await redis.hmget(_unread_key(user_id), ids)
+    return {tid: _to_int(raw) for tid, raw in zip(ids, values)}
+
+
+async def get_total_unread(redis: Redis, *, user_id: int, db: AsyncSession | None = None) -> int:
+    pipe = redis.pipeline(transaction=False)
+    pipe.get(_total_key(user_id))
+    for key in _user_keys(user_id):
+        pipe.expire(key, STATE_TTL_SECONDS)
+    raw, *_ = await pipe.execute()
+    if raw is None:
+        return await warm(redis, user_id=user_id, db=db)
+    return max(0, _to_int(raw))
+
+
+async def set_last_read(
+    redis: Redis,
+    *,
+    user_id: int,
+    thread_id: int,
+    message_id: int,
+    db: AsyncSession | None = None,
+) -> int:
+    return _to_int(
+        await _write(
+            redis,
+            _SET_LAST_READ,
+            user_id=user_id,
+            thread_id=thread_id,
+            legacy_key=_legacy_last_read_key(user_id, thread_id),
+            value=message_id,
+            db=db,
+        )
+    )
+
+
+async def get_last_read(
+    redis: Redis, *, user_id: int, thread_id: int, db: AsyncSession | None = None
+) -> int:
+    last_read = await get_last_read_map(redis, thread_id=thread_id, user_ids=[user_id], db=db)
+    return last_read[int(user_id)]
+
+
+async def get_last_read_map(
+    redis: Redis,
+    *,
+    thread_id: int,
+    user_ids: Iterable[int],
+    db: AsyncSession | None = None,
+) -> dict[int, int]:
+    """Last-read ids of several users in one thread, in one round trip when warm."""
+    ids = [int(uid) for uid in user_ids]
+    pipe = redis.pipeline(transaction=False)
+    for uid in ids:
+        pipe.hget(_last_read_key(uid), int(thread_id))
+        pipe.exists(_total_key(uid))
     results = await pipe.execute()
-    out: dict[int, int] = {}
-    for tid, raw in zip(ids, results):
-        try:
-            out[tid] = int(raw or 0)
-        except (TypeError, ValueError):
-            out[tid] = 0
+    out = {}
+    for i, uid in enumerate(ids):
+        raw, warm_ = results[2 * i], results[2 * i + 1]
+        if not warm_:
+            await warm(redis, user_id=uid, db=db)
+            raw = await redis.hget(_last_read_key(uid), int(thread_id))
+        out[uid] = _to_int(raw)
     return out
 
 
-async def set_last_read(redis: Redis, *, user_id: int, thread_id: int, message_id: int) -> int:
-    # Store the max (don't regress when clients race).
-    key = _last_read_key(user_id, thread_id)
-    current_raw = await redis.get(key)
+async def flush_dirty(redis: Redis, db: AsyncSession, *, batch_size: int = FLUSH_BATCH) -> int:
+    """Copy one batch of dirty (user, thread) states to Postgres.
+
+    Returns how many dirty entries were taken. Entries are put back if the
+    write fails, so a later run retries them.
+    """
+    members = await redis.spop(DIRTY_KEY, batch_size)
+    if not members:
+        return 0
     try:
-        current = int(current_raw or 0)
-    except (TypeError, ValueError):
-        current = 0
-    next_value = max(current, int(message_id))
-    await redis.set(key, str(next_value))
-    return next_value
+        pairs = sorted(
+            {
+                tuple(int(p) for p in (m.decode() if isinstance(m, bytes) else m).split(":", 1))
+                for m in members
+            }
+        )
+        by_user = [
+            (uid, [tid for _, tid in group])
+            for uid, group in itertools.groupby(pairs, key=lambda p: p[0])
+        ]
+        pipe = redis.pipeline(transaction=False)
+        for uid, tids in by_user:
+            pipe.hmget(_unread_key(uid), tids)
+            pipe.hmget(_last_read_key(uid), tids)
+            pipe.exists(_total_key(uid))
+        results = await pipe.execute()
+
+        rows = []
+        for i, (uid, tids) in enumerate(by_user):
+            unread, last_read, warm_ = results[3 * i : 3 * i + 3]
+            if not warm_:
+                continue  # Evicted since; Postgres already holds its last flush.
+            rows.extend(
+                {
+                    "user_id": uid,
+                    "thread_id": tid,
+                    "unread_count": _to_int(u),
+                    "last_read_message_id": _to_int(lr),
+                }
+                for tid, u, lr in zip(tids, unread, last_read)
+            )
+
+        insert = insert_for(db)
+        for chunk in _batched(rows):
+            stmt = insert(DirectMessageReadState).values(chunk)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user_id", "thread_id"],
+                    set_={
+                        "unread_count": stmt.excluded.unread_count,
+                        "last_read_message_id": stmt.excluded.last_read_message_id,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        await redis.sadd(DIRTY_KEY, *members)
+        raise
+    return len(members)
+
 
+async def migrate_legacy_keys(
+    redis: Redis, session_factory: async_sessionmaker, *, scan_batch: int = 10_000
+) -> bool:
+    """Fold every legacy per-(user, thread) key into the per-user state, once.
 
-async def get_last_read(redis: Redis, *, user_id: int, thread_id: int) -> int:
-    raw = await redis.get(_last_read_key(user_id, thread_id))
+    Returns True once the migration is recorded as done (by this call or an
+    earlier one), False while another worker holds the lock.
+    """
+    if await redis.exists(LEGACY_MIGRATED_KEY):
+        return True
+    if not await redis.set(
+        LEGACY_MIGRATION_LOCK_KEY, "1", ex=LEGACY_MIGRATION_LOCK_SECONDS, nx=True
+    ):
+        return False
     try:
-        return int(raw or 0)
-    except (TypeError, ValueError):
-        return 0
+        found: list[tuple[str, str, str, str]] = []
+        async for key in redis.scan_iter(match="dm_*:user:*:thread:*", count=1000):
+            key = key.decode() if isinstance(key, bytes) else key
+            match = _LEGACY_KEY_RE.match(key)
+            if match:
+                found.append((key, *match.groups()))
+            if len(found) >= scan_batch:
+                await _migrate_found(redis, session_factory, found)
+                found = []
+        await _migrate_found(redis, session_factory, found)
+        await redis.set(LEGACY_MIGRATED_KEY, "1")
+    finally:
+        await redis.delete(LEGACY_MIGRATION_LOCK_KEY)
+    return True
+
+
+async def _migrate_found(
+    redis: Redis, session_factory: async_sessionmaker, found: list[tuple[str, str, str, str]]
+) -> None:
+    by_user: dict[int, tuple[list, list]] = defaultdict(lambda: ([], []))
+    for key, kind, user_id, thread_id in found:
+        by_user[int(user_id)][0 if kind == "unread" else 1].append((key, thread_id))
+    async with session_factory() as db:
+        for user_id, legacy in by_user.items():
+            await warm(redis, user_id=user_id, db=db, legacy=legacy)
+            await db.rollback()
+
+
+async def run_flusher(
+    redis: Redis, session_factory: async_sessionmaker, *, interval_seconds: float
+) -> None:
+    """Drain the dirty set every `interval_seconds` until cancelled.
+
+    Safe to run in every worker: SPOP hands each entry to one flusher only.
+    Until it is recorded as done, each tick also tries `migrate_legacy_keys`.
+    """
+    migrated = False
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not migrated:
+                migrated = await migrate_legacy_keys(redis, session_factory)
+            await flush_all(redis, session_factory)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("dm read-state flush failed")
+
+
+async def flush_all(redis: Redis, session_factory: async_sessionmaker) -> None:
+    async with session_factory() as db:
+        while await flush_dirty(redis, db) >= FLUSH_BATCH:
+            pass
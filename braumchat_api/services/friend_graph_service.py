@@ -0,0 +1,237 @@
+"""Friend graph in Redis: one set of friend ids per user.
+
+`friends:user:{id}` holds the user's friend ids plus a "0" sentinel (ids start
+at 1), so a user with no friends is still distinguishable from a cold one whose
+key is missing. Reads warm cold users from Postgres in one query; writes only
+touch warm sets, so a cold user simply reloads the committed state later. Sets
+expire after FRIENDS_TTL_SECONDS without a warm-up, bounding memory to users
+who actually use the graph.
+
+With the sets in place, "friends online" is a ZINTER against the presence
+zset and "mutual friends" an SINTER: one server-side operation each.
+
+Suggestions ("people you may know") are kept incrementally rather than
+computed with a self-join: `friend_suggestions:user:{id}` is a sorted set of
+non-friends scored by mutual-friend count. Adding a friendship a-b bumps b for
+every friend of a who isn't already b's friend (and the reverse, and
+symmetrically for b's friends); removing one undoes that. Each set keeps only
+the top SUGGESTIONS_LIMIT candidates, so a trimmed candidate's count restarts
+if it comes back; ranking stays right for the strong candidates that matter.
+Scores are only maintained while both sides are warm, so callers warm first.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Iterable
+
+from redis.asyncio.client import Redis
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.redis import Script
+from ..models.friend import Friend
+from ..models.friend_request import FriendRequest
+from .presence_service import ONLINE_USERS_KEY
+
+FRIENDS_KEY_PATTERN = "friends:user:{user_id}"
+SENTINEL = "0"
+FRIENDS_TTL_SECONDS = 24 * 3600
+
+SUGGESTIONS_KEY_PATTERN = "friend_suggestions:user:{user_id}"
+SUGGESTIONS_LIMIT = 200
+SUGGESTIONS_TTL_SECONDS = 30 * 24 * 3600
+# Extra candidates read past `limit` to cover ones filtered out at read time.
+SUGGESTIONS_READ_SLACK = 10
+
+
+def _friends_key(user_id: int) -> str:
+    return FRIENDS_KEY_PATTERN.format(user_id=user_id)
+
+
+def _suggestions_key(user_id: int) -> str:
+    return SUGGESTIONS_KEY_PATTERN.format(user_id=user_id)
+
+
+def _ids(members: Iterable, *exclude: int) -> list[int]:
+    skip = {SENTINEL, *(str(u) for u in exclude)}
+    return sorted(int(m) for m in members if m not in skip)
+
+
+# KEYS: friends and suggestions of a, then of b.
+# ARGV: a, b, suggestions key prefix, SUGGESTIONS_LIMIT, SUGGESTIONS_TTL_SECONDS.
+# Candidate keys are derived in the script (single-instance Redis, no cluster).
+# EXISTS and SADD/SREM must be atomic: a set that expired in between would be
+# recreated without its sentinel and look warm with one member.
+_GRAPH_HELPERS = """
+local fa, sa, fb, sb = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local a, b, prefix = ARGV[1], ARGV[2], ARGV[3]
+local limit, ttl = tonumber(ARGV[4]), ARGV[5]
+local warm = redis.call('EXISTS', fa) == 1 and redis.call('EXISTS', fb) == 1
+
+local function bump(key, member, delta)
+  local score = tonumber(redis.call('ZINCRBY', key, delta, member))
+  if score <= 0 then redis.call('ZREM', key, member) end
+  local excess = redis.call('ZCARD', key) - limit
+  if excess > 0 then redis.call('ZREMRANGEBYRANK', key, 0, excess - 1) end
+  redis.call('EXPIRE', key, ttl)
+end
+
+-- Friends of `side` who aren't friends of `other` gain or lose one mutual
+-- friend (`side`'s partner `other`) with it, in both directions.
+local function spread(side_friends, other, other_friends, other_suggestions, delta)
+  for _, f in ipairs(redis.call('SMEMBERS', side_friends)) do
+    if f ~= '0' and f ~= other and redis.call('SISMEMBER', other_friends, f) == 0 then
+      bump(other_suggestions, f, delta)
+      bump(prefix .. f, other, delta)
+    end
+  end
+end
+"""
+
+_ADD = Script(
+    _GRAPH_HELPERS
+    + """
+if warm then
+  spread(fa, b, fb, sb, 1)
+  spread(fb, a, fa, sa, 1)
+end
+if redis.call('EXISTS', fa) == 1 then redis.call('SADD', fa, b) end
+if redis.call('EXISTS', fb) == 1 then redis.call('SADD', fb, a) end
+redis.call('ZREM', sa, b)
+redis.call('ZREM', sb, a)
+return warm and 1 or 0
+"""
+)
+
+_REMOVE = Script(
+    _GRAPH_HELPERS
+    + """
+if redis.call('EXISTS', fa) == 1 then redis.call('SREM', fa, b) end
+if redis.call('EXISTS', fb) == 1 then redis.call('SREM', fb, a) end
+if warm then
+  spread(fa, b, fb, sb, -1)
+  spread(fb, a, fa, sa, -1)
+  -- Former friends become candidates for each other; both sets hold the sentinel.
+  local mutual = #redis.call('SINTER', fa, fb) - 1
+  if mutual > 0 then
+    bump(sa, b, mutual)
+    bump(sb, a, mutual)
+  end
+end
+return warm and 1 or 0
+"""
+)
+
+
+def _graph_script_args(user_a: int, user_b: int) -> tuple[list[str], list]:
+    keys = [
+        _friends_key(user_a),
+        _suggestions_key(user_a),
+        _friends_key(user_b),
+        _suggestions_key(user_b),
+    ]
+    prefix = SUGGESTIONS_KEY_PATTERN.format(user_id="")
+    return keys, [user_a, user_b, prefix, SUGGESTIONS_LIMIT, SUGGESTIONS_TTL_SECONDS]
+
+
+async def warm(redis: Redis, db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """Load the friend sets of any cold user in `user_ids` and refresh their TTLs."""
+    user_ids = list(dict.fromkeys(int(u) for u in user_ids))
+    pipe = redis.pipeline(transaction=False)
+    for uid in user_ids:
+        pipe.expire(_friends_key(uid), FRIENDS_TTL_SECONDS)
+    cold = [uid for uid, warm_ in zip(user_ids, await pipe.execute()) if not warm_]
+    if not cold:
+        return
+
+    rows = await db.execute(
+        select(Friend.user1_id, Friend.user2_id).where(
+            or_(Friend.user1_id.in_(cold), Friend.user2_id.in_(cold))
+        )
+    )
+    members: dict[int, set[str]] = {uid: {SENTINEL} for uid in cold}
+    for user1_id, user2_id in rows.all():
+        if user1_id in members:
+            members[user1_id].add(str(user2_id))
+        if user2_id in members:
+            members[user2_id].add(str(user1_id))
+
+    pipe = redis.pipeline(transaction=True)
+    for uid, friend_ids in members.items():
+        key = _friends_key(uid)
+        pipe.delete(key)
+        pipe.sadd(key, *friend_ids)
+        pipe.expire(key, FRIENDS_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def add_friendship(
+    redis: Redis, *, user_a: int, user_b: int, db: AsyncSession | None = None
+) -> None:
+    """Record a new friendship; pass `db` to warm both sides so suggestions update."""
+    if db is not None:
+        await warm(redis, db, [user_a, user_b])
+    await _ADD(redis, *_graph_script_args(user_a, user_b))
+
+
+async def remove_friendship(
+    redis: Redis, *, user_a: int, user_b: int, db: AsyncSession | None = None
+) -> None:
+    if db is not None:
+        await warm(redis, db, [user_a, user_b])
+    await _REMOVE(redis, *_graph_script_args(user_a, user_b))
+
+
+async def get_suggestions(
+    redis: Redis, db: AsyncSession, *, user_id: int, limit: int = 10
+) -> list[tuple[int, int]]:
+    """Top `limit` (candidate id, mutual friend count) pairs, best first.
+
+    One ZREVRANGE (O(log n + limit)); candidates with a pending request either
+    way are filtered out and dropped from the set.
+    """
+    key = _suggestions_key(user_id)
+    rows = await redis.zrevrange(key, 0, limit + SUGGESTIONS_READ_SLACK - 1, withscores=True)
+    candidates = [(int(member), int(score)) for member, score in rows]
+    if not candidates:
+        return []
+
+    ids = [uid for uid, _ in candidates]
+    pending = await db.execute(
+        select(FriendRequest.requester_id, FriendRequest.addressee_id).where(
+            FriendRequest.status == "pending",
+            or_(
+                (FriendRequest.requester_id == user_id) & FriendRequest.addressee_id.in_(ids),
+                (FriendRequest.addressee_id == user_id) & FriendRequest.requester_id.in_(ids),
+            ),
+        )
+    )
+    blocked = {a if a != user_id else b for a, b in pending.all()}
+    if blocked:
+        await redis.zrem(key, *(str(uid) for uid in blocked))
+    return [(uid, score) for uid, score in candidates if uid not in blocked][:limit]
+
+
+async def get_friend_ids(redis: Redis, db: AsyncSession, *, user_id: int) -> list[int]:
+    await warm(redis, db, [user_id])
+    return _ids(await redis.smembers(_friends_key(user_id)))
+
+
+async def get_online_friend_ids(redis: Redis, db: AsyncSession, *, user_id: int) -> list[int]:
+    """Friends whose presence hasn't lapsed, via one ZINTER with the online zset."""
+    await warm(redis, db, [user_id])
+    # Set members score 1; weight 0 plus MAX leaves the presence expiry as score.
+    rows = await redis.zinter(
+        {_friends_key(user_id): 0, ONLINE_USERS_KEY: 1}, aggregate="MAX", withscores=True
+    )
+    now = time.time()
+    return _ids(member for member, expires_at in rows if expires_at > now)
+
+
+async def get_mutual_friend_ids(
+    redis: Redis, db: AsyncSession, *, user_id: int, other_id: int
+) -> list[int]:
+    await warm(redis, db, [user_id, other_id])
+    members = await redis.sinter(_friends_key(user_id), _friends_key(other_id))
+    return _ids(members, user_id, other_id)
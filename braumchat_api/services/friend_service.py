@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, selectinload
 
 from ..models.friend import Friend
 from ..models.friend_request import FriendRequest
 from ..models.user import User
+from .user_service import escape_like
 
 
 def _ordered_user_ids(user_a: int, user_b: int) -> tuple[int, int]:
@@ -39,6 +40,16 @@ async def create_friendship(db: AsyncSession, *, user_a: int, user_b: int) -> Fr
     return friendship
 
 
+async def remove_friendship(db: AsyncSession, *, user_a: int, user_b: int) -> bool:
+    """Delete the friendship; returns False if the two weren't friends."""
+    friendship = await get_friendship(db, user_a=user_a, user_b=user_b)
+    if not friendship:
+        return False
+    await db.delete(friendship)
+    await db.commit()
+    return True
+
+
 async def create_or_reopen_request(
     db: AsyncSession, *, requester_id: int, addressee_id: int
 ) -> FriendRequest:
@@ -209,8 +220,15 @@ async def list_friends(
     )
 
     if query:
-        q = f"%{query.strip()}%"
-        stmt = stmt.where(or_(u1.display_name.ilike(q), u2.display_name.ilike(q)))
+        # Only the other side of the friendship is matched; the trigram index on
+        # lower(display_name) serves the infix LIKE on Postgres.
+        q = f"%{escape_like(query.strip().lower())}%"
+        stmt = stmt.where(
+            or_(
+                and_(Friend.user1_id == user_id, func.lower(u2.display_name).like(q, escape="\\")),
+                and_(Friend.user2_id == user_id, func.lower(u1.display_name).like(q, escape="\\")),
+            )
+        )
 
     res = await db.execute(stmt)
     friends: list[User] = []
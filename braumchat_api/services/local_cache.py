@@ -0,0 +1,53 @@
+"""Process-local LRU with a per-entry TTL, for small hot lookups.
+
+Entries are per process, so anything cached here must tolerate being up to
+`ttl` seconds stale unless the owner evicts it explicitly (see
+profile_cache's pub/sub invalidation).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LocalTTLCache(Generic[K, V]):
+    def __init__(self, *, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default=_MISSING):
+        """The cached value, or `default` (None unless given) when absent or expired.
+
+        Pass a sentinel `default` when None is itself a cached value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        return None if default is _MISSING else default
+
+    def put(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
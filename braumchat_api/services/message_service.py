@@ -1,27 +1,62 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from ..models.message import Message
 
 
 async def create_message(db: AsyncSession, channel_id: int, user_id: int, content: str) -> Message:
-    msg = Message(channel_id=channel_id, user_id=user_id, content=content)
+    # created_at is set here rather than by the server default so the row needs
+    # no refresh; callers hydrate the author from the profile cache.
+    msg = Message(
+        channel_id=channel_id,
+        user_id=user_id,
+        content=content,
+        created_at=datetime.now(timezone.utc),
+    )
     db.add(msg)
     await db.commit()
-    await db.refresh(msg)
-    q = await db.execute(
-        select(Message).options(selectinload(Message.user)).where(Message.id == msg.id)
-    )
-    return q.scalars().first()
+    return msg
 
 
 async def list_messages(db: AsyncSession, channel_id: int, limit: int = 50):
+    """Newest messages as plain row mappings (no ORM instances; see the messages route)."""
     q = await db.execute(
-        select(Message)
-        .options(selectinload(Message.user))
+        select(
+            Message.id,
+            Message.channel_id,
+            Message.user_id,
+            Message.content,
+            Message.is_edited,
+            Message.is_deleted,
+            Message.created_at,
+        )
         .where(Message.channel_id == channel_id)
         .order_by(Message.created_at.desc())
         .limit(limit)
     )
-    return q.scalars().all()
+    return q.mappings().all()
+
+
+def shape_messages(rows, authors: dict[int, dict]) -> list[dict]:
+    """`list_messages` rows as MessageRead-shaped dicts, ready for FastJSONResponse.
+
+    `authors` maps user id to a public profile dict; a missing (deleted) author
+    still renders, just without a name.
+    """
+    return [
+        {
+            "id": row["id"],
+            "channel_id": row["channel_id"],
+            "user_id": row["user_id"],
+            "content": row["content"],
+            "client_id": None,
+            "is_edited": row["is_edited"],
+            "is_deleted": row["is_deleted"],
+            "created_at": row["created_at"],
+            "author": authors.get(row["user_id"])
+            or {"id": row["user_id"], "display_name": None, "avatar_url": None},
+        }
+        for row in rows
+    ]
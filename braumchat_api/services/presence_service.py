@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from collections import Counter
 from typing import Iterable, List
 
 from redis.asyncio.client import Redis
@@ -11,6 +13,9 @@ PRESENCE_KEY_PATTERN = "presence:w:{workspace_id}:c:{channel_id}"
 PRESENCE_COUNT_KEY_PATTERN = "presence_counts:w:{workspace_id}:c:{channel_id}"
 
 USER_ONLINE_KEY_PATTERN = "online:user:{user_id}"
+# Every online user, scored by the epoch second their presence lapses, so set
+# operations (e.g. friends online) can intersect with it server-side.
+ONLINE_USERS_KEY = "online:users"
 USER_ONLINE_COUNT_KEY_PATTERN = "online_count:user:{user_id}"
 USER_ONLINE_TTL_SECONDS = 75
 USER_ONLINE_HEARTBEAT_SECONDS = 30
@@ -65,11 +70,20 @@ async def list_users(redis: Redis, workspace_id: int, channel_id: int) -> List[i
 
 
 async def set_user_online(redis: Redis, user_id: int) -> None:
-    await redis.set(_online_key(user_id), "1", ex=USER_ONLINE_TTL_SECONDS)
+    now = time.time()
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(_online_key(user_id), "1", ex=USER_ONLINE_TTL_SECONDS)
+    pipe.zadd(ONLINE_USERS_KEY, {str(user_id): now + USER_ONLINE_TTL_SECONDS})
+    # Drop members whose process died without a disconnect.
+    pipe.zremrangebyscore(ONLINE_USERS_KEY, "-inf", now)
+    await pipe.execute()
 
 
 async def set_user_offline(redis: Redis, user_id: int) -> None:
-    await redis.delete(_online_key(user_id))
+    pipe = redis.pipeline(transaction=False)
+    pipe.delete(_online_key(user_id))
+    pipe.zrem(ONLINE_USERS_KEY, str(user_id))
+    await pipe.execute()
 
 
 async def online_connect(redis: Redis, user_id: int) -> int:
@@ -92,6 +106,47 @@ async def online_disconnect(redis: Redis, user_id: int) -> int:
     return int(count)
 
 
+async def disconnect_many(
+    redis: Redis, sockets: Iterable[tuple[int, tuple[int, int] | None]]
+) -> None:
+    """`online_disconnect` (and `remove_user` for channel sockets) for many sockets at once.
+
+    `sockets` holds (user_id, (workspace_id, channel_id) or None) per socket.
+    Two pipelined round trips however many sockets: decrement every count,
+    then clear whatever reached zero.
+    """
+    online: Counter[int] = Counter()
+    channels: Counter[tuple[int, int, int]] = Counter()
+    for user_id, channel in sockets:
+        online[user_id] += 1
+        if channel is not None:
+            channels[(channel[0], channel[1], user_id)] += 1
+    if not online:
+        return
+
+    pipe = redis.pipeline(transaction=False)
+    for user_id, n in online.items():
+        pipe.decrby(_online_count_key(user_id), n)
+    for (workspace_id, channel_id, user_id), n in channels.items():
+        pipe.hincrby(_count_key(workspace_id, channel_id), user_id, -n)
+    counts = await pipe.execute()
+
+    pipe = redis.pipeline(transaction=False)
+    cleared = 0
+    for user_id, left in zip(online, counts[: len(online)]):
+        if int(left) <= 0:
+            pipe.delete(_online_count_key(user_id), _online_key(user_id))
+            pipe.zrem(ONLINE_USERS_KEY, str(user_id))
+            cleared += 1
+    for (workspace_id, channel_id, user_id), left in zip(channels, counts[len(online) :]):
+        if int(left) <= 0:
+            pipe.hdel(_count_key(workspace_id, channel_id), user_id)
+            pipe.srem(_presence_key(workspace_id, channel_id), user_id)
+            cleared += 1
+    if cleared:
+        await pipe.execute()
+
+
 async def is_user_online(redis: Redis, user_id: int) -> bool:
     return bool(await redis.exists(_online_key(user_id)))
 
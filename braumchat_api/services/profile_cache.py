@@ -0,0 +1,239 @@
+"""Public user profiles ({id, display_name, avatar_url}) behind two cache tiers.
+
+Lookups go process LRU -> Redis (one MGET) -> Postgres (one IN query) and fill
+the tiers on the way back. Users that don't exist are cached too, briefly, and
+so are display-name lookups that found nobody, so typos and probing don't reach
+Postgres. Redis errors fall through to the next tier.
+
+Anything that changes a profile (or takes a display name) must call
+`invalidate`: it deletes the Redis entries and publishes the ids and names on
+INVALIDATION_CHANNEL, and every process runs `run_invalidation_listener` to drop
+its local copies. The local TTL bounds staleness if a message is lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+from redis.asyncio.client import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User
+from .local_cache import LocalTTLCache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY_PATTERN = "profile:user:{user_id}"
+NAME_KEY_PATTERN = "profile:name:{name}"
+INVALIDATION_CHANNEL = "profile:invalidate"
+NEGATIVE = "-"
+
+PROFILE_TTL_SECONDS = 3600
+NEGATIVE_TTL_SECONDS = 300
+LOCAL_SIZE = 10_000
+LOCAL_TTL_SECONDS = 60.0
+LOCAL_NEGATIVE_TTL_SECONDS = 15.0
+LISTENER_RETRY_SECONDS = 1.0
+
+_MISS = object()
+
+
+@dataclass(frozen=True)
+class Profile:
+    id: int
+    display_name: str | None
+    avatar_url: str | None
+
+    @classmethod
+    def from_row(cls, row) -> "Profile":
+        return cls(id=int(row.id), display_name=row.display_name, avatar_url=row.avatar_url)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Profile":
+        return cls(**json.loads(raw))
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+
+_profiles: LocalTTLCache[int, Profile | None] = LocalTTLCache(
+    size=LOCAL_SIZE, ttl=LOCAL_TTL_SECONDS
+)
+_names: LocalTTLCache[str, int | None] = LocalTTLCache(size=LOCAL_SIZE, ttl=LOCAL_TTL_SECONDS)
+
+
+def _profile_key(user_id: int) -> str:
+    return PROFILE_KEY_PATTERN.format(user_id=user_id)
+
+
+def _name_key(name: str) -> str:
+    return NAME_KEY_PATTERN.format(name=name)
+
+
+def _normalize_name(display_name: str) -> str:
+    return (display_name or "").strip().lower()
+
+
+def _remember_profile(user_id: int, profile: Profile | None) -> None:
+    ttl = LOCAL_TTL_SECONDS if profile is not None else LOCAL_NEGATIVE_TTL_SECONDS
+    _profiles.put(user_id, profile, ttl=ttl)
+
+
+def clear_local() -> None:
+    _profiles.clear()
+    _names.clear()
+
+
+async def get_many(redis: Redis, db: AsyncSession, user_ids: Iterable[int]) -> dict[int, Profile]:
+    """Profiles by id for every user in `user_ids` that exists."""
+    ids = list(dict.fromkeys(int(u) for u in user_ids))
+    found: dict[int, Profile] = {}
+    missing: list[int] = []
+    for uid in ids:
+        cached = _profiles.get(uid, _MISS)
+        if cached is _MISS:
+            missing.append(uid)
+        elif cached is not None:
+            found[uid] = cached
+    if not missing:
+        return found
+
+    try:
+        raw = await redis.mget([_profile_key(uid) for uid in missing])
+    except Exception:
+        raw = [None] * len(missing)
+    cold: list[int] = []
+    for uid, value in zip(missing, raw):
+        if value is None:
+            cold.append(uid)
+        elif value == NEGATIVE:
+            _remember_profile(uid, None)
+        else:
+            found[uid] = Profile.from_json(value)
+            _remember_profile(uid, found[uid])
+    if not cold:
+        return found
+
+    rows = await db.execute(
+        select(User.id, User.display_name, User.avatar_url).where(User.id.in_(cold))
+    )
+    loaded = {int(row.id): Profile.from_row(row) for row in rows.all()}
+    pipe = redis.pipeline(transaction=False)
+    for uid in cold:
+        profile = loaded.get(uid)
+        _remember_profile(uid, profile)
+        if profile is None:
+            pipe.set(_profile_key(uid), NEGATIVE, ex=NEGATIVE_TTL_SECONDS)
+        else:
+            pipe.set(_profile_key(uid), profile.to_json(), ex=PROFILE_TTL_SECONDS)
+    try:
+        await pipe.execute()
+    except Exception:
+        pass
+    found.update(loaded)
+    return found
+
+
+async def get(redis: Redis, db: AsyncSession, user_id: int) -> Profile | None:
+    return (await get_many(redis, db, [user_id])).get(int(user_id))
+
+
+async def resolve_display_name(
+    redis: Redis, db: AsyncSession, display_name: str
+) -> Profile | None:
+    """The profile holding `display_name` (case-insensitive), or None."""
+    name = _normalize_name(display_name)
+    if not name:
+        return None
+
+    user_id = _names.get(name, _MISS)
+    if user_id is _MISS:
+        try:
+            raw = await redis.get(_name_key(name))
+        except Exception:
+            raw = None
+        if raw is not None:
+            user_id = None if raw == NEGATIVE else int(raw)
+        else:
+            row = (
+                await db.execute(
+                    select(User.id, User.display_name, User.avatar_url).where(
+                        func.lower(User.display_name) == name
+                    )
+                )
+            ).first()
+            user_id = int(row.id) if row else None
+            try:
+                if row:
+                    profile = Profile.from_row(row)
+                    _remember_profile(profile.id, profile)
+                    pipe = redis.pipeline(transaction=False)
+                    pipe.set(_name_key(name), profile.id, ex=PROFILE_TTL_SECONDS)
+                    pipe.set(_profile_key(profile.id), profile.to_json(), ex=PROFILE_TTL_SECONDS)
+                    await pipe.execute()
+                else:
+                    await redis.set(_name_key(name), NEGATIVE, ex=NEGATIVE_TTL_SECONDS)
+            except Exception:
+                pass
+        ttl = LOCAL_TTL_SECONDS if user_id is not None else LOCAL_NEGATIVE_TTL_SECONDS
+        _names.put(name, user_id, ttl=ttl)
+
+    if user_id is None:
+        return None
+    return await get(redis, db, user_id)
+
+
+def _evict_local(user_ids: Iterable[int], display_names: Iterable[str]) -> None:
+    for uid in user_ids:
+        _profiles.pop(int(uid))
+    for name in display_names:
+        _names.pop(_normalize_name(name))
+
+
+async def invalidate(
+    redis: Redis, *, user_ids: Iterable[int] = (), display_names: Iterable[str] = ()
+) -> None:
+    """Forget profiles and name lookups everywhere, e.g. after a rename or a new signup."""
+    user_ids = [int(u) for u in user_ids]
+    names = [_normalize_name(n) for n in display_names if _normalize_name(n)]
+    _evict_local(user_ids, names)
+    keys = [_profile_key(uid) for uid in user_ids] + [_name_key(n) for n in names]
+    if not keys:
+        return
+    pipe = redis.pipeline(transaction=False)
+    pipe.delete(*keys)
+    pipe.publish(INVALIDATION_CHANNEL, json.dumps({"user_ids": user_ids, "display_names": names}))
+    await pipe.execute()
+
+
+async def run_invalidation_listener(redis: Redis) -> None:
+    """Apply other processes' invalidations to the local tier until cancelled."""
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Anything published while we weren't subscribed is lost; start clean.
+            clear_local()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    _evict_local(data.get("user_ids", ()), data.get("display_names", ()))
+                except (TypeError, ValueError):
+                    logger.warning("ignoring malformed profile invalidation: %r", message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("profile invalidation listener failed; resubscribing")
+            await asyncio.sleep(LISTENER_RETRY_SECONDS)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
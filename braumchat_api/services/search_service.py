@@ -0,0 +1,174 @@
+import re
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy import Integer, column, func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..models.channel import Channel
+from ..models.direct_message import DirectMessage
+from ..models.direct_message_thread import DirectMessageThread
+from ..models.message import Message
+from ..models.search_index import SEARCH_COLUMN, TS_CONFIG, fts_table
+from ..models.workspace_member import WorkspaceMember
+
+MAX_PAGE_SIZE = 100
+STREAM_PAGE_SIZE = 200
+MAX_STREAM_RESULTS = 5000
+
+_WORD = re.compile(r"\w+")
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can't reach FTS5 operators; terms are ANDed.
+    terms = _WORD.findall(query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _matches(db: AsyncSession, table, query: str):
+    if db.get_bind().dialect.name == "postgresql":
+        _fts5_query(query)  # same validation on both backends
+        return literal_column(f"{table.name}.{SEARCH_COLUMN}").op("@@")(
+            func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), query)
+        )
+    fts = fts_table(table.name)
+    rowids = (
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :fts_query")
+        .bindparams(fts_query=_fts5_query(query))
+        .columns(column("rowid", Integer))
+    )
+    return table.c.id.in_(rowids)
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(cursor)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def next_cursor(rows: list, limit: int) -> str | None:
+    """Results are newest first by id; the last id seen is the whole keyset."""
+    if len(rows) < limit:
+        return None
+    return str(rows[-1].id)
+
+
+def _page(stmt, id_column, cursor: str | None, limit: int):
+    if cursor:
+        stmt = stmt.where(id_column < decode_cursor(cursor))
+    return stmt.order_by(id_column.desc()).limit(limit)
+
+
+async def search_channel_messages(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    query: str,
+    workspace_id: int | None = None,
+    channel_id: int | None = None,
+    author_id: int | None = None,
+    after: datetime | None = None,
+    before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> list[Message]:
+    """Channel messages matching `query` in workspaces `user_id` belongs to."""
+    member_of = select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+    stmt = (
+        select(Message)
+        .join(Channel, Channel.id == Message.channel_id)
+        .options(selectinload(Message.user))
+        .where(
+            _matches(db, Message.__table__, query),
+            Message.is_deleted.is_(False),
+            Channel.workspace_id.in_(member_of),
+        )
+    )
+    if workspace_id is not None:
+        stmt = stmt.where(Channel.workspace_id == workspace_id)
+    if channel_id is not None:
+        stmt = stmt.where(Message.channel_id == channel_id)
+    if author_id is not None:
+        stmt = stmt.where(Message.user_id == author_id)
+    if after is not None:
+        stmt = stmt.where(Message.created_at >= after)
+    if before is not None:
+        stmt = stmt.where(Message.created_at < before)
+
+    result = await db.execute(_page(stmt, Message.id, cursor, limit))
+    return list(result.scalars().all())
+
+
+async def search_direct_messages(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    query: str,
+    thread_id: int | None = None,
+    author_id: int | None = None,
+    after: datetime | None = None,
+    before: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> list[DirectMessage]:
+    """Direct messages matching `query` in threads `user_id` takes part in."""
+    stmt = (
+        select(DirectMessage)
+        .join(DirectMessageThread, DirectMessageThread.id == DirectMessage.thread_id)
+        .options(selectinload(DirectMessage.sender))
+        .where(
+            _matches(db, DirectMessage.__table__, query),
+            DirectMessage.is_deleted.is_(False),
+            or_(
+                DirectMessageThread.user1_id == user_id,
+                DirectMessageThread.user2_id == user_id,
+            ),
+        )
+    )
+    if thread_id is not None:
+        stmt = stmt.where(DirectMessage.thread_id == thread_id)
+    if author_id is not None:
+        stmt = stmt.where(DirectMessage.sender_id == author_id)
+    if after is not None:
+        stmt = stmt.where(DirectMessage.created_at >= after)
+    if before is not None:
+        stmt = stmt.where(DirectMessage.created_at < before)
+
+    result = await db.execute(_page(stmt, DirectMessage.id, cursor, limit))
+    return list(result.scalars().all())
+
+
+async def open_stream(
+    search: Callable[..., Awaitable[list]],
+    db: AsyncSession,
+    *,
+    max_results: int,
+    cursor: str | None = None,
+    **filters,
+) -> AsyncIterator:
+    """Walk `search` page by page, yielding rows until `max_results` or the end.
+
+    The first page runs before this returns, so bad input raises here instead
+    of in the middle of a streamed response.
+    """
+    max_results = max(1, min(max_results, MAX_STREAM_RESULTS))
+    limit = min(STREAM_PAGE_SIZE, max_results)
+    first = await search(db, cursor=cursor, limit=limit, **filters)
+
+    async def rows():
+        page, page_limit, sent = first, limit, 0
+        while True:
+            for row in page:
+                yield row
+            sent += len(page)
+            page_cursor = next_cursor(page, page_limit)
+            if page_cursor is None or sent >= max_results:
+                return
+            page_limit = min(STREAM_PAGE_SIZE, max_results - sent)
+            page = await search(db, cursor=page_cursor, limit=page_limit, **filters)
+
+    return rows()
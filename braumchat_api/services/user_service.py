@@ -2,14 +2,44 @@ import random
 import re
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from ..models.friend import Friend
 from ..models.user import User
+from ..models.workspace_member import WorkspaceMember
 from ..security.security import hash_password
+from .local_cache import LocalTTLCache
 
 _HANDLE_RE = re.compile(r"^(.{2,32})#(\d{4})$")
 
+# Typeahead ranking tiers: lower sorts first.
+RANK_FRIEND = 0
+RANK_CO_MEMBER = 1
+RANK_OTHER = 2
+
+# Global (non-personal) prefix candidates; enough to fill the largest page.
+GLOBAL_CANDIDATES = 50
+# Short prefixes are the common and the expensive ones (most matches), so only
+# those are cached; longer prefixes are selective enough to hit the index cold.
+PREFIX_CACHE_MAX_LEN = 4
+PREFIX_CACHE_TTL_SECONDS = 30.0
+PREFIX_CACHE_SIZE = 1024
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally (use with escape="\\")."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# New users show up under a cached prefix within the TTL, which is fine for
+# typeahead; exact handle lookups never go through it.
+prefix_cache: LocalTTLCache[str, list[int]] = LocalTTLCache(
+    size=PREFIX_CACHE_SIZE, ttl=PREFIX_CACHE_TTL_SECONDS
+)
+
 
 def _normalize_base_display_name(raw: str) -> str:
     base = (raw or "").strip()
@@ -26,19 +56,77 @@ def _normalize_base_display_name(raw: str) -> str:
     return base
 
 
-async def _generate_unique_handle(db: AsyncSession, *, base: str) -> str:
-    for _ in range(10000):
-        code = f"{random.randint(0, 9999):04d}"
-        handle = f"{base}#{code}"
-        normalized = handle.strip().lower()
-        stmt = select(User.id).where(func.lower(User.display_name) == normalized).limit(1)
-        exists = (await db.execute(stmt)).scalars().first()
-        if not exists:
-            return handle
-    raise HTTPException(
-        status_code=status.HTTP_409_CONFLICT,
-        detail="Unable to allocate a unique tag for this display name.",
+DISCRIMINATOR_SPACE = 10000
+# Random probes find a free code in O(1) expected while the space is mostly
+# free; past that, a scan of the remaining codes is still bounded by 10k.
+_RANDOM_PROBES = 8
+# Concurrent registrations of the same base can pick the same code; the unique
+# index rejects the loser, which re-reads the used set and tries again.
+HANDLE_INSERT_ATTEMPTS = 5
+
+
+async def _used_discriminators(db: AsyncSession, *, base: str) -> set[int]:
+    """Every code taken for `base`, in one indexed prefix scan."""
+    prefix = f"{base.lower()}#"
+    stmt = select(func.lower(User.display_name)).where(
+        func.lower(User.display_name).like(f"{escape_like(prefix)}%", escape="\\")
     )
+    used: set[int] = set()
+    for (name,) in (await db.execute(stmt)).all():
+        code = name[len(prefix) :]
+        if len(code) == 4 and code.isdigit():
+            used.add(int(code))
+    return used
+
+
+def _pick_free_discriminator(used: set[int]) -> int | None:
+    if len(used) >= DISCRIMINATOR_SPACE:
+        return None
+    for _ in range(_RANDOM_PROBES):
+        code = random.randrange(DISCRIMINATOR_SPACE)
+        if code not in used:
+            return code
+    return random.choice([c for c in range(DISCRIMINATOR_SPACE) if c not in used])
+
+
+async def _generate_unique_handle(db: AsyncSession, *, base: str) -> str:
+    code = _pick_free_discriminator(await _used_discriminators(db, base=base))
+    if code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Unable to allocate a unique tag for this display name.",
+        )
+    return f"{base}#{code:04d}"
+
+
+async def insert_user_with_handle(
+    db: AsyncSession, *, email: str, hashed_password: str | None, base: str
+) -> User:
+    """Insert a user under a fresh `base#NNNN` handle, retrying lost races."""
+    for attempt in range(HANDLE_INSERT_ATTEMPTS):
+        user = User(
+            email=email,
+            hashed_password=hashed_password,
+            display_name=await _generate_unique_handle(db, base=base),
+        )
+        db.add(user)
+        try:
+            await db.commit()
+            await db.refresh(user)
+            return user
+        except IntegrityError as exc:
+            await db.rollback()
+            if "display_name" not in str(exc.orig) or attempt == HANDLE_INSERT_ATTEMPTS - 1:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Could not create user: {str(exc)}",
+                )
+        except Exception as exc:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not create user: {str(exc)}",
+            )
 
 
 async def create_user(
@@ -49,23 +137,9 @@ async def create_user(
     display_name: str,
 ) -> User:
     base = _normalize_base_display_name(display_name)
-    normalized_display_name = await _generate_unique_handle(db, base=base)
-    user = User(
-        email=email,
-        hashed_password=hash_password(password),
-        display_name=normalized_display_name,
+    return await insert_user_with_handle(
+        db, email=email, hashed_password=hash_password(password), base=base
     )
-    db.add(user)
-    try:
-        await db.commit()
-        await db.refresh(user)
-        return user
-    except Exception as exc:
-        await db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Could not create user: {str(exc)}",
-        )
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
@@ -82,9 +156,37 @@ async def get_user_by_display_name(db: AsyncSession, display_name: str) -> User
     return q.scalars().first()
 
 
+def _prefix_match(prefix: str):
+    # Served by ix_users_display_name_lower_pattern (text_pattern_ops) on Postgres.
+    return func.lower(User.display_name).like(f"{escape_like(prefix)}%", escape="\\")
+
+
+async def _global_candidates(db: AsyncSession, prefix: str) -> list[int]:
+    cacheable = len(prefix) <= PREFIX_CACHE_MAX_LEN
+    if cacheable:
+        cached = prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+    # No ORDER BY: the index scan stops after GLOBAL_CANDIDATES rows however
+    # many users share the prefix; ranking happens on this bounded set.
+    result = await db.execute(
+        select(User.id).where(_prefix_match(prefix)).limit(GLOBAL_CANDIDATES)
+    )
+    ids = list(result.scalars().all())
+    if cacheable:
+        prefix_cache.put(prefix, ids)
+    return ids
+
+
 async def search_users_by_display_name(
-    db: AsyncSession, *, query: str, limit: int = 20
+    db: AsyncSession, *, query: str, limit: int = 20, viewer_id: int | None = None
 ) -> list[User]:
+    """Typeahead over display names, ranked friends, then workspace co-members, then others.
+
+    `query` matches the base name ("Braum") or the handle including a partial
+    discriminator ("Braum#68"); a complete handle is an exact lookup. The
+    viewer is never suggested to themselves.
+    """
     q = query.strip().lower()
     if not q:
         return []
@@ -92,11 +194,56 @@ async def search_users_by_display_name(
     # Se o usuário digitar um handle completo (ex: Braum#6892), prioriza match exato.
     if _HANDLE_RE.match(query.strip()):
         stmt = select(User).where(func.lower(User.display_name) == q).limit(limit)
-    else:
-        # Prefix search: permite buscar por base ("Braum") ou por prefixo do handle ("Braum#6").
-        stmt = select(User).where(func.lower(User.display_name).like(f"{q}%")).limit(limit)
+        if viewer_id is not None:
+            stmt = stmt.where(User.id != viewer_id)
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    tiers = []
+    global_ids = await _global_candidates(db, q)
+    if global_ids:
+        tiers.append(
+            select(User.id.label("id"), literal(RANK_OTHER).label("rank")).where(
+                User.id.in_(global_ids)
+            )
+        )
+    if viewer_id is not None:
+        # Personal tiers walk the viewer's own graph, so their cost tracks the
+        # viewer's friends and workspaces rather than the size of `users`.
+        friend_ids = union_all(
+            select(Friend.user2_id.label("id")).where(Friend.user1_id == viewer_id),
+            select(Friend.user1_id.label("id")).where(Friend.user2_id == viewer_id),
+        ).subquery()
+        tiers.append(
+            select(User.id.label("id"), literal(RANK_FRIEND).label("rank"))
+            .join(friend_ids, friend_ids.c.id == User.id)
+            .where(_prefix_match(q))
+            .limit(GLOBAL_CANDIDATES)
+        )
+        mine, theirs = aliased(WorkspaceMember), aliased(WorkspaceMember)
+        tiers.append(
+            select(User.id.label("id"), literal(RANK_CO_MEMBER).label("rank"))
+            .join(theirs, theirs.user_id == User.id)
+            .join(mine, mine.workspace_id == theirs.workspace_id)
+            .where(mine.user_id == viewer_id, User.id != viewer_id, _prefix_match(q))
+            .limit(GLOBAL_CANDIDATES)
+        )
+    if not tiers:
+        return []
+
+    ranked = union_all(*(select(t.subquery()) for t in tiers)).subquery()
+    rank = func.min(ranked.c.rank).label("rank")
+    stmt = (
+        select(User, rank)
+        .join(ranked, ranked.c.id == User.id)
+        .group_by(User.id)
+        .order_by(rank, func.length(User.display_name), func.lower(User.display_name))
+        .limit(limit)
+    )
+    if viewer_id is not None:
+        stmt = stmt.where(User.id != viewer_id)
     result = await db.execute(stmt)
-    return result.scalars().all()
+    return [user for user, _ in result.all()]
 
 
 async def get_user(db: AsyncSession, user_id: int) -> User | None:
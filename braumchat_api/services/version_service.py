@@ -0,0 +1,82 @@
+"""Version stamps for read-mostly resources, backing HTTP ETags.
+
+Each resource (a user's workspace list, a workspace's channels, a channel's
+first message page, ...) has a counter at `ver:{resource}` that writers bump
+after committing. Readers fetch the stamp *before* querying, so a write that
+lands in between is tagged with the old stamp and simply refetched next time.
+
+A missing key (new, or expired after VERSION_TTL_SECONDS idle) starts from the
+current time in nanoseconds rather than 1, so a recreated counter never hands
+out a stamp a client may still hold from before it expired.
+"""
+
+from __future__ import annotations
+
+import time
+
+from redis.asyncio.client import Redis
+
+from ..db.redis import Script
+
+VERSION_KEY_PATTERN = "ver:{resource}"
+VERSION_TTL_SECONDS = 7 * 24 * 3600
+
+_CURRENT = Script(
+    """
+local v = redis.call('GET', KEYS[1])
+if not v then
+  v = ARGV[1]
+  redis.call('SET', KEYS[1], v)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return v
+"""
+)
+
+_BUMP = Script(
+    """
+for _, key in ipairs(KEYS) do
+  if redis.call('EXISTS', key) == 1 then
+    redis.call('INCR', key)
+  else
+    redis.call('SET', key, ARGV[1])
+  end
+  redis.call('EXPIRE', key, ARGV[2])
+end
+return #KEYS
+"""
+)
+
+
+def workspaces_of(user_id: int) -> str:
+    return f"user:{int(user_id)}:workspaces"
+
+
+def invites_of(user_id: int) -> str:
+    return f"user:{int(user_id)}:invites"
+
+
+def friends_of(user_id: int) -> str:
+    return f"user:{int(user_id)}:friends"
+
+
+def channels_of(workspace_id: int) -> str:
+    return f"workspace:{int(workspace_id)}:channels"
+
+
+def messages_of(channel_id: int) -> str:
+    return f"channel:{int(channel_id)}:messages"
+
+
+def _key(resource: str) -> str:
+    return VERSION_KEY_PATTERN.format(resource=resource)
+
+
+async def current(redis: Redis, resource: str) -> str:
+    return str(await _CURRENT(redis, [_key(resource)], [time.time_ns(), VERSION_TTL_SECONDS]))
+
+
+async def bump(redis: Redis, *resources: str) -> None:
+    """Invalidate the stamps of `resources`; call after the change is committed."""
+    if resources:
+        await _BUMP(redis, [_key(r) for r in resources], [time.time_ns(), VERSION_TTL_SECONDS])
@@ -0,0 +1 @@
+"""Operational tools (`python -m braumchat_api.tools.<name>`)."""
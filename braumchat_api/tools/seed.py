@@ -0,0 +1,514 @@
+"""Synthetic dataset generator for capacity testing.
+
+    python -m braumchat_api.tools.seed --database-url postgresql+asyncpg://... --scale 100
+
+Loads users with `Name#1234` handles, workspaces and members, channels,
+messages, DM threads with their inbox rows, friendships and pending friend
+requests. Distributions are skewed the way production is: a few hot channels take most of the
+traffic, a few authors write most messages, and friend counts follow a power
+law. The same `--seed` always produces the same dataset.
+
+Rows get explicit primary keys and are streamed in batches: `COPY` on
+Postgres/asyncpg, multi-row `INSERT` elsewhere. Sequences are moved past the
+loaded IDs afterwards so the app can keep inserting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Sequence
+
+from passlib.hash import bcrypt
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from ..models import (
+    Channel,
+    DirectMessage,
+    DirectMessageInbox,
+    DirectMessageThread,
+    Friend,
+    FriendRequest,
+    Message,
+    User,
+    Workspace,
+    WorkspaceMember,
+)
+from ..models.meta import Base
+
+DEFAULT_PASSWORD = "seed-password"
+
+_BASE_NAMES = (
+    "ana", "bruno", "carla", "diego", "elisa", "felipe", "gabi", "hugo", "iris", "joao", "karen",
+    "lucas", "maria", "nico", "olivia", "pedro", "quinn", "rafa", "sofia", "theo", "ursula",
+    "vitor", "wendy", "xavier", "yara", "zeca", "alex", "bia", "caio", "duda", "enzo", "fabi",
+    "gui", "helo", "igor", "julia", "kaio", "lara", "mateus", "nina", "otto", "paula", "rita",
+    "samuel", "tati", "vivi", "will", "yuri", "zoe", "braum",
+)  # fmt: skip
+
+
+@dataclass
+class SeedSpec:
+    users: int = 1000
+    workspaces: int = 10
+    channels_per_workspace: int = 10
+    messages: int = 100_000
+    dm_threads: int = 2000
+    dm_messages_per_thread: int = 10
+    friends_per_user: int = 20
+    pending_requests: int = 1000
+    seed: int = 1
+    batch_size: int = 10_000
+    password: str = DEFAULT_PASSWORD
+
+    def scaled(self, factor: float) -> "SeedSpec":
+        def s(n: int) -> int:
+            return max(1, int(n * factor))
+
+        return SeedSpec(
+            users=s(self.users),
+            workspaces=s(self.workspaces),
+            channels_per_workspace=self.channels_per_workspace,
+            messages=s(self.messages),
+            dm_threads=s(self.dm_threads),
+            dm_messages_per_thread=self.dm_messages_per_thread,
+            friends_per_user=self.friends_per_user,
+            pending_requests=s(self.pending_requests),
+            seed=self.seed,
+            batch_size=self.batch_size,
+            password=self.password,
+        )
+
+
+@dataclass
+class SeedResult:
+    user_ids: list[int] = field(default_factory=list)
+    workspace_ids: list[int] = field(default_factory=list)
+    members_by_workspace: dict[int, list[int]] = field(default_factory=dict)
+    channel_ids: list[int] = field(default_factory=list)
+    # Channels ordered hottest first.
+    hot_channel_ids: list[int] = field(default_factory=list)
+    channel_workspace: dict[int, int] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+def email_for(user_id: int) -> str:
+    return f"user{user_id}@seed.local"
+
+
+def _zipf_cum_weights(n: int, s: float = 1.1) -> list[float]:
+    return list(itertools.accumulate(1.0 / (rank**s) for rank in range(1, n + 1)))
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    it = iter(rows)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+class _Loader:
+    """Writes row tuples with COPY when the driver supports it."""
+
+    def __init__(self, conn, batch_size: int) -> None:
+        self.conn = conn
+        self.batch_size = batch_size
+        self.use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+        self.counts: dict[str, int] = {}
+
+    async def next_id(self, table) -> int:
+        res = await self.conn.execute(select(func.coalesce(func.max(table.c.id), 0)))
+        return int(res.scalar()) + 1
+
+    async def load(self, table, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        total = 0
+        driver = None
+        if self.use_copy:
+            raw = await self.conn.get_raw_connection()
+            driver = raw.driver_connection
+        for chunk in _chunks(rows, self.batch_size):
+            if driver is not None:
+                await driver.copy_records_to_table(table.name, records=chunk, columns=columns)
+            else:
+                await self.conn.execute(insert(table), [dict(zip(columns, r)) for r in chunk])
+            total += len(chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + total
+        return total
+
+    async def fix_sequences(self, tables) -> None:
+        if self.conn.dialect.name != "postgresql":
+            return
+        for table in tables:
+            await self.conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                )
+            )
+
+
+def _handles(rng: random.Random, n: int, taken: set[str]) -> Iterator[str]:
+    """Yield unique `base#NNNN` handles with a skewed base-name popularity.
+
+    `taken` holds lowercased handles already in the database, so re-running
+    the seed against the same database does not collide.
+    """
+
+    cum = _zipf_cum_weights(len(_BASE_NAMES), s=0.8)
+    free: dict[str, list[int]] = {}
+
+    def codes_for(base: str) -> list[int]:
+        codes = free.get(base)
+        if codes is None:
+            codes = [c for c in range(10000) if f"{base}#{c:04d}" not in taken]
+            rng.shuffle(codes)
+            free[base] = codes
+        return codes
+
+    for base in rng.choices(_BASE_NAMES, cum_weights=cum, k=n):
+        codes = codes_for(base)
+        while not codes:
+            # Base exhausted: derive a new one the way users would ("ana2").
+            base = f"{base}{rng.randint(2, 99)}"
+            codes = codes_for(base)
+        yield f"{base}#{codes.pop():04d}"
+
+
+async def seed(engine: AsyncEngine, spec: SeedSpec) -> SeedResult:
+    rng = random.Random(spec.seed)
+    now = datetime.now(timezone.utc)
+    password_hash = bcrypt.hash(spec.password)
+    result = SeedResult()
+
+    users_t, ws_t, member_t = User.__table__, Workspace.__table__, WorkspaceMember.__table__
+    channel_t, message_t = Channel.__table__, Message.__table__
+    friend_t, request_t = Friend.__table__, FriendRequest.__table__
+    thread_t, dm_t = DirectMessageThread.__table__, DirectMessage.__table__
+    inbox_t = DirectMessageInbox.__table__
+
+    async with engine.begin() as conn:
+        loader = _Loader(conn, spec.batch_size)
+
+        # -- users ---------------------------------------------------------
+        first_user = await loader.next_id(users_t)
+        user_ids = list(range(first_user, first_user + spec.users))
+        result.user_ids = user_ids
+        existing = await conn.execute(
+            select(func.lower(users_t.c.display_name)).where(users_t.c.display_name.is_not(None))
+        )
+        handles = _handles(rng, spec.users, set(existing.scalars()))
+        await loader.load(
+            users_t,
+            (
+                "id",
+                "email",
+                "hashed_password",
+                "display_name",
+                "is_active",
+                "is_superuser",
+                "created_at",
+            ),
+            (
+                (uid, email_for(uid), password_hash, next(handles), True, False, now)
+                for uid in user_ids
+            ),
+        )
+
+        # -- workspaces and members (workspace sizes follow a power law) ---
+        first_ws = await loader.next_id(ws_t)
+        workspace_ids = list(range(first_ws, first_ws + spec.workspaces))
+        result.workspace_ids = workspace_ids
+        ws_cum = _zipf_cum_weights(len(workspace_ids))
+        members: dict[int, list[int]] = {wid: [] for wid in workspace_ids}
+        for uid in user_ids:
+            joined = set(rng.choices(workspace_ids, cum_weights=ws_cum, k=rng.randint(1, 3)))
+            for wid in joined:
+                members[wid].append(uid)
+        for wid in workspace_ids:
+            if not members[wid]:
+                members[wid].append(rng.choice(user_ids))
+        result.members_by_workspace = members
+
+        await loader.load(
+            ws_t,
+            ("id", "name", "slug", "owner_id", "created_at"),
+            (
+                (wid, f"Workspace {wid}", f"workspace-{wid}", members[wid][0], now)
+                for wid in workspace_ids
+            ),
+        )
+        first_member = await loader.next_id(member_t)
+        member_rows = (
+            (wid, uid, "owner" if i == 0 else "member")
+            for wid in workspace_ids
+            for i, uid in enumerate(members[wid])
+        )
+        await loader.load(
+            member_t,
+            ("id", "workspace_id", "user_id", "role", "created_at"),
+            (
+                (first_member + i, wid, uid, role, now)
+                for i, (wid, uid, role) in enumerate(member_rows)
+            ),
+        )
+
+        # -- channels ------------------------------------------------------
+        first_channel = await loader.next_id(channel_t)
+        channel_workspace: dict[int, int] = {}
+        cid = first_channel
+        for wid in workspace_ids:
+            for _ in range(spec.channels_per_workspace):
+                channel_workspace[cid] = wid
+                cid += 1
+        channel_ids = list(channel_workspace)
+        result.channel_ids = channel_ids
+        result.channel_workspace = channel_workspace
+        await loader.load(
+            channel_t,
+            ("id", "workspace_id", "name", "is_private", "created_at"),
+            ((c, w, f"channel-{c}", False, now) for c, w in channel_workspace.items()),
+        )
+
+        # -- messages: hot channels and power-law authors -------------------
+        hot = channel_ids[:]
+        rng.shuffle(hot)
+        result.hot_channel_ids = hot
+        channel_cum = _zipf_cum_weights(len(hot))
+        author_cum = {wid: _zipf_cum_weights(len(m)) for wid, m in members.items()}
+        first_message = await loader.next_id(message_t)
+        # Spread history over the last 90 days, ids increasing with time.
+        step = timedelta(days=90) / max(1, spec.messages)
+        start = now - timedelta(days=90)
+
+        def message_rows() -> Iterator[tuple]:
+            mid = first_message
+            remaining = spec.messages
+            while remaining > 0:
+                n = min(spec.batch_size, remaining)
+                chans = rng.choices(hot, cum_weights=channel_cum, k=n)
+                by_ws: dict[int, list[int]] = {}
+                for idx, c in enumerate(chans):
+                    by_ws.setdefault(channel_workspace[c], []).append(idx)
+                authors = [0] * n
+                for wid, idxs in by_ws.items():
+                    drawn = rng.choices(members[wid], cum_weights=author_cum[wid], k=len(idxs))
+                    for idx, uid in zip(idxs, drawn):
+                        authors[idx] = uid
+                for idx in range(n):
+                    offset = mid - first_message
+                    yield (
+                        mid,
+                        chans[idx],
+                        authors[idx],
+                        f"message {offset} lorem ipsum dolor sit amet",
+                        False,
+                        False,
+                        start + step * offset,
+                    )
+                    mid += 1
+                remaining -= n
+
+        await loader.load(
+            message_t,
+            ("id", "channel_id", "user_id", "content", "is_edited", "is_deleted", "created_at"),
+            message_rows(),
+        )
+
+        # -- friendships: preferential attachment-ish degree skew ----------
+        popularity = user_ids[:]
+        rng.shuffle(popularity)
+        pop_cum = _zipf_cum_weights(len(popularity), s=0.7)
+        pairs: set[tuple[int, int]] = set()
+        target_pairs = spec.users * spec.friends_per_user // 2
+        if len(user_ids) > 1:
+            while len(pairs) < target_pairs:
+                a = rng.choice(user_ids)
+                for b in rng.choices(popularity, cum_weights=pop_cum, k=8):
+                    if a != b:
+                        pairs.add((a, b) if a < b else (b, a))
+                if len(pairs) >= len(user_ids) * (len(user_ids) - 1) // 2:
+                    break
+        first_friend = await loader.next_id(friend_t)
+        await loader.load(
+            friend_t,
+            ("id", "user1_id", "user2_id", "created_at"),
+            ((first_friend + i, a, b, now) for i, (a, b) in enumerate(sorted(pairs))),
+        )
+
+        # -- pending friend requests between non-friends --------------------
+        requests: set[tuple[int, int]] = set()
+        attempts = 0
+        while len(requests) < spec.pending_requests and attempts < spec.pending_requests * 10:
+            attempts += 1
+            a, b = rng.sample(user_ids, 2) if len(user_ids) > 1 else (user_ids[0], user_ids[0])
+            if a == b or (min(a, b), max(a, b)) in pairs or (b, a) in requests:
+                continue
+            requests.add((a, b))
+        first_request = await loader.next_id(request_t)
+        await loader.load(
+            request_t,
+            ("id", "requester_id", "addressee_id", "status", "created_at"),
+            (
+                (first_request + i, a, b, "pending", now)
+                for i, (a, b) in enumerate(sorted(requests))
+            ),
+        )
+        del pairs
+
+        # -- DM threads, biased towards active users ------------------------
+        thread_pairs: dict[tuple[int, int], int] = {}
+        attempts = 0
+        while len(thread_pairs) < spec.dm_threads and attempts < spec.dm_threads * 10:
+            attempts += 1
+            a = rng.choices(popularity, cum_weights=pop_cum, k=1)[0]
+            b = rng.choice(user_ids)
+            if a != b:
+                thread_pairs.setdefault((min(a, b), max(a, b)), rng.choice(workspace_ids))
+        first_thread = await loader.next_id(thread_t)
+        first_dm = await loader.next_id(dm_t)
+        per_thread = spec.dm_messages_per_thread
+        threads = []  # (id, workspace_id, user1_id, user2_id, last_at, last_dm_id, preview)
+        dm_rows = []
+        for i, ((a, b), wid) in enumerate(sorted(thread_pairs.items())):
+            tid = first_thread + i
+            started = now - timedelta(minutes=rng.randint(per_thread, 60 * 24 * 30))
+            last_at, last_dm_id, preview = started, None, None
+            for j in range(per_thread):
+                last_at = started + timedelta(minutes=j)
+                last_dm_id = first_dm + len(dm_rows)
+                preview = f"dm {j}"
+                sender = a if rng.random() < 0.5 else b
+                dm_rows.append((last_dm_id, tid, sender, preview, False, False, last_at))
+            threads.append((tid, wid, a, b, last_at, last_dm_id, preview))
+
+        await loader.load(
+            thread_t,
+            ("id", "workspace_id", "user1_id", "user2_id", "created_at", "updated_at"),
+            ((tid, wid, a, b, now, last_at) for tid, wid, a, b, last_at, _, _ in threads),
+        )
+        await loader.load(
+            dm_t,
+            ("id", "thread_id", "sender_id", "content", "is_deleted", "is_edited", "created_at"),
+            dm_rows,
+        )
+        del dm_rows
+        first_inbox = await loader.next_id(inbox_t)
+        await loader.load(
+            inbox_t,
+            (
+                "id",
+                "user_id",
+                "thread_id",
+                "other_user_id",
+                "last_message_id",
+                "last_message_at",
+                "preview",
+                "created_at",
+            ),
+            (
+                (first_inbox + 2 * i + k, owner, tid, other, last_id, last_at, preview, now)
+                for i, (tid, _, a, b, last_at, last_id, preview) in enumerate(threads)
+                for k, (owner, other) in enumerate(((a, b), (b, a)))
+            ),
+        )
+
+        await loader.fix_sequences(
+            [
+                users_t,
+                ws_t,
+                member_t,
+                channel_t,
+                message_t,
+                friend_t,
+                request_t,
+                thread_t,
+                dm_t,
+                inbox_t,
+            ]
+        )
+        result.counts = dict(loader.counts)
+
+    return result
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    spec = SeedSpec()
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="SQLAlchemy async URL (defaults to $DATABASE_URL)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="multiply row counts; 100 gives 100k users and 10M messages",
+    )
+    parser.add_argument("--users", type=int, default=spec.users)
+    parser.add_argument("--workspaces", type=int, default=spec.workspaces)
+    parser.add_argument("--channels-per-workspace", type=int, default=spec.channels_per_workspace)
+    parser.add_argument("--messages", type=int, default=spec.messages)
+    parser.add_argument("--dm-threads", type=int, default=spec.dm_threads)
+    parser.add_argument("--dm-messages-per-thread", type=int, default=spec.dm_messages_per_thread)
+    parser.add_argument("--friends-per-user", type=int, default=spec.friends_per_user)
+    parser.add_argument("--pending-requests", type=int, default=spec.pending_requests)
+    parser.add_argument("--batch-size", type=int, default=spec.batch_size)
+    parser.add_argument("--password", default=spec.password, help="password for every user")
+    parser.add_argument("--seed", type=int, default=spec.seed)
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="create missing tables first (for throwaway SQLite files; use alembic otherwise)",
+    )
+
+
+def spec_from_args(args: argparse.Namespace) -> SeedSpec:
+    return SeedSpec(
+        users=args.users,
+        workspaces=args.workspaces,
+        channels_per_workspace=args.channels_per_workspace,
+        messages=args.messages,
+        dm_threads=args.dm_threads,
+        dm_messages_per_thread=args.dm_messages_per_thread,
+        friends_per_user=args.friends_per_user,
+        pending_requests=args.pending_requests,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        password=args.password,
+    ).scaled(args.scale)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    try:
+        if args.create_schema:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        started = time.perf_counter()
+        result = await seed(engine, spec_from_args(args))
+        elapsed = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+
+    for table, count in result.counts.items():
+        print(f"{table:<24}{count:>12,}")
+    print(f"done in {elapsed:.1f}s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m braumchat_api.tools.seed")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url is required when DATABASE_URL is not set")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
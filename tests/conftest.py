@@ -1,11 +1,56 @@
+import fakeredis
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 import braumchat_api.models  # noqa: F401 - ensure models are registered
+from braumchat_api import main
+from braumchat_api.api import deps
 from braumchat_api.api.deps import get_db_dep
+from braumchat_api.api.routes import (
+    auth,
+    channels,
+    direct_messages,
+    friends,
+    invites,
+    messages,
+    realtime,
+    users,
+    workspaces,
+)
+from braumchat_api.db import read_your_writes
+from braumchat_api.db.redis import redis as redis_client
 from braumchat_api.main import app
 from braumchat_api.models.meta import Base
+from braumchat_api.observability.round_trips import instrument_engine, instrument_redis
+from braumchat_api.services import profile_cache
+
+# Lets tests assert per-request SQL/Redis budgets (see test_round_trip_budgets.py).
+instrument_redis(redis_client)
+
+# Modules that bind the shared client at import time as `redis_client`. The
+# HTTP rate-limit middleware keeps the real one: it is built with the app.
+_REDIS_CLIENT_MODULES = (
+    main,
+    deps,
+    auth,
+    channels,
+    direct_messages,
+    friends,
+    invites,
+    messages,
+    realtime,
+    users,
+    workspaces,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_profile_cache():
+    # Each test gets a fresh database, so ids cached by an earlier test are stale.
+    profile_cache.clear_local()
+    read_your_writes.clear_local()
 
 
 @pytest_asyncio.fixture
@@ -13,6 +58,7 @@ async def client():
     engine = create_async_engine("sqlite+aiosqlite:///:memory:")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    instrument_engine(engine)
 
     TestSession = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -33,8 +79,44 @@ async def db_session():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    instrument_engine(engine)
+
     SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
     async with SessionLocal() as session:
         yield session
 
     await engine.dispose()
+
+
+@pytest.fixture
+def fake_redis():
+    """In-process Redis, Lua scripting included."""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def app_redis(fake_redis, monkeypatch):
+    """Routes the app's Redis traffic to `fake_redis` for the test."""
+    for module in _REDIS_CLIENT_MODULES:
+        monkeypatch.setattr(module, "redis_client", fake_redis)
+    return fake_redis
+
+
+@pytest.fixture
+def register_and_login(client):
+    """Registers `name` (as name@example.com) and returns its bearer auth header."""
+
+    async def register_and_login(name: str) -> dict:
+        r = await client.post(
+            "/auth/register",
+            json={"email": f"{name}@example.com", "password": "secret123", "display_name": name},
+        )
+        assert r.status_code == 200
+        r = await client.post(
+            "/auth/login",
+            data={"username": f"{name}@example.com", "password": "secret123"},
+        )
+        assert r.status_code == 200
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return register_and_login
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from braumchat_api.api.deps import get_db_dep
+from braumchat_api.observability.round_trips import round_trip_budget
+
+
+@pytest.mark.asyncio
+async def test_cached_auth_skips_the_database_until_revoked(client, app_redis, register_and_login):
+    alice = await register_and_login("alice")
+    first = await client.get("/auth/me", headers=alice)
+    assert first.status_code == 200
+
+    with round_trip_budget(sql=0, label="GET /auth/me (cached)"):
+        r = await client.get("/auth/me", headers=alice)
+    assert r.json() == first.json()
+
+    assert (await client.post("/auth/logout", headers=alice)).status_code == 204
+    assert (await client.get("/auth/me", headers=alice)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_requests_record_whether_they_used_the_database():
+    app = FastAPI()
+
+    @app.get("/redis-only")
+    async def redis_only(db=Depends(get_db_dep)):
+        return {}
+
+    @app.get("/queries")
+    async def queries(db=Depends(get_db_dep)):
+        await db.execute(text("SELECT 1"))
+        return {}
+
+    def count(route: str, used: str) -> float:
+        labels = {"route": route, "used": used}
+        return REGISTRY.get_sample_value("db_session_requests_total", labels) or 0
+
+    before = count("/redis-only", "false"), count("/queries", "true")
+    async with AsyncClient(app=app, base_url="http://t") as client:
+        await client.get("/redis-only")
+        await client.get("/queries")
+    assert count("/redis-only", "false") == before[0] + 1
+    assert count("/queries", "true") == before[1] + 1
@@ -0,0 +1,71 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from braumchat_api.api.deps import bulkhead, get_db_dep
+from braumchat_api.config import Settings
+from braumchat_api.db.session import engine_options
+from braumchat_api.observability.metrics import DbPoolCollector
+
+PG = "postgresql+asyncpg://db/app"
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(DATABASE_URL=PG, JWT_SECRET="x", **overrides)
+
+
+def test_bulkheads_get_their_own_pool_shape():
+    settings = _settings(DB_POOL_SIZE=9, DB_BULKHEADS={"auth": {"size": 1, "timeout": 0.5}})
+    realtime = engine_options(PG, settings, "realtime-write")
+    assert (realtime["pool_size"], realtime["pool_timeout"]) == (5, 2.0)
+    auth = engine_options(PG, settings, "auth")
+    assert (auth["pool_size"], auth["max_overflow"], auth["pool_timeout"]) == (1, 2, 0.5)
+    # Unknown bulkheads and the default pool use the global settings.
+    assert engine_options(PG, settings, "reports")["pool_size"] == 9
+    assert engine_options(PG, settings)["pool_size"] == 9
+
+
+def test_pool_collector_reports_each_bulkhead():
+    engine = create_async_engine(PG, **engine_options(PG, _settings(), "api-read"))
+    collector = DbPoolCollector(lambda: {"api-read": (engine.pool, 15)})
+    samples = {
+        (s.name, s.labels["bulkhead"]): s.value
+        for family in collector.collect()
+        for s in family.samples
+    }
+    assert samples[("db_pool_checked_out", "api-read")] == 0
+    assert samples[("db_pool_capacity", "api-read")] == 15
+
+
+@pytest.mark.asyncio
+async def test_routes_draw_from_their_declared_pool():
+    app = FastAPI()
+
+    @app.get("/read")
+    @bulkhead("api-read")
+    async def read(db=Depends(get_db_dep)):
+        return db.info["bulkhead"]
+
+    @app.get("/plain")
+    async def plain(db=Depends(get_db_dep)):
+        return db.info["bulkhead"]
+
+    @app.get("/saturated")
+    @bulkhead("realtime-write")
+    async def saturated(db=Depends(get_db_dep)):
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    def timeouts():
+        labels = {"bulkhead": "realtime-write"}
+        return REGISTRY.get_sample_value("db_pool_timeouts_total", labels) or 0
+
+    before = timeouts()
+    async with AsyncClient(app=app, base_url="http://t") as client:
+        assert (await client.get("/read")).json() == "api-read"
+        assert (await client.get("/plain")).json() == "default"
+        r = await client.get("/saturated")
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+    assert timeouts() == before + 1
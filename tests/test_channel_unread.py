@@ -0,0 +1,83 @@
+import pytest
+
+from braumchat_api.models.channel import Channel
+from braumchat_api.models.message import Message
+from braumchat_api.models.user import User
+from braumchat_api.models.workspace import Workspace
+from braumchat_api.services import channel_service
+
+
+@pytest.mark.asyncio
+async def test_unread_counts_follow_the_watermark(db_session):
+    me = User(email="me@example.com", username="me", hashed_password="x")
+    them = User(email="them@example.com", username="them", hashed_password="x")
+    db_session.add_all([me, them])
+    await db_session.commit()
+    workspace = Workspace(name="Acme", slug="acme", owner_id=me.id)
+    db_session.add(workspace)
+    await db_session.commit()
+    quiet, busy, own = (Channel(workspace_id=workspace.id, name=n) for n in "abc")
+    db_session.add_all([quiet, busy, own])
+    await db_session.commit()
+
+    db_session.add_all(
+        Message(channel_id=quiet.id, user_id=them.id, content="q") for _ in range(3)
+    )
+    db_session.add_all(
+        Message(channel_id=busy.id, user_id=them.id, content="b")
+        for _ in range(channel_service.UNREAD_COUNT_CAP + 5)
+    )
+    db_session.add(Message(channel_id=own.id, user_id=me.id, content="mine"))
+    await db_session.commit()
+
+    rows = await channel_service.list_channels_with_unread(db_session, workspace.id, me.id)
+    state = {ch.id: unread for ch, unread in rows}
+    assert state[quiet.id]["unread_count"] == 3
+    assert state[quiet.id]["unread_count_capped"] is False
+    assert state[busy.id]["unread_count"] == channel_service.UNREAD_COUNT_CAP
+    assert state[busy.id]["unread_count_capped"] is True
+    # Only your own message past the watermark: nothing unread.
+    assert state[own.id]["last_message_id"] is not None
+    assert state[own.id]["unread_count"] == 0
+
+    latest = state[quiet.id]["last_message_id"]
+    marked = await channel_service.mark_read(
+        db_session, channel_id=quiet.id, user_id=me.id, message_id=latest - 1
+    )
+    assert (marked["last_read_message_id"], marked["unread_count"]) == (latest - 1, 1)
+
+    # Watermarks never move backwards; ids past the latest message are clamped.
+    marked = await channel_service.mark_read(
+        db_session, channel_id=quiet.id, user_id=me.id, message_id=1
+    )
+    assert marked["last_read_message_id"] == latest - 1
+    marked = await channel_service.mark_read(
+        db_session, channel_id=quiet.id, user_id=me.id, message_id=latest + 1000
+    )
+    assert (marked["last_read_message_id"], marked["unread_count"]) == (latest, 0)
+
+    marked = await channel_service.mark_read(db_session, channel_id=busy.id, user_id=me.id)
+    assert marked["unread_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unread_fields_only_appear_when_requested(client, register_and_login):
+    alice = await register_and_login("alice")
+    r = await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    url = f"/channels/workspaces/{r.json()['id']}/channels"
+    r = await client.post(url, json={"name": "general"}, headers=alice)
+    plain = {"id", "workspace_id", "name", "is_private", "created_at"}
+    assert set(r.json()) == plain
+    r = await client.get(f"/channels/{r.json()['id']}", headers=alice)
+    assert set(r.json()) == plain
+
+    (listed,) = (await client.get(url, headers=alice)).json()
+    assert set(listed) == plain
+    (listed,) = (await client.get(url, params={"include_unread": "true"}, headers=alice)).json()
+    assert listed["unread_count"] == 0 and listed["last_read_message_id"] == 0
+    assert set(listed) == plain | {
+        "last_message_id",
+        "last_read_message_id",
+        "unread_count",
+        "unread_count_capped",
+    }
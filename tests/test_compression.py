@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+
+from braumchat_api.api.compression import CompressionMiddleware, compression, negotiate
+
+BIG = {"rows": ["hello compression"] * 200}
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": 'W/"1"'})
+
+    @app.get("/opted-out")
+    @compression(enabled=False)
+    async def opted_out():
+        return BIG
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(50):
+                yield f'{{"row": {i}, "text": "{"x" * 40}"}}\n'
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+def test_negotiation_prefers_available_encodings():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("*") in {"gzip", "br"}
+    assert negotiate(None) is None
+
+
+@pytest.mark.asyncio
+async def test_compresses_large_bodies_only():
+    async with AsyncClient(app=_app(), base_url="http://t") as client:
+        r = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in r.headers["vary"].lower()
+        assert r.json() == BIG
+        assert int(r.headers["content-length"]) < len(r.content)
+
+        for path in ("/small", "/opted-out", "/not-modified"):
+            r = await client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in r.headers, path
+
+        r = await client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in r.headers
+
+
+@pytest.mark.asyncio
+async def test_streams_are_compressed_chunk_by_chunk():
+    # Drive the ASGI app directly: httpx's test transport buffers whole bodies.
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # The client never disconnects.
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"t"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1),
+        "server": ("t", 80),
+    }
+    await _app()(scope, receive, send)
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Past the threshold every chunk is flushed, so each decodes on arrival.
+    assert len(bodies) > 2 and bodies[-1]["more_body"] is False
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(bodies[0]["body"]).startswith(b'{"row": 0')
+    body = gzip.decompress(b"".join(m["body"] for m in bodies)).decode()
+    assert body.count("\n") == 50
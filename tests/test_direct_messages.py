@@ -1,5 +1,6 @@
 import pytest
 
+from braumchat_api.models.direct_message_thread import DirectMessageThread
 from braumchat_api.models.user import User
 from braumchat_api.models.workspace import Workspace
 from braumchat_api.services import direct_message_service
@@ -40,3 +41,95 @@ async def test_direct_message_thread_creation_and_messages(db_session):
     assert len(messages) == 1
     assert messages[0].content == "hello"
     assert messages[0].sender_id == user1.id
+
+
+@pytest.mark.asyncio
+async def test_inbox_orders_by_last_message_and_pages_by_cursor(db_session):
+    me = User(email="me@example.com", username="me", hashed_password="x")
+    others = [
+        User(email=f"o{i}@example.com", username=f"o{i}", hashed_password="x") for i in range(3)
+    ]
+    db_session.add_all([me, *others])
+    await db_session.commit()
+    workspace = Workspace(name="Acme", slug="acme", owner_id=me.id)
+    db_session.add(workspace)
+    await db_session.commit()
+
+    threads = [
+        await direct_message_service.get_or_create_thread(
+            db_session, workspace_id=workspace.id, user_a=me.id, user_b=o.id
+        )
+        for o in others
+    ]
+    # Oldest thread gets the newest message and must jump to the top.
+    await direct_message_service.create_direct_message(
+        db_session, thread_id=threads[1].id, sender_id=others[1].id, content="first"
+    )
+    await direct_message_service.create_direct_message(
+        db_session,
+        thread_id=threads[0].id,
+        sender_id=me.id,
+        content="  latest\n  news " + "x" * 200,
+    )
+
+    rows = await direct_message_service.list_threads(db_session, user_id=me.id, limit=2)
+    assert [t.id for _, t, _ in rows] == [threads[0].id, threads[1].id]
+    inbox, thread, other = rows[0]
+    assert other.id == others[0].id
+    assert inbox.preview.startswith("latest news x") and len(inbox.preview) == 140
+    assert thread.updated_at is not None
+
+    cursor = direct_message_service.next_cursor(rows, 2)
+    rest = await direct_message_service.list_threads(
+        db_session, user_id=me.id, limit=2, cursor=cursor
+    )
+    assert [t.id for _, t, _ in rest] == [threads[2].id]
+    assert rest[0][0].last_message_id is None
+    assert direct_message_service.next_cursor(rest, 2) is None
+
+    # The recipient's inbox moves as well.
+    theirs = await direct_message_service.list_threads(db_session, user_id=others[0].id)
+    assert theirs[0][0].last_message_id == inbox.last_message_id
+
+    with pytest.raises(ValueError):
+        await direct_message_service.list_threads(db_session, user_id=me.id, cursor="nope")
+
+
+@pytest.mark.asyncio
+async def test_posts_to_a_legacy_thread_keep_one_inbox_entry_per_pair(db_session):
+    me = User(email="me@example.com", username="me", hashed_password="x")
+    them = User(email="them@example.com", username="them", hashed_password="x")
+    db_session.add_all([me, them])
+    await db_session.commit()
+    workspace = Workspace(name="Acme", slug="acme", owner_id=me.id)
+    elsewhere = Workspace(name="Other", slug="other", owner_id=me.id)
+    db_session.add_all([workspace, elsewhere])
+    await db_session.commit()
+
+    canonical = await direct_message_service.get_or_create_thread(
+        db_session, workspace_id=workspace.id, user_a=me.id, user_b=them.id
+    )
+    # Older versions opened one thread per workspace; the backfill gave this
+    # second thread of the pair no inbox rows.
+    legacy = DirectMessageThread(workspace_id=elsewhere.id, user1_id=me.id, user2_id=them.id)
+    db_session.add(legacy)
+    await db_session.commit()
+
+    await direct_message_service.create_direct_message(
+        db_session, thread_id=legacy.id, sender_id=them.id, content="old thread"
+    )
+    for user_id in (me.id, them.id):
+        rows = await direct_message_service.list_threads(db_session, user_id=user_id)
+        assert [(t.id, inbox.preview) for inbox, t, _ in rows] == [(legacy.id, "old thread")]
+    # The inbox entry points where get_or_create_thread now resolves the pair.
+    resolved = await direct_message_service.get_or_create_thread(
+        db_session, workspace_id=workspace.id, user_a=me.id, user_b=them.id
+    )
+    assert resolved.id == legacy.id
+
+    await direct_message_service.create_direct_message(
+        db_session, thread_id=canonical.id, sender_id=me.id, content="new thread"
+    )
+    db_session.expunge_all()  # The upsert bypasses the inbox rows already loaded.
+    rows = await direct_message_service.list_threads(db_session, user_id=them.id)
+    assert [(t.id, inbox.preview) for inbox, t, _ in rows] == [(canonical.id, "new thread")]
@@ -0,0 +1,149 @@
+import contextlib
+
+import pytest
+from sqlalchemy import select
+
+from braumchat_api.models.dm_read_state import DirectMessageReadState
+from braumchat_api.models.user import User
+from braumchat_api.models.workspace import Workspace
+from braumchat_api.services import direct_message_service, dm_state_service
+
+
+@pytest.mark.asyncio
+async def test_unread_counts_and_total(fake_redis):
+    await dm_state_service.increment_unread(fake_redis, user_id=1, thread_id=10)
+    await dm_state_service.increment_unread(fake_redis, user_id=1, thread_id=10, delta=2)
+    await dm_state_service.increment_unread(fake_redis, user_id=1, thread_id=11)
+
+    assert await dm_state_service.get_unread_map(
+        fake_redis, user_id=1, thread_ids=[10, 11, 12]
+    ) == {
+        10: 3,
+        11: 1,
+        12: 0,
+    }
+    assert await dm_state_service.get_total_unread(fake_redis, user_id=1) == 4
+
+    await dm_state_service.clear_unread(fake_redis, user_id=1, thread_id=10)
+    await dm_state_service.clear_unread(fake_redis, user_id=1, thread_id=10)
+    assert await dm_state_service.get_total_unread(fake_redis, user_id=1) == 1
+
+
+@pytest.mark.asyncio
+async def test_last_read_never_moves_backwards(fake_redis):
+    assert (
+        await dm_state_service.set_last_read(fake_redis, user_id=1, thread_id=5, message_id=40)
+        == 40
+    )
+    assert (
+        await dm_state_service.set_last_read(fake_redis, user_id=1, thread_id=5, message_id=30)
+        == 40
+    )
+    assert await dm_state_service.get_last_read_map(fake_redis, thread_id=5, user_ids=[1, 2]) == {
+        1: 40,
+        2: 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_legacy_keys_are_migrated_once(fake_redis, db_session):
+    await fake_redis.set("dm_unread:user:1:thread:5", "3")
+    await fake_redis.set("dm_unread:user:1:thread:6", "2")
+    await fake_redis.set("dm_last_read:user:1:thread:5", "40")
+    await fake_redis.set("dm_unread:user:2:thread:7", "1")
+    # User 2 is already warm: the fold adds to their running total.
+    await dm_state_service.increment_unread(fake_redis, user_id=2, thread_id=8)
+
+    def session_factory():
+        return contextlib.nullcontext(db_session)
+
+    assert await dm_state_service.migrate_legacy_keys(fake_redis, session_factory, scan_batch=2)
+    assert await dm_state_service.get_last_read(fake_redis, user_id=1, thread_id=5) == 40
+    assert await dm_state_service.increment_unread(fake_redis, user_id=1, thread_id=5) == 4
+    assert await dm_state_service.get_unread_map(fake_redis, user_id=1, thread_ids=[5, 6]) == {
+        5: 4,
+        6: 2,
+    }
+    assert await dm_state_service.get_total_unread(fake_redis, user_id=1) == 6
+    assert (
+        await dm_state_service.set_last_read(fake_redis, user_id=1, thread_id=5, message_id=1)
+        == 40
+    )
+    assert await dm_state_service.get_total_unread(fake_redis, user_id=2) == 2
+    assert sorted(await fake_redis.keys("*")) == [
+        "dm_last_read:user:1",
+        "dm_state:dirty",
+        "dm_state:legacy_migrated",
+        "dm_unread:user:1",
+        "dm_unread:user:2",
+        "dm_unread_total:user:1",
+        "dm_unread_total:user:2",
+    ]
+    assert await fake_redis.ttl("dm_unread_total:user:1") > 0
+
+    # Recorded as done: later runs don't walk the keyspace again.
+    await fake_redis.set("dm_unread:user:3:thread:9", "1")
+    assert await dm_state_service.migrate_legacy_keys(fake_redis, session_factory)
+    assert await fake_redis.exists("dm_unread:user:3:thread:9")
+
+
+@pytest.mark.asyncio
+async def test_reads_never_scan_for_legacy_keys(fake_redis, monkeypatch):
+    await fake_redis.set("dm_unread:user:1:thread:5", "3")
+
+    def scan_iter(*args, **kwargs):
+        raise AssertionError("request paths must not SCAN")
+
+    monkeypatch.setattr(fake_redis, "scan_iter", scan_iter)
+    assert await dm_state_service.get_unread_map(fake_redis, user_id=1, thread_ids=[5]) == {5: 0}
+    # A write to the thread folds its own legacy key.
+    assert await dm_state_service.increment_unread(fake_redis, user_id=1, thread_id=5) == 4
+
+
+@pytest.mark.asyncio
+async def test_flushed_state_survives_eviction(fake_redis, db_session):
+    user = User(email="a@example.com", username="a", hashed_password="x")
+    other = User(email="b@example.com", username="b", hashed_password="x")
+    db_session.add_all([user, other])
+    await db_session.commit()
+    workspace = Workspace(name="Acme", slug="acme", owner_id=user.id)
+    db_session.add(workspace)
+    await db_session.commit()
+    thread = await direct_message_service.get_or_create_thread(
+        db_session, workspace_id=workspace.id, user_a=user.id, user_b=other.id
+    )
+
+    await dm_state_service.increment_unread(
+        fake_redis, user_id=user.id, thread_id=thread.id, delta=3, db=db_session
+    )
+    await dm_state_service.set_last_read(
+        fake_redis, user_id=user.id, thread_id=thread.id, message_id=9, db=db_session
+    )
+    assert await dm_state_service.flush_dirty(fake_redis, db_session) == 1
+    assert await dm_state_service.flush_dirty(fake_redis, db_session) == 0
+
+    # Evicted: reads and writes re-warm from Postgres.
+    await fake_redis.flushall()
+    assert await dm_state_service.get_total_unread(fake_redis, user_id=user.id, db=db_session) == 3
+    await fake_redis.flushall()
+    assert (
+        await dm_state_service.increment_unread(
+            fake_redis, user_id=user.id, thread_id=thread.id, db=db_session
+        )
+        == 4
+    )
+    assert (
+        await dm_state_service.get_last_read(
+            fake_redis, user_id=user.id, thread_id=thread.id, db=db_session
+        )
+        == 9
+    )
+
+    await dm_state_service.clear_unread(
+        fake_redis, user_id=user.id, thread_id=thread.id, db=db_session
+    )
+    await dm_state_service.flush_dirty(fake_redis, db_session)
+    state = await db_session.scalar(
+        select(DirectMessageReadState).where(DirectMessageReadState.user_id == user.id)
+    )
+    assert (state.unread_count, state.last_read_message_id) == (0, 9)
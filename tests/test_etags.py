@@ -0,0 +1,37 @@
+import pytest
+
+from braumchat_api.services import version_service
+
+
+@pytest.mark.asyncio
+async def test_version_stamps_change_on_bump_and_never_repeat(fake_redis):
+    resource = version_service.channels_of(1)
+    first = await version_service.current(fake_redis, resource)
+    assert await version_service.current(fake_redis, resource) == first
+
+    await version_service.bump(fake_redis, resource, version_service.friends_of(2))
+    bumped = await version_service.current(fake_redis, resource)
+    assert bumped != first
+
+    # An expired counter restarts from the clock, not from 1.
+    await fake_redis.delete(version_service._key(resource))
+    await version_service.bump(fake_redis, resource)
+    assert await version_service.current(fake_redis, resource) not in {first, bumped, "1"}
+
+
+@pytest.mark.asyncio
+async def test_workspace_list_answers_304_until_it_changes(client, app_redis, register_and_login):
+    alice = await register_and_login("alice")
+    await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+
+    r = await client.get("/workspaces/", headers=alice)
+    tag = r.headers["etag"]
+    assert len(r.json()) == 1
+
+    r = await client.get("/workspaces/", headers={**alice, "If-None-Match": tag})
+    assert r.status_code == 304 and r.content == b""
+
+    await client.post("/workspaces/", json={"name": "Beta", "slug": "beta"}, headers=alice)
+    r = await client.get("/workspaces/", headers={**alice, "If-None-Match": tag})
+    assert r.status_code == 200 and len(r.json()) == 2
+    assert r.headers["etag"] != tag
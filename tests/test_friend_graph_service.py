@@ -0,0 +1,96 @@
+import pytest
+
+from braumchat_api.models.friend import Friend
+from braumchat_api.models.friend_request import FriendRequest
+from braumchat_api.models.user import User
+from braumchat_api.services import friend_graph_service, presence_service
+
+
+@pytest.mark.asyncio
+async def test_friend_sets_answer_online_and_mutual_queries(fake_redis, db_session):
+    users = [User(email=f"u{i}@example.com", hashed_password="x") for i in range(5)]
+    db_session.add_all(users)
+    await db_session.commit()
+    a, b, c, d, loner = (u.id for u in users)
+    db_session.add_all(
+        [
+            Friend(user1_id=a, user2_id=c),
+            Friend(user1_id=a, user2_id=d),
+            Friend(user1_id=b, user2_id=c),
+        ]
+    )
+    await db_session.commit()
+
+    # Cold users load from Postgres; a friendless user is warm but empty.
+    assert await friend_graph_service.get_friend_ids(fake_redis, db_session, user_id=a) == [c, d]
+    assert await friend_graph_service.get_friend_ids(fake_redis, db_session, user_id=loner) == []
+    assert await fake_redis.exists(friend_graph_service._friends_key(loner))
+
+    assert await friend_graph_service.get_mutual_friend_ids(
+        fake_redis, db_session, user_id=a, other_id=b
+    ) == [c]
+
+    # Writes keep warm sets current and leave cold ones for the next load.
+    db_session.add(Friend(user1_id=b, user2_id=d))
+    await db_session.commit()
+    await friend_graph_service.add_friendship(fake_redis, user_a=b, user_b=d)
+    assert await friend_graph_service.get_mutual_friend_ids(
+        fake_redis, db_session, user_id=a, other_id=b
+    ) == [c, d]
+    await friend_graph_service.remove_friendship(fake_redis, user_a=a, user_b=c)
+    assert await friend_graph_service.get_friend_ids(fake_redis, db_session, user_id=a) == [d]
+    await friend_graph_service.add_friendship(fake_redis, user_a=a, user_b=c)
+
+    await presence_service.set_user_online(fake_redis, c)
+    await presence_service.set_user_online(fake_redis, b)
+    # A lapsed presence entry (crashed process) doesn't count as online.
+    await fake_redis.zadd(presence_service.ONLINE_USERS_KEY, {str(d): 1})
+    assert await friend_graph_service.get_online_friend_ids(fake_redis, db_session, user_id=a) == [
+        c
+    ]
+    await presence_service.set_user_offline(fake_redis, c)
+    assert (
+        await friend_graph_service.get_online_friend_ids(fake_redis, db_session, user_id=a) == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_suggestions_track_mutual_friend_counts(fake_redis, db_session):
+    users = [User(email=f"s{i}@example.com", hashed_password="x") for i in range(4)]
+    db_session.add_all(users)
+    await db_session.commit()
+    a, b, c, d = (u.id for u in users)
+
+    async def befriend(x, y):
+        db_session.add(Friend(user1_id=min(x, y), user2_id=max(x, y)))
+        await db_session.commit()
+        await friend_graph_service.add_friendship(fake_redis, user_a=x, user_b=y, db=db_session)
+
+    for x, y in [(a, c), (b, c), (a, d), (b, d)]:
+        await befriend(x, y)
+
+    assert await friend_graph_service.get_suggestions(fake_redis, db_session, user_id=a) == [
+        (b, 2)
+    ]
+    assert await friend_graph_service.get_suggestions(fake_redis, db_session, user_id=c) == [
+        (d, 2)
+    ]
+
+    # Becoming friends removes the pair from each other's suggestions.
+    await befriend(c, d)
+    assert await friend_graph_service.get_suggestions(fake_redis, db_session, user_id=c) == []
+
+    friendship = await db_session.get(Friend, 1)
+    await db_session.delete(friendship)  # a-c
+    await db_session.commit()
+    await friend_graph_service.remove_friendship(fake_redis, user_a=a, user_b=c, db=db_session)
+    # b lost a mutual friend with a; a and c are now candidates through d.
+    suggestions = await friend_graph_service.get_suggestions(fake_redis, db_session, user_id=a)
+    assert sorted(suggestions) == [(b, 1), (c, 1)]
+
+    # Pending requests either way hide the candidate.
+    db_session.add(FriendRequest(requester_id=b, addressee_id=a, status="pending"))
+    await db_session.commit()
+    assert await friend_graph_service.get_suggestions(fake_redis, db_session, user_id=a) == [
+        (c, 1)
+    ]
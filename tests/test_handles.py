@@ -0,0 +1,47 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from braumchat_api.models.user import User
+from braumchat_api.services import user_service
+
+
+@pytest.mark.asyncio
+async def test_allocator_finds_the_last_free_codes_and_retries_races(db_session, monkeypatch):
+    free = {1234, 9999}
+    await db_session.execute(
+        insert(User),
+        [
+            {
+                "email": f"u{code}@example.com",
+                "hashed_password": "!",
+                "display_name": f"Crowd#{code:04d}",
+            }
+            for code in range(user_service.DISCRIMINATOR_SPACE)
+            if code not in free
+        ],
+    )
+    # Other bases sharing the prefix don't count against "crowd".
+    db_session.add(User(email="x@example.com", hashed_password="!", display_name="Crowded#1234"))
+    await db_session.commit()
+
+    used = await user_service._used_discriminators(db_session, base="crowd")
+    assert len(used) == user_service.DISCRIMINATOR_SPACE - len(free)
+
+    handle = await user_service._generate_unique_handle(db_session, base="crowd")
+    assert int(handle.split("#")[1]) in free
+
+    # Simulate losing a race: the first pick was taken by a concurrent insert.
+    picks = iter([0, 1234])
+    monkeypatch.setattr(user_service, "_pick_free_discriminator", lambda used: next(picks))
+    user = await user_service.insert_user_with_handle(
+        db_session, email="new@example.com", hashed_password="!", base="Crowd"
+    )
+    assert user.display_name == "Crowd#1234"
+
+    monkeypatch.setattr(user_service, "_pick_free_discriminator", lambda used: None)
+    with pytest.raises(HTTPException) as exc:
+        await user_service.insert_user_with_handle(
+            db_session, email="full@example.com", hashed_password="!", base="Crowd"
+        )
+    assert exc.value.status_code == 409
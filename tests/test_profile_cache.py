@@ -0,0 +1,75 @@
+import pytest
+
+from braumchat_api.models.user import User
+from braumchat_api.observability.round_trips import record_round_trips
+from braumchat_api.services import profile_cache
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_served_from_cache_tiers(fake_redis, db_session):
+    users = [
+        User(email=f"p{i}@example.com", hashed_password="x", display_name=f"pat{i}#000{i}")
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    ids = [u.id for u in users]
+    ghost = max(ids) + 100
+
+    # Cold: one IN query, and the unknown id is remembered as missing.
+    with record_round_trips() as trips:
+        found = await profile_cache.get_many(fake_redis, db_session, [*ids, ghost])
+    assert sorted(found) == ids
+    assert found[ids[0]].display_name == "pat0#0000"
+    assert len(trips.sql) == 1
+
+    with record_round_trips() as trips:
+        assert await profile_cache.get_many(fake_redis, db_session, [*ids, ghost]) == found
+    assert trips.sql == []
+
+    # Another process: empty local tier, warm Redis.
+    profile_cache.clear_local()
+    with record_round_trips() as trips:
+        assert await profile_cache.get_many(fake_redis, db_session, [*ids, ghost]) == found
+    assert trips.sql == []
+
+    # Display names resolve case-insensitively; misses are cached too.
+    assert (
+        await profile_cache.resolve_display_name(fake_redis, db_session, "PAT1#0001")
+    ).id == ids[1]
+    assert await profile_cache.resolve_display_name(fake_redis, db_session, "nobody#0000") is None
+    with record_round_trips() as trips:
+        assert (
+            await profile_cache.resolve_display_name(fake_redis, db_session, "nobody#0000") is None
+        )
+        assert await profile_cache.resolve_display_name(fake_redis, db_session, "pat1#0001")
+    assert trips.sql == []
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_stale_entries(fake_redis, db_session):
+    user = User(email="q@example.com", hashed_password="x", display_name="quinn#0001")
+    db_session.add(user)
+    await db_session.commit()
+
+    assert await profile_cache.resolve_display_name(fake_redis, db_session, "quill#0001") is None
+    assert (await profile_cache.get(fake_redis, db_session, user.id)).display_name == "quinn#0001"
+
+    pubsub = fake_redis.pubsub()
+    await pubsub.subscribe(profile_cache.INVALIDATION_CHANNEL)
+    await pubsub.get_message(timeout=1)  # subscribe confirmation
+
+    user.display_name = "quill#0001"
+    await db_session.commit()
+    await profile_cache.invalidate(
+        fake_redis, user_ids=[user.id], display_names=["quinn#0001", "quill#0001"]
+    )
+
+    assert (await profile_cache.get(fake_redis, db_session, user.id)).display_name == "quill#0001"
+    assert (
+        await profile_cache.resolve_display_name(fake_redis, db_session, "quill#0001")
+    ).id == user.id
+    message = await pubsub.get_message(timeout=1)
+    assert message["type"] == "message"
+    assert str(user.id) in message["data"]
+    await pubsub.aclose()
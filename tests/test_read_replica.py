@@ -0,0 +1,135 @@
+import pytest
+import pytest_asyncio
+from fastapi import WebSocketDisconnect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from braumchat_api.api import deps
+from braumchat_api.api.routes import realtime
+from braumchat_api.config import Settings
+from braumchat_api.db import read_your_writes
+from braumchat_api.db.session import engine_options
+from braumchat_api.main import app
+from braumchat_api.models.meta import Base
+from braumchat_api.models.user import User
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path, monkeypatch):
+    # A second SQLite file stands in for the replica; it only holds "bobreplica".
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    ReplicaSession = async_sessionmaker(engine, expire_on_commit=False)
+    async with ReplicaSession() as s:
+        # An id no test user has on the primary: searches exclude the viewer's id.
+        s.add(User(id=1000, email="replica@example.com", display_name="bobreplica#0001"))
+        await s.commit()
+    monkeypatch.setattr(deps, "ReadSessionLocal", ReplicaSession)
+    yield
+    await engine.dispose()
+
+
+def test_pool_options_skip_sqlite():
+    settings = Settings(DATABASE_URL="sqlite+aiosqlite:///x.db", JWT_SECRET="x", DB_POOL_SIZE=7)
+    assert engine_options(settings.DATABASE_URL, settings) == {}
+    options = engine_options("postgresql+asyncpg://db/app", settings)
+    assert options["pool_size"] == 7 and options["pool_pre_ping"] is True
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_except_right_after_a_write(client, replica, register_and_login):
+    alice = await register_and_login("alice")
+    await register_and_login("bob")
+
+    # Each call uses a new prefix: candidate ids are cached per prefix.
+    async def search(q: str):
+        r = await client.get("/users/search", params={"q": q}, headers=alice)
+        assert r.status_code == 200
+        return [u["display_name"].split("#")[0] for u in r.json()]
+
+    assert await search("bob") == ["bobreplica"]
+
+    await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    assert await search("bo") == ["bob"]
+
+    # Once the window has passed, reads go back to the replica.
+    read_your_writes.clear_local()
+    assert await search("b") == ["bobreplica"]
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_never_issue_version_etags(
+    client, replica, app_redis, register_and_login
+):
+    alice = await register_and_login("alice")
+    bobby = await register_and_login("bobby")
+    handle = (await client.get("/auth/me", headers=bobby)).json()["display_name"]
+    r = await client.post(
+        "/friends/requests", json={"addressee_display_name": handle}, headers=alice
+    )
+    r = await client.post(f"/friends/requests/{r.json()['id']}/accept", headers=bobby)
+    assert r.status_code == 200
+
+    # Alice wrote recently: the primary serves her list, with a tag.
+    r = await client.get("/friends/", headers=alice)
+    assert len(r.json()) == 1
+    tag = r.headers["etag"]
+
+    # The replica hasn't seen the friendship. Its (stale) page must not carry
+    # the stamp that already covers it, but the primary's tag still gets a 304.
+    read_your_writes.clear_local()
+    r = await client.get("/friends/", headers=alice)
+    assert r.json() == [] and "etag" not in r.headers
+    r = await client.get("/friends/", headers={**alice, "If-None-Match": tag})
+    assert r.status_code == 304
+
+
+class ScriptedWebSocket:
+    """Sends `frames` to the handler, then disconnects."""
+
+    def __init__(self, token: str, frames: list[dict]):
+        self.query_params = {"token": token}
+        self.scope = {"client": ("127.0.0.1", 1234), "headers": []}
+        self.frames = list(frames)
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        if not self.frames:
+            raise WebSocketDisconnect()
+        return self.frames.pop(0)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_websocket_writes_keep_the_author_on_the_primary(
+    client, replica, app_redis, register_and_login
+):
+    alice = await register_and_login("alice")
+    r = await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    workspace_id = r.json()["id"]
+    r = await client.post(
+        f"/channels/workspaces/{workspace_id}/channels", json={"name": "general"}, headers=alice
+    )
+    channel_id = r.json()["id"]
+    read_your_writes.clear_local()
+
+    ws = ScriptedWebSocket(
+        alice["Authorization"].split()[1], [{"type": "message", "content": "hello"}]
+    )
+    async for db in app.dependency_overrides[deps.get_db_dep]():
+        await realtime.ws_channel(ws, workspace_id, channel_id, db=db)
+    assert ws.sent[0]["payload"]["content"] == "hello"
+
+    # Shared with other workers as the message committed, not at teardown.
+    read_your_writes.clear_local()
+    r = await client.get(f"/channels/{channel_id}/messages", headers=alice)
+    assert r.status_code == 200
+    assert [m["content"] for m in r.json()] == ["hello"]
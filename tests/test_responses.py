@@ -0,0 +1,51 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from pydantic import parse_obj_as
+
+from braumchat_api.api import responses
+from braumchat_api.schemas.direct_message import DirectMessageRead
+from braumchat_api.schemas.message import MessageRead
+
+
+def test_encoders_agree_on_datetimes_and_unicode():
+    content = [{"at": datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc), "text": "olá ✓"}]
+    assert json.loads(responses.dumps(content)) == json.loads(responses.stdlib_dumps(content))
+    encoded = json.loads(responses.stdlib_dumps(content))
+    assert encoded[0]["at"] == "2024-01-02T03:04:05.000006+00:00"
+
+
+@pytest.mark.asyncio
+async def test_fast_list_endpoints_match_their_response_models(client, register_and_login):
+    alice = await register_and_login("alice")
+    await register_and_login("bobby")
+    bobby_id = (await client.get("/auth/me", headers=alice)).json()["id"] + 1
+    r = await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    workspace_id = r.json()["id"]
+    r = await client.post(
+        f"/channels/workspaces/{workspace_id}/channels", json={"name": "general"}, headers=alice
+    )
+    channel_id = r.json()["id"]
+    posted = await client.post(
+        f"/channels/{channel_id}/messages", json={"content": "hi ✓"}, headers=alice
+    )
+
+    r = await client.get(f"/channels/{channel_id}/messages", headers=alice)
+    assert r.status_code == 200
+    [message] = r.json()
+    assert set(message) == set(MessageRead.__fields__)
+    assert parse_obj_as(List[MessageRead], r.json())[0].author.display_name
+    assert message["author"] == posted.json()["author"]
+
+    r = await client.post(
+        "/dm/threads", json={"workspace_id": workspace_id, "user_id": bobby_id}, headers=alice
+    )
+    thread_id = r.json()["id"]
+    await client.post(f"/dm/threads/{thread_id}/messages", json={"content": "yo"}, headers=alice)
+    r = await client.get(f"/dm/threads/{thread_id}/messages", headers=alice)
+    assert r.status_code == 200
+    [dm] = r.json()
+    assert set(dm) == set(DirectMessageRead.__fields__)
+    assert parse_obj_as(List[DirectMessageRead], r.json())[0].content == "yo"
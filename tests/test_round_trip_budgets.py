@@ -0,0 +1,80 @@
+import pytest
+
+from braumchat_api.observability.round_trips import (
+    RoundTripBudgetExceeded,
+    RoundTrips,
+    round_trip_budget,
+)
+
+# Per-endpoint budgets. Raise them only with a reason; lower them when a change
+# removes round trips so the improvement is locked in.
+BUDGETS = {
+    "GET /auth/me": {"sql": 2, "redis": 2},
+    # +1 Redis: the version stamp behind the ETag.
+    "GET /friends/": {"sql": 3, "redis": 3},
+    "GET /dm/threads": {"sql": 3, "redis": 3},
+    "POST /friends/requests": {"sql": 11, "redis": 2},
+    # +1 Redis: the friend-graph update (warm both sides, then one script).
+    # +1 Redis: bumping both friend-list version stamps in one script.
+    # +1 SQL (cold auth cache only): the current user is an AuthUser, so the
+    # addressee row is no longer in the identity map; a cached auth saves two.
+    "POST /friends/requests/{id}/accept": {"sql": 15, "redis": 4},
+}
+
+
+def test_budget_failure_lists_captured_statements():
+    trips = RoundTrips(sql=["SELECT 1", "SELECT 2"], redis=["GET k"])
+    with pytest.raises(RoundTripBudgetExceeded) as exc:
+        trips.assert_within(sql=1, redis=1, label="GET /x")
+
+    message = str(exc.value)
+    assert "GET /x" in message
+    assert "2 SQL statements (budget 1)" in message
+    assert "1. SELECT 1" in message and "2. SELECT 2" in message
+
+
+@pytest.mark.asyncio
+async def test_endpoint_round_trip_budgets(client, register_and_login):
+    alice = await register_and_login("alice")
+    bobby = await register_and_login("bobby")
+    bobby_me = (await client.get("/auth/me", headers=bobby)).json()
+    bobby_handle = bobby_me["display_name"]
+
+    with round_trip_budget(**BUDGETS["GET /auth/me"], label="GET /auth/me"):
+        r = await client.get("/auth/me", headers=alice)
+    assert r.status_code == 200
+
+    with round_trip_budget(**BUDGETS["POST /friends/requests"], label="POST /friends/requests"):
+        r = await client.post(
+            "/friends/requests",
+            json={"addressee_display_name": bobby_handle},
+            headers=alice,
+        )
+    assert r.status_code == 200
+    request_id = r.json()["id"]
+
+    with round_trip_budget(
+        **BUDGETS["POST /friends/requests/{id}/accept"],
+        label="POST /friends/requests/{id}/accept",
+    ):
+        r = await client.post(f"/friends/requests/{request_id}/accept", headers=bobby)
+    assert r.status_code == 200
+
+    with round_trip_budget(**BUDGETS["GET /friends/"], label="GET /friends/"):
+        r = await client.get("/friends/", headers=alice)
+    assert r.status_code == 200
+    assert len(r.json()) == 1
+
+    r = await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    assert r.status_code == 200
+    r = await client.post(
+        "/dm/threads",
+        json={"workspace_id": r.json()["id"], "user_id": bobby_me["id"]},
+        headers=alice,
+    )
+    assert r.status_code == 200
+
+    with round_trip_budget(**BUDGETS["GET /dm/threads"], label="GET /dm/threads"):
+        r = await client.get("/dm/threads", headers=alice)
+    assert r.status_code == 200
+    assert len(r.json()) == 1
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from braumchat_api.models.channel import Channel
+from braumchat_api.models.message import Message
+from braumchat_api.models.user import User
+from braumchat_api.models.workspace import Workspace
+from braumchat_api.models.workspace_member import WorkspaceMember
+from braumchat_api.services import direct_message_service, search_service
+
+
+@pytest.mark.asyncio
+async def test_search_respects_acls_filters_and_keyset_pages(db_session):
+    me = User(email="me@example.com", username="me", hashed_password="x")
+    them = User(email="them@example.com", username="them", hashed_password="x")
+    outsider = User(email="out@example.com", username="out", hashed_password="x")
+    db_session.add_all([me, them, outsider])
+    await db_session.commit()
+    mine = Workspace(name="Acme", slug="acme", owner_id=me.id)
+    other = Workspace(name="Other", slug="other", owner_id=outsider.id)
+    db_session.add_all([mine, other])
+    await db_session.commit()
+    db_session.add_all(
+        [
+            WorkspaceMember(workspace_id=mine.id, user_id=me.id),
+            WorkspaceMember(workspace_id=mine.id, user_id=them.id),
+            WorkspaceMember(workspace_id=other.id, user_id=outsider.id),
+        ]
+    )
+    general = Channel(workspace_id=mine.id, name="general")
+    hidden = Channel(workspace_id=other.id, name="secret")
+    db_session.add_all([general, hidden])
+    await db_session.commit()
+
+    db_session.add_all(
+        Message(channel_id=general.id, user_id=them.id, content=f"deploy window {i}")
+        for i in range(5)
+    )
+    db_session.add(Message(channel_id=general.id, user_id=me.id, content="Deploy done"))
+    db_session.add(Message(channel_id=general.id, user_id=me.id, content="lunch?"))
+    db_session.add(Message(channel_id=hidden.id, user_id=outsider.id, content="deploy secret"))
+    await db_session.commit()
+
+    found = await search_service.search_channel_messages(
+        db_session, user_id=me.id, query="deploy", limit=50
+    )
+    assert len(found) == 6
+    assert all(m.channel_id == general.id for m in found)
+    assert [m.id for m in found] == sorted((m.id for m in found), reverse=True)
+
+    by_me = await search_service.search_channel_messages(
+        db_session, user_id=me.id, query="deploy", author_id=me.id
+    )
+    assert [m.content for m in by_me] == ["Deploy done"]
+
+    # Operator characters are quoted rather than passed through to the index.
+    assert (
+        await search_service.search_channel_messages(
+            db_session, user_id=me.id, query='window" OR "lunch', channel_id=general.id
+        )
+        == []
+    )
+
+    pages, cursor = [], None
+    while True:
+        page = await search_service.search_channel_messages(
+            db_session, user_id=me.id, query="deploy", cursor=cursor, limit=4
+        )
+        pages.append([m.id for m in page])
+        cursor = search_service.next_cursor(page, 4)
+        if cursor is None:
+            break
+    assert [len(p) for p in pages] == [4, 2]
+    assert sum(pages, []) == [m.id for m in found]
+
+    with pytest.raises(ValueError):
+        await search_service.search_channel_messages(db_session, user_id=me.id, query=" ?! ")
+
+    thread = await direct_message_service.get_or_create_thread(
+        db_session, workspace_id=mine.id, user_a=me.id, user_b=them.id
+    )
+    await direct_message_service.create_direct_message(
+        db_session,
+        thread_id=thread.id,
+        sender_id=them.id,
+        content="the deploy key",
+        recipient_id=me.id,
+    )
+    dms = await search_service.search_direct_messages(db_session, user_id=me.id, query="key")
+    assert [m.content for m in dms] == ["the deploy key"]
+    assert (
+        await search_service.search_direct_messages(db_session, user_id=outsider.id, query="key")
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_and_streams(client, register_and_login):
+    alice = await register_and_login("alice")
+    bobby = await register_and_login("bobby")
+    r = await client.post("/workspaces/", json={"name": "Acme", "slug": "acme"}, headers=alice)
+    r = await client.post(
+        f"/channels/workspaces/{r.json()['id']}/channels", json={"name": "general"}, headers=alice
+    )
+    channel = r.json()
+    for i in range(3):
+        r = await client.post(
+            f"/channels/{channel['id']}/messages", json={"content": f"ship it {i}"}, headers=alice
+        )
+        assert r.status_code == 200
+
+    r = await client.get("/search/messages", params={"q": "ship", "limit": 2}, headers=alice)
+    assert r.status_code == 200
+    assert len(r.json()) == 2 and r.json()[0]["author"]["display_name"]
+    r = await client.get(
+        "/search/messages",
+        params={"q": "ship", "limit": 2, "cursor": r.headers["X-Next-Cursor"]},
+        headers=alice,
+    )
+    assert [m["content"] for m in r.json()] == ["ship it 0"]
+    assert "X-Next-Cursor" not in r.headers
+
+    r = await client.get(
+        "/search/messages",
+        params={"q": "ship"},
+        headers={**alice, "Accept": "application/x-ndjson"},
+    )
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [m["content"] for m in lines] == ["ship it 2", "ship it 1", "ship it 0"]
+
+    r = await client.get("/search/messages", params={"q": "ship"}, headers=bobby)
+    assert r.json() == []
+    r = await client.get("/search/messages", params={"q": "%%"}, headers=alice)
+    assert r.status_code == 400
@@ -0,0 +1,96 @@
+import pytest
+
+from braumchat_api.models.friend import Friend
+from braumchat_api.models.user import User
+from braumchat_api.models.workspace import Workspace
+from braumchat_api.models.workspace_member import WorkspaceMember
+from braumchat_api.services import user_service
+
+
+@pytest.mark.asyncio
+async def test_typeahead_ranks_friends_then_co_members(db_session):
+    user_service.prefix_cache.clear()
+    me = User(email="me@example.com", display_name="Viewer#0001", hashed_password="x")
+    stranger = User(email="s@example.com", display_name="Braum#0001", hashed_password="x")
+    colleague = User(email="c@example.com", display_name="Braum#0002", hashed_password="x")
+    friend = User(email="f@example.com", display_name="Braumly#0003", hashed_password="x")
+    wildcard = User(email="w@example.com", display_name="Br_um#0004", hashed_password="x")
+    db_session.add_all([me, stranger, colleague, friend, wildcard])
+    await db_session.commit()
+    workspace = Workspace(name="Acme", slug="acme", owner_id=me.id)
+    db_session.add(workspace)
+    await db_session.commit()
+    db_session.add_all(
+        [
+            WorkspaceMember(workspace_id=workspace.id, user_id=me.id),
+            WorkspaceMember(workspace_id=workspace.id, user_id=colleague.id),
+            Friend(user1_id=me.id, user2_id=friend.id),
+        ]
+    )
+    await db_session.commit()
+
+    found = await user_service.search_users_by_display_name(
+        db_session, query="braum", viewer_id=me.id
+    )
+    assert [u.display_name for u in found] == ["Braumly#0003", "Braum#0002", "Braum#0001"]
+
+    anonymous = await user_service.search_users_by_display_name(db_session, query="braum")
+    assert [u.display_name for u in anonymous] == ["Braum#0001", "Braum#0002", "Braumly#0003"]
+
+    # Partial discriminators narrow the prefix; full handles are exact.
+    partial = await user_service.search_users_by_display_name(
+        db_session, query="Braum#000", viewer_id=me.id
+    )
+    assert [u.display_name for u in partial] == ["Braum#0002", "Braum#0001"]
+    exact = await user_service.search_users_by_display_name(db_session, query="braum#0001")
+    assert [u.id for u in exact] == [stranger.id]
+
+    # LIKE wildcards in the query match literally.
+    literal = await user_service.search_users_by_display_name(db_session, query="br_")
+    assert [u.display_name for u in literal] == ["Br_um#0004"]
+
+    # The viewer never comes back as their own suggestion.
+    for query in ("viewer", "Viewer#0001"):
+        own = await user_service.search_users_by_display_name(
+            db_session, query=query, viewer_id=me.id
+        )
+        assert own == []
+    anonymous = await user_service.search_users_by_display_name(db_session, query="viewer")
+    assert [u.id for u in anonymous] == [me.id]
+
+    # Short prefixes are served from the process cache until it expires.
+    await user_service.search_users_by_display_name(db_session, query="br")
+    late = User(email="l@example.com", display_name="Brax#0005", hashed_password="x")
+    db_session.add(late)
+    await db_session.commit()
+    cached = await user_service.search_users_by_display_name(db_session, query="br")
+    assert late.id not in {u.id for u in cached}
+    user_service.prefix_cache.clear()
+    fresh = await user_service.search_users_by_display_name(db_session, query="br")
+    assert late.id in {u.id for u in fresh}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_keeps_request_order_and_etags(client, register_and_login):
+    alice = await register_and_login("alice")
+    await register_and_login("bobby")
+    me = (await client.get("/auth/me", headers=alice)).json()
+    ids = [me["id"] + 1, 999, me["id"], me["id"] + 1]
+
+    r = await client.get("/users/batch", params={"ids": ",".join(map(str, ids))}, headers=alice)
+    assert r.status_code == 200
+    assert [u["id"] for u in r.json()] == [me["id"] + 1, me["id"]]
+    assert r.json()[1]["display_name"] == me["display_name"]
+
+    r2 = await client.post("/users/batch", json={"ids": ids}, headers=alice)
+    assert r2.json() == r.json() and r2.headers["etag"] == r.headers["etag"]
+
+    r = await client.get(
+        "/users/batch",
+        params={"ids": ",".join(map(str, ids))},
+        headers={**alice, "If-None-Match": r.headers["etag"]},
+    )
+    assert r.status_code == 304
+
+    r = await client.post("/users/batch", json={"ids": list(range(1, 1000))}, headers=alice)
+    assert r.status_code == 400
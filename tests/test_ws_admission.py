@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from braumchat_api.api.routes.realtime import ws_notifications
+from braumchat_api.observability.loop_lag import LoopLagMonitor, loop_lag
+from braumchat_api.realtime import admission
+from braumchat_api.realtime.manager import ConnectionManager, manager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.accepted = False
+        self.close_code = None
+        self.close_reason = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+        self.close_reason = reason
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def set_limits(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(admission.settings, name, value)
+
+    set_limits(
+        WS_MAX_CONNECTIONS_PER_WORKER=0, WS_MAX_CONNECTIONS_PER_USER=0, WS_SHED_LOOP_LAG_MS=0
+    )
+    return set_limits
+
+
+@pytest.mark.asyncio
+async def test_caps_per_worker_and_per_user(limits):
+    local = ConnectionManager()
+    a, b, c = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await local.connect("notify:1", a, user_id=1)
+    await local.connect("dm:5", b, user_id=1)
+    await local.connect("notify:2", c, user_id=2)
+    assert admission.refusal(local, user_id=1) is None
+
+    limits(WS_MAX_CONNECTIONS_PER_USER=2)
+    assert admission.refusal(local, user_id=1) == "user_full"
+    assert admission.refusal(local, user_id=2) is None
+    assert admission.refusal(local) is None
+
+    limits(WS_MAX_CONNECTIONS_PER_WORKER=3)
+    assert admission.refusal(local) == "worker_full"
+
+    # A socket disconnected twice (drain, then its handler) is counted once.
+    await local.disconnect("dm:5", b)
+    await local.disconnect("dm:5", b)
+    assert local.connection_count() == 2
+    assert local.user_total(1) == 1
+    assert admission.refusal(local, user_id=1) is None
+
+
+@pytest.mark.asyncio
+async def test_sheds_on_loop_lag(limits, monkeypatch):
+    limits(WS_SHED_LOOP_LAG_MS=100)
+    monkeypatch.setattr(loop_lag, "lag_seconds", 0.2)
+    assert admission.refusal(ConnectionManager()) == "loop_lag"
+
+
+def test_loop_lag_rises_at_once_and_decays():
+    monitor = LoopLagMonitor(decay=0.5)
+    monitor.observe(0.4)
+    assert monitor.lag_seconds == pytest.approx(0.4)
+    monitor.observe(0.0)
+    assert monitor.lag_seconds == pytest.approx(0.2)
+    monitor.observe(0.0)
+    assert monitor.lag_seconds == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_refused_socket_gets_1013_and_retry_hint(limits, monkeypatch):
+    limits(WS_MAX_CONNECTIONS_PER_WORKER=1, WS_RETRY_AFTER_SECONDS=5)
+    monkeypatch.setattr(manager, "_total", 1)
+
+    ws = FakeWebSocket()
+    await ws_notifications(ws, db=None)
+
+    assert ws.accepted
+    assert ws.close_code == admission.OVERLOADED_CLOSE_CODE
+    hint = json.loads(ws.close_reason)
+    assert hint["reason"] == "worker_full"
+    assert 5 <= hint["retry_after"] <= 10
+
+
+@pytest.mark.asyncio
+async def test_load_report(client, limits, monkeypatch):
+    limits(WS_MAX_CONNECTIONS_PER_WORKER=4)
+    monkeypatch.setattr(manager, "_total", 1)
+
+    res = await client.get("/realtime/load")
+    assert res.status_code == 200
+    body = res.json()
+    assert body["connections"] == 1
+    assert body["utilization"] == 0.25
+    assert body["accepting"] is True
+
+    monkeypatch.setattr(manager, "draining", True)
+    res = await client.get("/realtime/load")
+    assert res.status_code == 503
+    assert res.json()["draining"] is True
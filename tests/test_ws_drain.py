@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from braumchat_api.api.routes.realtime import ws_notifications
+from braumchat_api.realtime import drain
+from braumchat_api.realtime.manager import ConnectionManager, manager
+from braumchat_api.services import presence_service
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+        self.close_reason = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+        self.close_reason = reason
+
+
+@pytest.mark.asyncio
+async def test_drain_spreads_reconnects_and_closes_in_batches(fake_redis):
+    local = ConnectionManager()
+    sockets = []
+    for user_id in range(1, 6):
+        ws = FakeWebSocket()
+        await local.connect("chat:w:1:c:1", ws, user_id=user_id, presence_channel=(1, 1))
+        await presence_service.online_connect(fake_redis, user_id)
+        await presence_service.add_user(fake_redis, 1, 1, user_id)
+        sockets.append(ws)
+    # User 1 has a second socket elsewhere that is drained too.
+    other = FakeWebSocket()
+    await local.connect("notify:1", other, user_id=1)
+    await presence_service.online_connect(fake_redis, 1)
+    sockets.append(other)
+
+    drained = await drain.drain(
+        local, fake_redis, window_seconds=0.3, batch_size=2, rng=random.Random(7)
+    )
+
+    assert drained == 6
+    assert local.draining is True
+    assert local.connections() == []
+    for ws in sockets:
+        assert ws.close_code == drain.DRAIN_CLOSE_CODE
+        (frame,) = ws.sent
+        assert frame["type"] == "reconnect"
+        assert 0 <= frame["payload"]["after_ms"] < 300
+    # Three batches over 0.3s: one per 100ms slot.
+    slots = sorted(ws.sent[0]["payload"]["after_ms"] // 100 for ws in sockets)
+    assert slots == [0, 0, 1, 1, 2, 2]
+
+    assert await presence_service.list_users(fake_redis, 1, 1) == []
+    assert await fake_redis.zcard(presence_service.ONLINE_USERS_KEY) == 0
+    for user_id in range(1, 6):
+        assert not await presence_service.is_user_online(fake_redis, user_id)
+        assert await fake_redis.get(f"online_count:user:{user_id}") is None
+
+
+@pytest.mark.asyncio
+async def test_disconnect_many_keeps_users_with_sockets_left(fake_redis):
+    for _ in range(2):
+        await presence_service.online_connect(fake_redis, 1)
+        await presence_service.add_user(fake_redis, 1, 1, 1)
+    await presence_service.online_connect(fake_redis, 2)
+
+    await presence_service.disconnect_many(fake_redis, [(1, (1, 1)), (2, None)])
+
+    assert await presence_service.is_user_online(fake_redis, 1)
+    assert await presence_service.list_users(fake_redis, 1, 1) == [1]
+    assert not await presence_service.is_user_online(fake_redis, 2)
+
+
+@pytest.mark.asyncio
+async def test_draining_refuses_new_sockets():
+    manager.draining = True
+    try:
+        ws = FakeWebSocket()
+        await ws_notifications(ws, db=None)
+        assert ws.close_code == drain.DRAIN_CLOSE_CODE
+        assert manager.connections() == []
+    finally:
+        drain.reset(manager)
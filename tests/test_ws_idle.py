@@ -0,0 +1,53 @@
+import pytest
+
+from braumchat_api.realtime.idle import IDLE_CLOSE_CODE, IdleSweeper
+from braumchat_api.realtime.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_sweeper_closes_only_sockets_idle_past_the_timeout():
+    clock = Clock()
+    sweeper = IdleSweeper(timeout_seconds=25, clock=clock)
+    manager = ConnectionManager()
+    quiet, chatty, gone = [
+        await manager.connect(f"notify:{i}", FakeWebSocket(), user_id=i) for i in (1, 2, 3)
+    ]
+    for conn in (quiet, chatty, gone):
+        sweeper.track(conn)
+
+    clock.now += 20
+    chatty.last_seen = clock.now
+    await manager.disconnect("notify:3", gone.websocket)
+    assert await sweeper.sweep() == 0
+
+    clock.now += 6
+    assert await sweeper.sweep() == 1
+    assert quiet.closed and quiet.websocket.close_code == IDLE_CLOSE_CODE
+    assert chatty.websocket.close_code is None
+    assert gone.websocket.close_code is None
+
+    # The active socket was re-filed under its new deadline.
+    clock.now += 18
+    assert await sweeper.sweep() == 0
+    clock.now += 1
+    assert await sweeper.sweep() == 1
+    assert chatty.websocket.close_code == IDLE_CLOSE_CODE